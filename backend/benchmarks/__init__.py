@@ -0,0 +1,3 @@
+"""
+Benchmarks for the Lua TTS System
+"""
\ No newline at end of file
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Accuracy/latency comparison of KokoroEngine inference backends
+
+Runs the same phonemized sentences through each backend and reports
+latency, real-time factor and how far the audio drifts from the
+full-precision PyTorch reference.
+
+Usage:
+    python -m backend.benchmarks.compare_backends --backends torch int8 onnx
+"""
+import argparse
+import copy
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import torch
+from kokoro import KModel, KPipeline
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from backend.core.config import settings
+from backend.modules.tts.backends import BACKENDS, prepare_backend
+
+DEFAULT_TEXTS = [
+    "Olá, eu sou a Lua.",
+    "Bom dia! Temos novas peças de ouro e prata na vitrine.",
+    "O pedido do cliente ficará pronto na próxima semana, depois do polimento "
+    "e da cravação das pedras.",
+]
+
+
+def spectral_distance(reference: np.ndarray, candidate: np.ndarray, n_fft: int = 1024) -> float:
+    """Spectral convergence of candidate vs reference (0 = identical)"""
+    length = min(len(reference), len(candidate))
+    if length < n_fft:
+        return float("nan")
+
+    def magnitude(audio: np.ndarray) -> np.ndarray:
+        frames = np.lib.stride_tricks.sliding_window_view(audio[:length], n_fft)[::n_fft // 4]
+        return np.abs(np.fft.rfft(frames * np.hanning(n_fft), axis=-1))
+
+    ref, cand = magnitude(reference), magnitude(candidate)
+    return float(np.linalg.norm(ref - cand) / max(np.linalg.norm(ref), 1e-9))
+
+
+def run_backend(runtime, phonemes: List[str], pack: torch.FloatTensor, runs: int) -> Dict[str, Any]:
+    """Time one backend over all sentences"""
+    latencies, outputs = [], []
+    audio_seconds = 0.0
+
+    for ps in phonemes:
+        ref_s = pack[len(ps) - 1]
+        runtime(ps, ref_s, 1.0)  # warm-up
+        for _ in range(runs):
+            start = time.perf_counter()
+            audio = runtime(ps, ref_s, 1.0)
+            latencies.append(time.perf_counter() - start)
+        audio = audio.numpy()
+        outputs.append(audio)
+        audio_seconds += len(audio) / settings.sample_rate * runs
+
+    return {
+        "latency_p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "latency_p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "rtf": float(sum(latencies) / audio_seconds),
+        "outputs": outputs,
+    }
+
+
+def compare(backends: List[str], texts: List[str], voice: str, runs: int) -> Dict[str, Dict[str, Any]]:
+    """Run every backend and score it against the torch reference"""
+    model = KModel(repo_id=settings.model_repo_id).cpu().eval()
+    pipeline = KPipeline(lang_code=settings.default_voice_code, repo_id=settings.model_repo_id, model=False)
+    pack = pipeline.load_voice(voice)
+    phonemes = [result.phonemes for text in texts for result in pipeline(text)]
+
+    results: Dict[str, Dict[str, Any]] = {}
+    reference = None
+    for name in ["torch"] + [b for b in backends if b != "torch"]:
+        print(f"⏱️  {name}...")
+        runtime = prepare_backend(name, copy.deepcopy(model), settings.models_dir, settings.torch_threads)
+        result = run_backend(runtime, phonemes, pack, runs)
+        outputs = result.pop("outputs")
+
+        if reference is None:
+            reference = outputs
+        result["length_ratio"] = float(
+            sum(len(o) for o in outputs) / sum(len(r) for r in reference)
+        )
+        result["spectral_distance"] = float(np.nanmean([
+            spectral_distance(r, o) for r, o in zip(reference, outputs)
+        ]))
+        results[name] = result
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--voice", default="af_heart")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--text", action="append", help="Sentence to synthesize (repeatable)")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = compare(args.backends, args.text or DEFAULT_TEXTS, args.voice, args.runs)
+
+    print(f"\n{'backend':<10}{'p50 ms':>10}{'p95 ms':>10}{'RTF':>8}{'len':>8}{'spec':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<10}{r['latency_p50_ms']:>10.1f}{r['latency_p95_ms']:>10.1f}"
+            f"{r['rtf']:>8.3f}{r['length_ratio']:>8.3f}{r['spectral_distance']:>8.3f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency benchmarks for KokoroEngine
+
+Runs named scenarios (text length x voice x speed for generate_speech,
+stream_speech and mix_voices, plus a concurrency sweep) and reports
+p50/p95/p99 latency, time to first chunk, real-time factor, peak RSS and
+throughput per concurrency level. Results can be saved as a JSON baseline
+and later runs compared against it; a regression beyond the tolerance
+exits non-zero so it can gate a deploy.
+
+--stub swaps the Kokoro model and G2P for a deterministic stand-in with a
+configurable real-time factor, so the engine's own overhead (executor,
+encoding, streaming, mixing) can be measured offline.
+
+Usage:
+    python -m backend.benchmarks.tts_bench --stub --save-baseline baseline.json
+    python -m backend.benchmarks.tts_bench --stub --compare baseline.json
+    python -m backend.benchmarks.tts_bench --scenario stream_short --runs 20
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import torch
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from backend.core.config import settings
+from backend.core.logger import logger
+from backend.modules.tts.executor import EngineBusyError
+from backend.modules.tts.kokoro_engine import KokoroEngine
+from backend.modules.tts.long_text import split_sentences
+
+TEXTS = {
+    "short": "Olá, eu sou a Lua.",
+    "medium": (
+        "Bom dia! Temos novas peças de ouro e prata na vitrine. O anel de "
+        "esmeralda que você encomendou já chegou e pode ser retirado hoje."
+    ),
+    "long": " ".join([
+        "O pedido do cliente ficará pronto na próxima semana, depois do "
+        "polimento e da cravação das pedras.",
+        "Enquanto isso, a equipe vai revisar o estoque de correntes e "
+        "brincos, conferir os valores de cada peça e atualizar o caixa.",
+        "Se houver qualquer atraso, avisaremos por mensagem para que a "
+        "retirada seja remarcada sem custo adicional.",
+    ] * 3),
+}
+
+PCM_BYTES_PER_SAMPLE = 2
+
+
+# Offline stand-in for the model and pipeline
+
+class StubModel:
+    """
+    Deterministic stand-in for KModel
+
+    Produces audio proportional to the phoneme count and holds the calling
+    worker for `rtf` times the audio duration (sleeping, like a forward
+    pass that releases the GIL).
+    """
+
+    SECONDS_PER_PHONEME = 0.075
+
+    def __init__(self, rtf: float = 0.1):
+        self.rtf = rtf
+        self.vocab = {}
+        self.context_length = 512
+
+    @property
+    def device(self) -> torch.device:
+        return torch.device("cpu")
+
+    def cpu(self):
+        return self
+
+    cuda = cpu
+
+    def to(self, *_):
+        return self
+
+    def eval(self):
+        return self
+
+    def __call__(self, phonemes: str, ref_s: torch.FloatTensor, speed: float = 1, return_output: bool = False):
+        duration = len(phonemes) * self.SECONDS_PER_PHONEME / speed
+        time.sleep(duration * self.rtf)
+
+        samples = int(duration * settings.sample_rate)
+        t = np.arange(samples, dtype=np.float32) / settings.sample_rate
+        audio = torch.from_numpy(0.1 * np.sin(2 * np.pi * 220.0 * t))
+        if not return_output:
+            return audio
+        return type("Output", (), {"audio": audio, "pred_dur": None})()
+
+
+@dataclass
+class StubResult:
+    graphemes: str
+    phonemes: str
+    audio: Optional[torch.FloatTensor]
+
+
+class StubPipeline:
+    """KPipeline stand-in: text is its own phonemes, one segment per sentence"""
+
+    def __init__(self, lang_code: str):
+        self.lang_code = lang_code
+
+    def load_single_voice(self, voice: str) -> torch.FloatTensor:
+        generator = torch.Generator().manual_seed(sum(map(ord, voice)))
+        return torch.randn(510, 1, 256, generator=generator)
+
+    def __call__(self, text: str, voice=None, speed: float = 1, model=None):
+        pack = self.load_single_voice(voice) if isinstance(voice, str) else voice
+        for sentence in split_sentences(text):
+            audio = model(sentence, pack[min(len(sentence), len(pack)) - 1], speed) if model else None
+            yield StubResult(sentence, sentence, audio)
+
+
+class StubEngine(KokoroEngine):
+    """KokoroEngine with the model and G2P replaced by stubs"""
+
+    def __init__(self, rtf: float = 0.1):
+        super().__init__()
+        self.device = "cpu"
+        self._rtf = rtf
+
+    def _load_model(self) -> StubModel:
+        return StubModel(self._rtf)
+
+    def _create_pipeline(self, lang_code: str) -> StubPipeline:
+        if lang_code not in self.pipelines:
+            self.pipelines[lang_code] = StubPipeline(lang_code)
+        return self.pipelines[lang_code]
+
+
+# Measurements
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def summarize(latencies: List[float], first_chunks: List[float], audio_seconds: float) -> Dict[str, float]:
+    """Latency percentiles and real-time factor of a series of runs"""
+    ms = np.array(latencies) * 1000
+    summary = {
+        "runs": len(latencies),
+        "latency_p50_ms": float(np.percentile(ms, 50)),
+        "latency_p95_ms": float(np.percentile(ms, 95)),
+        "latency_p99_ms": float(np.percentile(ms, 99)),
+        "rtf": float(sum(latencies) / audio_seconds) if audio_seconds else float("nan"),
+        "audio_seconds": audio_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if first_chunks:
+        summary["ttfc_p50_ms"] = float(np.percentile(np.array(first_chunks) * 1000, 50))
+        summary["ttfc_p95_ms"] = float(np.percentile(np.array(first_chunks) * 1000, 95))
+    return summary
+
+
+async def timed(chunks) -> Dict[str, float]:
+    """Drain a PCM chunk stream, timing the first chunk and the total"""
+    start = time.perf_counter()
+    first = None
+    size = 0
+    async for chunk in chunks:
+        if first is None and chunk:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    return {
+        "latency": time.perf_counter() - start,
+        "first_chunk": first if first is not None else float("nan"),
+        "audio_seconds": size / PCM_BYTES_PER_SAMPLE / settings.sample_rate,
+    }
+
+
+Request = Callable[[KokoroEngine], Any]
+
+
+async def run_series(engine: KokoroEngine, request: Request, runs: int, warmup: int = 1) -> Dict[str, float]:
+    """Run one request shape sequentially and summarize it"""
+    for _ in range(warmup):
+        await timed(request(engine))
+
+    latencies, first_chunks, audio_seconds = [], [], 0.0
+    for _ in range(runs):
+        result = await timed(request(engine))
+        latencies.append(result["latency"])
+        first_chunks.append(result["first_chunk"])
+        audio_seconds += result["audio_seconds"]
+    return summarize(latencies, first_chunks, audio_seconds)
+
+
+async def run_concurrency(
+    engine: KokoroEngine,
+    request: Request,
+    levels: List[int],
+    requests_per_level: int
+) -> Dict[str, Dict[str, float]]:
+    """Throughput and tail latency as concurrent clients increase"""
+    curve: Dict[str, Dict[str, float]] = {}
+
+    for level in levels:
+        latencies: List[float] = []
+        rejected = 0
+        audio_seconds = 0.0
+        remaining = requests_per_level
+
+        async def client():
+            nonlocal rejected, audio_seconds, remaining
+            while remaining > 0:
+                remaining -= 1
+                try:
+                    result = await timed(request(engine))
+                except EngineBusyError:
+                    rejected += 1
+                    continue
+                latencies.append(result["latency"])
+                audio_seconds += result["audio_seconds"]
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(level)))
+        wall = time.perf_counter() - start
+
+        ms = np.array(latencies) * 1000 if latencies else np.array([float("nan")])
+        curve[str(level)] = {
+            "requests_per_second": len(latencies) / wall,
+            "audio_seconds_per_second": audio_seconds / wall,
+            "latency_p50_ms": float(np.percentile(ms, 50)),
+            "latency_p95_ms": float(np.percentile(ms, 95)),
+            "latency_p99_ms": float(np.percentile(ms, 99)),
+            "rejected": rejected,
+        }
+    return curve
+
+
+# Scenarios
+
+def speak(text: str, voice: str = "luna", speed: float = 1.0) -> Request:
+    return lambda engine: engine.generate_speech(text, voice, speed, audio_format="pcm")
+
+
+def stream(text: str, voice: str = "luna", speed: float = 1.0) -> Request:
+    return lambda engine: engine.stream_speech(text, voice, speed, audio_format="pcm")
+
+
+def mix(text: str, voices: List[str], speed: float = 1.0) -> Request:
+    return lambda engine: engine.mix_voices(text, voices, speed=speed, audio_format="pcm")
+
+
+SCENARIOS: Dict[str, Request] = {
+    **{f"speak_{name}": speak(text) for name, text in TEXTS.items()},
+    **{f"stream_{name}": stream(text) for name, text in TEXTS.items()},
+    "speak_medium_fast": speak(TEXTS["medium"], speed=1.5),
+    "speak_medium_slow": speak(TEXTS["medium"], speed=0.75),
+    "speak_medium_male": speak(TEXTS["medium"], voice="pt-BR-m1"),
+    "mix_medium_2": mix(TEXTS["medium"], ["luna", "pt-BR-f2"]),
+    "mix_medium_3": mix(TEXTS["medium"], ["luna", "pt-BR-f2", "pt-BR-m1"]),
+}
+
+# Metrics where larger is worse, checked against the baseline
+REGRESSION_METRICS = ("latency_p50_ms", "latency_p95_ms", "ttfc_p50_ms", "rtf", "peak_rss_mb")
+
+
+async def benchmark(
+    engine: KokoroEngine,
+    scenarios: List[str],
+    runs: int,
+    levels: List[int],
+    requests_per_level: int
+) -> Dict[str, Any]:
+    """Run the selected scenarios and the concurrency sweep"""
+    results: Dict[str, Any] = {}
+    for name in scenarios:
+        print(f"⏱️  {name}...")
+        results[name] = await run_series(engine, SCENARIOS[name], runs)
+
+    if levels:
+        print(f"⏱️  concurrency {levels}...")
+        results["concurrency"] = await run_concurrency(
+            engine, stream(TEXTS["medium"]), levels, requests_per_level
+        )
+    return results
+
+
+def compare_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Metrics that got worse than the baseline by more than the tolerance"""
+    regressions = []
+    for name, metrics in results["scenarios"].items():
+        reference = baseline.get("scenarios", {}).get(name)
+        if not reference or name == "concurrency":
+            continue
+        for metric in REGRESSION_METRICS:
+            old, new = reference.get(metric), metrics.get(metric)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f"{name}.{metric}: {old:.2f} -> {new:.2f} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_table(scenarios: Dict[str, Any]):
+    print(f"\n{'scenario':<22}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'ttfc ms':>9}{'RTF':>8}{'RSS MB':>9}")
+    for name, r in scenarios.items():
+        if name == "concurrency":
+            continue
+        print(
+            f"{name:<22}{r['latency_p50_ms']:>9.1f}{r['latency_p95_ms']:>9.1f}{r['latency_p99_ms']:>9.1f}"
+            f"{r.get('ttfc_p50_ms', float('nan')):>9.1f}{r['rtf']:>8.3f}{r['peak_rss_mb']:>9.0f}"
+        )
+
+    curve = scenarios.get("concurrency")
+    if curve:
+        print(f"\n{'clients':<10}{'req/s':>9}{'audio s/s':>11}{'p95 ms':>9}{'rejected':>10}")
+        for level, r in curve.items():
+            print(
+                f"{level:<10}{r['requests_per_second']:>9.2f}{r['audio_seconds_per_second']:>11.2f}"
+                f"{r['latency_p95_ms']:>9.1f}{r['rejected']:>10}"
+            )
+
+
+async def run(args) -> int:
+    if not args.verbose:
+        # Per-request INFO logs would drown the report
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+
+    settings.enable_audio_cache = args.cache
+    if args.stub:
+        settings.inference_backend = "torch"
+        settings.enable_batching = False
+        engine = StubEngine(rtf=args.stub_rtf)
+    else:
+        engine = KokoroEngine()
+
+    if not await engine.initialize():
+        print("❌ Engine failed to initialize")
+        return 2
+
+    try:
+        scenarios = await benchmark(
+            engine,
+            args.scenario or list(SCENARIOS),
+            args.runs,
+            [] if args.no_concurrency else args.concurrency,
+            args.requests_per_level
+        )
+    finally:
+        await engine.cleanup()
+
+    results = {
+        "meta": {
+            "stub": args.stub,
+            "backend": settings.inference_backend,
+            "workers": settings.tts_workers,
+            "runs": args.runs,
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": scenarios,
+    }
+    print_table(scenarios)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2))
+        print(f"\n✅ Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Scenario to run (repeatable, default all)")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per scenario")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8], help="Client counts for the sweep")
+    parser.add_argument("--requests-per-level", type=int, default=16)
+    parser.add_argument("--no-concurrency", action="store_true", help="Skip the concurrency sweep")
+    parser.add_argument("--stub", action="store_true", help="Use the offline stub model")
+    parser.add_argument("--stub-rtf", type=float, default=0.1, help="Real-time factor of the stub model")
+    parser.add_argument("--verbose", action="store_true", help="Keep the engine's INFO logs")
+    parser.add_argument("--cache", action="store_true", help="Keep the audio cache enabled")
+    parser.add_argument("--save-baseline", type=Path, help="Write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown vs the baseline")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
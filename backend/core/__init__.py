@@ -3,5 +3,6 @@ Core modules for Lua TTS System
 """
 from .config import settings
 from .logger import logger
+from .readiness import Readiness
 
-__all__ = ["settings", "logger"]
\ No newline at end of file
+__all__ = ["settings", "logger", "Readiness"]
\ No newline at end of file
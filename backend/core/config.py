@@ -23,8 +23,37 @@ class Settings(BaseSettings):
     
     # Model Settings
     model_name: str = "kokoro-82m"
+    model_repo_id: str = "hexgrad/Kokoro-82M"
     device: str = "cpu"  # cpu, cuda, mps
     use_gpu: bool = False
+    inference_backend: str = "torch"  # torch, int8, compile, onnx
+    
+    # Inference Settings
+    tts_workers: int = 2  # concurrent synthesis jobs
+    tts_max_queue: int = 8  # jobs waiting for a worker before rejecting
+    torch_threads: int = 0  # intra-op threads (0 = torch default)
+    tts_max_batch_size: int = 8  # segments per batched forward pass
+    tts_batch_wait_ms: float = 10.0  # window for collecting a batch
+    tts_batch_timeout_seconds: float = 120.0  # longest a segment waits for its batch
+    g2p_cache_size: int = 4096  # memoized G2P results
+    voice_mix_cache_size: int = 32  # blended voice packs kept in memory
+    long_text_threshold: int = 400  # chars above which sentences run in parallel
+    long_text_chunk_chars: int = 200  # target size of each parallel part
+    crossfade_ms: float = 10.0  # blend length at part joins
+    
+    # Admission Control Settings
+    admission_concurrency: int = 0  # requests synthesizing at once (0 = tts_workers)
+    admission_per_client: int = 2  # active + waiting requests per client
+    admission_max_waiting: int = 32
+    admission_deadline_interactive_ms: float = 2000.0  # longest wait before a 503
+    admission_deadline_preview_ms: float = 5000.0
+    admission_deadline_bulk_ms: float = 30000.0
+    
+    # Batch Job Settings
+    batch_workers: int = 1  # items rendered at once in the API process (0 = external workers only)
+    batch_max_items: int = 1000  # texts per job
+    batch_max_attempts: int = 3
+    batch_stale_seconds: float = 600.0  # claim age after which a lost item is retried
     
     # Voice Settings
     default_voice: str = "pt-BR-f1"
@@ -36,19 +65,56 @@ class Settings(BaseSettings):
     models_dir: Path = base_dir / "models"
     voices_dir: Path = base_dir / "voices"
     temp_dir: Path = base_dir / "temp"
+    cache_dir: Path = base_dir / "cache"
+    batch_db_path: Path = cache_dir / "batch_jobs.db"
+    batch_output_dir: Path = cache_dir / "batch"
     
     # Audio Settings
     sample_rate: int = 24000
     audio_format: str = "wav"
     
+    # Audio Cache Settings
+    audio_cache_memory_mb: int = 64
+    audio_cache_disk_mb: int = 512
+    audio_cache_ttl_hours: float = 168.0
+    audio_cache_max_chars: int = 500  # longer texts are not cached
+    
+    # Assistant Settings
+    intents_path: Optional[Path] = None  # JSON intent rules (None = bundled)
+    
+    # Conversation Settings
+    conversation_max_messages: int = 200  # history kept in memory per session
+    conversation_idle_minutes: float = 30.0  # inactivity before a session leaves memory
+    conversation_max_sessions: int = 10000
+    conversation_db_path: Optional[Path] = None  # SQLite file (None = memory only)
+    
     # Logging
     log_level: str = "INFO"
     
+    # Tracing Settings
+    trace_sample_rate: float = 0.0  # fraction of requests traced without the header
+    trace_dir: Path = base_dir / "traces"
+    trace_format: str = "jsonl"  # jsonl (one trace per line), chrome (file per trace)
+    trace_torch_profiler: bool = False  # capture torch.profiler for every traced forward
+    
     # Features
     enable_web_player: bool = True
     enable_voice_mixing: bool = True
     enable_streaming: bool = True
+    enable_metrics: bool = True  # /metrics endpoint and request timing
+    enable_tracing: bool = False  # honor X-Lua-Trace and trace_sample_rate
+    enable_admission_control: bool = True  # prioritize and bound synthesis requests
+    enable_batch_jobs: bool = True  # /api/batch job queue
+    enable_batching: bool = False  # micro-batch concurrent forward passes
+    enable_audio_cache: bool = True
+    enable_parallel_long_text: bool = True
+    serve_while_warming: bool = False  # accept traffic before the model is ready
     
+    def ensure_directories(self):
+        """Create the data directories (called at startup, not import)"""
+        for directory in (self.models_dir, self.voices_dir, self.temp_dir, self.cache_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+            
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -56,8 +122,3 @@ class Settings(BaseSettings):
 
 # Create global settings instance
 settings = Settings()
-
-# Create necessary directories
-settings.models_dir.mkdir(parents=True, exist_ok=True)
-settings.voices_dir.mkdir(parents=True, exist_ok=True)
-settings.temp_dir.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
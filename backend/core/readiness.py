@@ -0,0 +1,71 @@
+"""
+Readiness state machine for Lua TTS System startup
+"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .logger import logger
+
+
+class Readiness:
+    """Tracks startup stages and how long each one took"""
+
+    STARTING = "starting"
+    LOADING = "loading"
+    WARMING = "warming"
+    READY = "ready"
+    FAILED = "failed"
+    STOPPING = "stopping"
+
+    # Allowed transitions
+    TRANSITIONS = {
+        STARTING: {LOADING, FAILED, STOPPING},
+        LOADING: {WARMING, READY, FAILED, STOPPING},
+        WARMING: {READY, FAILED, STOPPING},
+        READY: {STOPPING},
+        FAILED: {LOADING, STOPPING},
+        STOPPING: {STARTING, LOADING},
+    }
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = self.STARTING
+        self.error: Optional[str] = None
+        self._history: List[Tuple[str, float]] = [(self.state, time.monotonic())]
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == self.READY
+
+    def advance(self, state: str, error: Optional[str] = None):
+        """
+        Move to a new state
+
+        Raises:
+            ValueError: If the transition is not allowed
+        """
+        if state == self.state:
+            return
+        if state not in self.TRANSITIONS[self.state]:
+            raise ValueError(f"{self.name}: invalid transition {self.state} -> {state}")
+
+        elapsed = time.monotonic() - self._history[-1][1]
+        logger.info(f"{self.name}: {self.state} -> {state} ({elapsed:.2f}s)")
+
+        self.state = state
+        self.error = error
+        self._history.append((state, time.monotonic()))
+
+    def as_dict(self) -> Dict[str, Any]:
+        """State, time spent per stage and any failure reason"""
+        now = time.monotonic()
+        stages: Dict[str, float] = {}
+        for (state, started), (_, ended) in zip(self._history, self._history[1:] + [(None, now)]):
+            stages[state] = round(stages.get(state, 0.0) + ended - started, 3)
+
+        return {
+            "state": self.state,
+            "since_seconds": round(now - self._history[-1][1], 3),
+            "stages": stages,
+            "error": self.error,
+        }
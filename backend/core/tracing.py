@@ -0,0 +1,229 @@
+"""
+Opt-in per-request tracing for Lua TTS System
+Stage spans (normalization, G2P, forward pass, encoding, network writes)
+recorded on the request's trace, exported as JSONL or Chrome trace files
+"""
+import asyncio
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import settings
+from .logger import logger
+
+TRACE_HEADER = "x-lua-trace"
+TRACE_ID_HEADER = "x-lua-trace-id"
+
+_current: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("lua_trace", default=None)
+
+
+class _NullSpan:
+    """Span used when the request is not traced; attrs written to it are dropped"""
+
+    def __enter__(self) -> Dict[str, Any]:
+        return {}
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Trace:
+    """Spans recorded for one request"""
+
+    def __init__(self, name: str, profile: bool = False):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.profile = profile
+        self.started = time.perf_counter()
+        self.wall_started = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self.attrs: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+        """Time a stage; attrs may be added to the yielded dict while it runs"""
+        record = {
+            "name": name,
+            "start": time.perf_counter() - self.started,
+            "thread": threading.current_thread().name,
+            "attrs": attrs,
+        }
+        try:
+            yield attrs
+        finally:
+            record["duration"] = time.perf_counter() - self.started - record["start"]
+            with self._lock:
+                self.spans.append(record)
+
+    def duration(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> Dict[str, float]:
+        """Total seconds per span name"""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for record in self.spans:
+                totals[record["name"]] = totals.get(record["name"], 0.0) + record["duration"]
+        return {name: round(total, 6) for name, total in totals.items()}
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start"])
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "timestamp": self.wall_started,
+            "duration": self.duration(),
+            "attrs": self.attrs,
+            "summary": self.summary(),
+            "spans": spans,
+        }
+
+    def as_chrome(self) -> Dict[str, Any]:
+        """Chrome trace event format (chrome://tracing, Perfetto)"""
+        threads: Dict[str, int] = {}
+        events = [{
+            "name": self.name, "ph": "X", "pid": 1, "tid": 0,
+            "ts": 0, "dur": self.duration() * 1e6, "args": self.attrs,
+        }]
+        with self._lock:
+            spans = list(self.spans)
+        for record in spans:
+            tid = threads.setdefault(record["thread"], len(threads) + 1)
+            events.append({
+                "name": record["name"], "ph": "X", "pid": 1, "tid": tid,
+                "ts": record["start"] * 1e6, "dur": record["duration"] * 1e6,
+                "args": record["attrs"],
+            })
+        events.extend(
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": thread}}
+            for thread, tid in threads.items()
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def current() -> Optional[Trace]:
+    """Trace of the running request, if it is being traced"""
+    return _current.get()
+
+
+def span(name: str, **attrs: Any):
+    """Span on the current trace; a shared no-op when not tracing"""
+    trace = _current.get()
+    if trace is None:
+        return _NULL_SPAN
+    return trace.span(name, **attrs)
+
+
+@contextmanager
+def start_trace(name: str, profile: bool = False) -> Iterator[Trace]:
+    """Trace everything run in this context (and the workers it submits to)"""
+    trace = Trace(name, profile=profile)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def should_trace(header: Optional[str]) -> bool:
+    """Traced when asked by header, otherwise by sampling rate"""
+    if header:
+        return header.lower() not in ("0", "false", "off")
+    rate = settings.trace_sample_rate
+    return rate > 0 and random.random() < rate
+
+
+def export(trace: Trace) -> Path:
+    """
+    Write a finished trace to settings.trace_dir
+
+    Returns:
+        The file written (traces.jsonl, or trace_<id>.json in chrome format)
+    """
+    directory = Path(settings.trace_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    if settings.trace_format == "chrome":
+        path = directory / f"trace_{trace.trace_id}.json"
+        path.write_text(json.dumps(trace.as_chrome()))
+    else:
+        path = directory / "traces.jsonl"
+        line = json.dumps(trace.as_dict(), ensure_ascii=False) + "\n"
+        # One write per trace keeps lines whole across concurrent exports
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    logger.debug(f"Trace {trace.trace_id} ({trace.name}) written to {path}")
+    return path
+
+
+def profile_path(trace: Trace, label: str) -> Path:
+    """File for a torch.profiler capture belonging to a trace"""
+    directory = Path(settings.trace_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"torch_{trace.trace_id}_{label}_{os.getpid()}.json"
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware starting a trace for sampled or flagged requests
+
+    Send "X-Lua-Trace: 1" to trace a request ("X-Lua-Trace: profile" also
+    captures torch.profiler); the trace id comes back in X-Lua-Trace-Id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = None
+        for key, value in scope["headers"]:
+            if key == TRACE_HEADER.encode():
+                header = value.decode("latin-1")
+                break
+
+        if not should_trace(header):
+            await self.app(scope, receive, send)
+            return
+
+        profile = header == "profile" or settings.trace_torch_profiler
+        with start_trace(f"{scope['method']} {scope['path']}", profile=profile) as trace:
+            status = 500
+
+            async def send_wrapper(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    headers = list(message.get("headers", []))
+                    headers.append((TRACE_ID_HEADER.encode(), trace.trace_id.encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                trace.attrs.update(
+                    route=getattr(route, "path", None),
+                    status=status
+                )
+                try:
+                    await asyncio.to_thread(export, trace)
+                except Exception as e:
+                    logger.warning(f"Could not export trace {trace.trace_id}: {e}")
@@ -4,6 +4,7 @@ Sistema de IA Conversacional com Kokoro-82M
 """
 import os
 import sys
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional, Dict, Any, List
@@ -11,22 +12,47 @@ import json
 import base64
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException, File, UploadFile, Query
+from fastapi import FastAPI, HTTPException, File, UploadFile, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse, PlainTextResponse
 from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
 import uvicorn
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from backend.core import settings, logger
+from backend.core import settings, logger, Readiness
+from backend.core.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from backend.core.tracing import TracingMiddleware, span
 from backend.modules.lua import LuaAssistant
+from backend.modules.tts.admission import (
+    AdmissionController, AdmissionError, Ticket, INTERACTIVE, PREVIEW, BULK
+)
+from backend.modules.tts.jobs import (
+    ARCHIVE_FORMATS, BatchRunner, JobQueue, OutputStore, archive_stream, open_queue, register_metrics
+)
 from backend.modules.tts.kokoro_engine import KokoroEngine
+from backend.modules.tts.provider import engine_provider
+from backend.modules.tts.audio_encoder import get_encoder
 
 # Global instances
 lua_assistant: Optional[LuaAssistant] = None
 tts_engine: Optional[KokoroEngine] = None
+batch_queue: Optional[JobQueue] = None
+batch_store: Optional[OutputStore] = None
+batch_runner: Optional[BatchRunner] = None
+admission = AdmissionController(
+    concurrency=settings.admission_concurrency or settings.tts_workers,
+    per_client=settings.admission_per_client,
+    max_waiting=settings.admission_max_waiting,
+    deadlines={
+        INTERACTIVE: settings.admission_deadline_interactive_ms / 1000,
+        PREVIEW: settings.admission_deadline_preview_ms / 1000,
+        BULK: settings.admission_deadline_bulk_ms / 1000,
+    },
+    enabled=settings.enable_admission_control
+)
 
 
 # Pydantic models
@@ -35,6 +61,8 @@ class TTSRequest(BaseModel):
     text: str = Field(..., description="Text to synthesize")
     voice: Optional[str] = Field("luna", description="Voice to use")
     speed: Optional[float] = Field(1.0, ge=0.5, le=2.0, description="Speech speed")
+    audio_format: Optional[str] = Field(None, description="Audio format (wav, pcm, flac, ogg, opus, mp3)")
+    stream: Optional[bool] = Field(None, description="Progressive streaming (defaults to settings)")
     
 class VoiceMixRequest(BaseModel):
     """Voice mixing request model"""
@@ -42,56 +70,126 @@ class VoiceMixRequest(BaseModel):
     voices: List[str] = Field(..., description="List of voices to mix")
     weights: Optional[List[float]] = Field(None, description="Voice weights")
     speed: Optional[float] = Field(1.0, ge=0.5, le=2.0, description="Speech speed")
+    audio_format: Optional[str] = Field(None, description="Audio format (wav, pcm, flac, ogg, opus, mp3)")
+    stream: Optional[bool] = Field(None, description="Progressive streaming (defaults to settings)")
     
 class ChatRequest(BaseModel):
     """Chat request model"""
     message: str = Field(..., description="User message")
     user_id: Optional[str] = Field(None, description="User identifier")
+    session_id: Optional[str] = Field(None, description="Conversation to continue (defaults per user)")
     context: Optional[Dict[str, Any]] = Field(None, description="Additional context")
     voice_response: Optional[bool] = Field(False, description="Return voice response")
     
+class BatchItem(BaseModel):
+    """One text of a batch job"""
+    text: str = Field(..., min_length=1, description="Text to synthesize")
+    voice: Optional[str] = Field(None, description="Voice (defaults to the job's)")
+    speed: Optional[float] = Field(None, ge=0.5, le=2.0, description="Speech speed (defaults to the job's)")
+    
+class BatchRequest(BaseModel):
+    """Batch synthesis job model"""
+    items: List[BatchItem] = Field(..., min_length=1, description="Texts to synthesize")
+    voice: Optional[str] = Field("luna", description="Default voice")
+    speed: Optional[float] = Field(1.0, ge=0.5, le=2.0, description="Default speech speed")
+    audio_format: Optional[str] = Field(None, description="Audio format of every file (wav, pcm, flac, ogg, opus, mp3)")
+    
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifespan manager"""
-    global lua_assistant, tts_engine
+async def start_services() -> bool:
+    """
+    Bring up the shared TTS engine and the Lua Assistant
     
-    # Startup
-    logger.info("=" * 50)
-    logger.info("🚀 Starting Lua TTS System...")
-    logger.info("=" * 50)
+    Nothing is published unless both are ready: on failure the provider
+    reference is dropped and the routes keep answering 503.
+    """
+    global lua_assistant, tts_engine, batch_runner
     
+    engine = None
+    assistant = None
     try:
-        # Initialize TTS Engine
+        # Initialize the shared TTS Engine (also used by Lua Assistant)
         logger.info("Initializing TTS Engine...")
-        tts_engine = KokoroEngine()
-        await tts_engine.initialize()
+        engine = await engine_provider.acquire()
+        if not engine.is_initialized:
+            raise RuntimeError("TTS engine failed to initialize")
         
         # Initialize Lua Assistant
         logger.info("Initializing Lua Assistant...")
-        lua_assistant = LuaAssistant()
-        await lua_assistant.initialize()
+        assistant = LuaAssistant()
+        if not await assistant.initialize():
+            raise RuntimeError("Lua Assistant failed to initialize")
+        
+        # Drain batch jobs with whatever capacity live traffic leaves
+        if batch_queue is not None and settings.batch_workers > 0:
+            batch_runner = BatchRunner(
+                batch_queue,
+                batch_store,
+                engine,
+                workers=settings.batch_workers,
+                admission=admission
+            )
+            batch_runner.start()
+            
+        # Publish only once ready, so routes answer 503 while warming
+        tts_engine, lua_assistant = engine, assistant
         
         logger.info("=" * 50)
         logger.info("✅ System ready!")
         logger.info(f"🌐 API: http://{settings.host}:{settings.port}")
         logger.info(f"📚 Docs: http://{settings.host}:{settings.port}/docs")
         logger.info("=" * 50)
+        return True
         
     except Exception as e:
         logger.error(f"❌ Startup failed: {e}")
-        raise
+        if assistant is not None:
+            await assistant.cleanup()
+        if engine is not None:
+            await engine_provider.release()
+        return False
+        
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan manager"""
+    global batch_queue, batch_store
+    
+    # Startup
+    logger.info("=" * 50)
+    logger.info("🚀 Starting Lua TTS System...")
+    logger.info("=" * 50)
+    
+    settings.ensure_directories()
+    
+    if settings.enable_batch_jobs:
+        batch_queue = open_queue()
+        batch_store = OutputStore(settings.batch_output_dir)
+        register_metrics(batch_queue)
+        
+    startup = asyncio.create_task(start_services())
+    
+    if settings.serve_while_warming:
+        logger.info("Serving while the model warms up (see /ready)")
+    elif not await startup:
+        raise RuntimeError("Lua TTS System failed to start")
         
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down Lua TTS System...")
     
+    if not startup.done():
+        startup.cancel()
+        
     try:
+        if batch_runner:
+            await batch_runner.stop()
+        if batch_queue:
+            batch_queue.close()
         if lua_assistant:
             await lua_assistant.cleanup()
         if tts_engine:
-            await tts_engine.cleanup()
+            await engine_provider.release()
     except Exception as e:
         logger.error(f"Shutdown error: {e}")
         
@@ -116,6 +214,49 @@ if settings.cors_enabled:
         allow_headers=["*"]
     )
 
+# Request metrics (pure ASGI, outermost so CORS preflights are counted too)
+if settings.enable_metrics:
+    app.add_middleware(MetricsMiddleware)
+    
+# Per-request stage tracing (opt-in by header or sampling)
+if settings.enable_tracing:
+    app.add_middleware(TracingMiddleware)
+
+
+async def admit(http: Request, priority: str, user_id: Optional[str] = None) -> Ticket:
+    """
+    Wait for a synthesis slot in the given priority class
+    
+    Clients are told apart by X-Client-Id, then user id, then address.
+    With admission control disabled, only a full inference queue is rejected.
+    """
+    if not admission.enabled and tts_engine and tts_engine.is_busy:
+        raise HTTPException(status_code=503, detail="TTS engine busy, try again later")
+        
+    client_id = http.headers.get("x-client-id") or user_id or (http.client.host if http.client else "anonymous")
+    try:
+        return await admission.acquire(client_id, priority)
+    except AdmissionError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+def release_task(ticket: Ticket) -> BackgroundTask:
+    """
+    Response background task that frees a synthesis slot
+    
+    Async so it runs on the event loop: a sync task would run on a
+    threadpool thread, and the admission controller wakes waiters by
+    resolving loop-owned futures, which is not thread-safe.
+    """
+    async def release():
+        ticket.release()
+        
+    return BackgroundTask(release)
+
 
 # Routes
 @app.get("/")
@@ -136,19 +277,50 @@ async def root():
     }
 
 
+def startup_state() -> Dict[str, Any]:
+    """Readiness of the shared engine (starting until it exists)"""
+    engine = engine_provider.engine
+    if engine is None:
+        return {"state": Readiness.STARTING}
+    return engine.readiness.as_dict()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    readiness = startup_state()
     return {
-        "status": "healthy",
+        "status": "healthy" if readiness["state"] == Readiness.READY else readiness["state"],
         "timestamp": datetime.now().isoformat(),
+        "readiness": readiness,
         "services": {
             "tts_engine": tts_engine is not None and tts_engine.is_initialized,
             "lua_assistant": lua_assistant is not None and lua_assistant.is_initialized
-        }
+        },
+        "engine": engine_provider.stats(),
+        "admission": admission.stats()
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the model is loaded and warmed up"""
+    readiness = startup_state()
+    ready = readiness["state"] == Readiness.READY and lua_assistant is not None
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, **readiness}
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    if not settings.enable_metrics:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/api/voice/voices")
 async def get_voices():
     """Get available voices"""
@@ -164,71 +336,132 @@ async def get_voices():
     }
 
 
+@app.get("/api/voice/cache")
+async def get_cache_stats():
+    """Get synthesized-audio cache statistics"""
+    if not tts_engine:
+        raise HTTPException(status_code=503, detail="TTS engine not initialized")
+        
+    return {
+        "success": True,
+        "enabled": tts_engine.cache is not None,
+        "stats": tts_engine.cache.stats() if tts_engine.cache else {},
+        "g2p": tts_engine.g2p_cache.stats(),
+        "voice_mix": tts_engine.voice_mixer.stats()
+    }
+
+
 @app.post("/api/voice/speak")
-async def text_to_speech(request: TTSRequest):
+async def text_to_speech(request: TTSRequest, http: Request):
     """Convert text to speech"""
     if not tts_engine:
         raise HTTPException(status_code=503, detail="TTS engine not initialized")
         
+    try:
+        encoder = get_encoder(request.audio_format or settings.audio_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+        
+    stream = settings.enable_streaming if request.stream is None else request.stream
+    
+    # Long documents yield to previews and conversation
+    priority = BULK if len(request.text) > settings.long_text_threshold else PREVIEW
+    ticket = await admit(http, priority)
+        
     try:
         logger.info(f"TTS request: '{request.text[:50]}...' with voice '{request.voice}'")
         
-        async def audio_generator():
-            async for chunk in tts_engine.generate_speech(
+        if stream:
+            # Single header, then frames as the model produces them
+            synthesis = tts_engine.stream_speech(
+                text=request.text,
+                voice=request.voice,
+                speed=request.speed,
+                audio_format=encoder.name
+            )
+        else:
+            synthesis = tts_engine.generate_speech(
                 text=request.text,
                 voice=request.voice,
-                speed=request.speed
-            ):
-                yield chunk
+                speed=request.speed,
+                audio_format=encoder.name
+            )
+            
+        async def audio_generator():
+            try:
+                async for chunk in synthesis:
+                    with span("write", bytes=len(chunk)):
+                        yield chunk
+            finally:
+                ticket.release()
                 
         return StreamingResponse(
             audio_generator(),
-            media_type="audio/wav",
+            media_type=encoder.media_type,
             headers={
-                "Content-Disposition": "inline; filename=speech.wav",
+                "Content-Disposition": f"inline; filename=speech.{encoder.extension}",
                 "Cache-Control": "no-cache"
-            }
+            },
+            # Also frees the slot if the client leaves before streaming starts
+            background=release_task(ticket)
         )
         
     except Exception as e:
+        ticket.release()
         logger.error(f"TTS failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/voice/mix")
-async def mix_voices(request: VoiceMixRequest):
+async def mix_voices(request: VoiceMixRequest, http: Request):
     """Generate speech with mixed voices"""
     if not tts_engine:
         raise HTTPException(status_code=503, detail="TTS engine not initialized")
         
+    try:
+        encoder = get_encoder(request.audio_format or settings.audio_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+        
+    stream = settings.enable_streaming if request.stream is None else request.stream
+    ticket = await admit(http, PREVIEW)
+        
     try:
         logger.info(f"Voice mix request: {len(request.voices)} voices")
         
         async def audio_generator():
-            async for chunk in tts_engine.mix_voices(
-                text=request.text,
-                voices=request.voices,
-                weights=request.weights,
-                speed=request.speed
-            ):
-                yield chunk
+            try:
+                async for chunk in tts_engine.mix_voices(
+                    text=request.text,
+                    voices=request.voices,
+                    weights=request.weights,
+                    speed=request.speed,
+                    audio_format=encoder.name,
+                    stream=stream
+                ):
+                    with span("write", bytes=len(chunk)):
+                        yield chunk
+            finally:
+                ticket.release()
                 
         return StreamingResponse(
             audio_generator(),
-            media_type="audio/wav",
+            media_type=encoder.media_type,
             headers={
-                "Content-Disposition": "inline; filename=mixed_speech.wav",
+                "Content-Disposition": f"inline; filename=mixed_speech.{encoder.extension}",
                 "Cache-Control": "no-cache"
-            }
+            },
+            background=release_task(ticket)
         )
         
     except Exception as e:
+        ticket.release()
         logger.error(f"Voice mixing failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/chat")
-async def chat_with_lua(request: ChatRequest):
+async def chat_with_lua(request: ChatRequest, http: Request):
     """Chat with Lua Assistant"""
     if not lua_assistant:
         raise HTTPException(status_code=503, detail="Lua Assistant not initialized")
@@ -240,41 +473,54 @@ async def chat_with_lua(request: ChatRequest):
         response = await lua_assistant.process_message(
             message=request.message,
             user_id=request.user_id,
-            context=request.context
+            context=request.context,
+            session_id=request.session_id
         )
         
         # Add voice response if requested
         if request.voice_response and response["success"]:
-            audio_data = b""
-            async for chunk in lua_assistant.speak(response["response"]):
-                audio_data += chunk
-                
+            ticket = await admit(http, INTERACTIVE, request.user_id)
+            try:
+                chunks = [
+                    chunk async for chunk in lua_assistant.speak(response["response"])
+                ]
+            finally:
+                ticket.release()
+            
             # Encode audio as base64
-            response["audio"] = base64.b64encode(audio_data).decode("utf-8")
+            response["audio"] = base64.b64encode(b"".join(chunks)).decode("utf-8")
             response["audio_format"] = "wav"
             
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Chat failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/chat/voice")
-async def chat_with_voice_response(request: ChatRequest):
+async def chat_with_voice_response(request: ChatRequest, http: Request):
     """Chat with Lua and get voice response"""
     if not lua_assistant:
         raise HTTPException(status_code=503, detail="Lua Assistant not initialized")
+    ticket = await admit(http, INTERACTIVE, request.user_id)
         
     try:
         logger.info(f"Voice chat request from {request.user_id or 'anonymous'}")
         
         async def audio_generator():
-            async for chunk in lua_assistant.speak_response(
-                message=request.message,
-                user_id=request.user_id
-            ):
-                yield chunk
+            try:
+                async for chunk in lua_assistant.speak_response(
+                    message=request.message,
+                    user_id=request.user_id,
+                    session_id=request.session_id
+                ):
+                    with span("write", bytes=len(chunk)):
+                        yield chunk
+            finally:
+                ticket.release()
                 
         return StreamingResponse(
             audio_generator(),
@@ -282,34 +528,158 @@ async def chat_with_voice_response(request: ChatRequest):
             headers={
                 "Content-Disposition": "inline; filename=lua_response.wav",
                 "Cache-Control": "no-cache"
-            }
+            },
+            background=release_task(ticket)
         )
         
     except Exception as e:
+        ticket.release()
         logger.error(f"Voice chat failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def require_batch_job(job_id: str, with_items: bool = False) -> Dict[str, Any]:
+    """Look up a batch job or answer 404"""
+    if batch_queue is None:
+        raise HTTPException(status_code=503, detail="Batch jobs disabled")
+    job = batch_queue.get(job_id, with_items=with_items)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/api/batch", status_code=202)
+async def submit_batch(request: BatchRequest):
+    """Queue many texts for offline synthesis; poll the returned job"""
+    if batch_queue is None:
+        raise HTTPException(status_code=503, detail="Batch jobs disabled")
+    if len(request.items) > settings.batch_max_items:
+        raise HTTPException(status_code=400, detail=f"At most {settings.batch_max_items} items per job")
+        
+    try:
+        encoder = get_encoder(request.audio_format or settings.audio_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+        
+    items = [
+        {
+            "text": item.text,
+            "voice": item.voice or request.voice,
+            "speed": item.speed or request.speed,
+            "lang_code": settings.default_voice_code
+        }
+        for item in request.items
+    ]
+    job_id = await asyncio.to_thread(batch_queue.submit, items, encoder.name)
+    if batch_runner:
+        batch_runner.notify()
+        
+    logger.info(f"Batch job {job_id} queued with {len(items)} items")
+    return {
+        "success": True,
+        "job_id": job_id,
+        "total": len(items),
+        "status_url": f"/api/batch/{job_id}",
+        "download_url": f"/api/batch/{job_id}/download"
+    }
+
+
+@app.get("/api/batch/{job_id}")
+async def get_batch(job_id: str, items: bool = Query(False, description="Include per-item status")):
+    """Progress of a batch job"""
+    job = await asyncio.to_thread(require_batch_job, job_id, items)
+    return {"success": True, **job}
+
+
+@app.get("/api/batch/{job_id}/items/{index}")
+async def get_batch_item(job_id: str, index: int):
+    """Download one finished file of a batch job"""
+    job = await asyncio.to_thread(require_batch_job, job_id, True)
+    if not 0 <= index < job["total"]:
+        raise HTTPException(status_code=404, detail="Item not found")
+        
+    item = job["items"][index]
+    if not item["digest"]:
+        raise HTTPException(status_code=409, detail=f"Item is {item['status']}")
+        
+    encoder = get_encoder(job["audio_format"])
+    return FileResponse(
+        batch_store.path(item["digest"], encoder.extension),
+        media_type=encoder.media_type,
+        filename=f"{index:05d}_{item['voice']}.{encoder.extension}"
+    )
+
+
+@app.get("/api/batch/{job_id}/download")
+async def download_batch(
+    job_id: str,
+    archive: str = Query("zip", description=f"Archive format ({', '.join(ARCHIVE_FORMATS)})"),
+    partial: bool = Query(False, description="Download finished files of an unfinished job")
+):
+    """Stream the files of a batch job as one archive"""
+    if archive not in ARCHIVE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown archive format: {archive}")
+        
+    job = await asyncio.to_thread(require_batch_job, job_id)
+    if job["done"] + job["failed"] < job["total"] and job["status"] != "cancelled" and not partial:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']} ({job['progress']:.0%})")
+        
+    outputs = await asyncio.to_thread(batch_queue.outputs, job_id)
+    media_type = "application/zip" if archive == "zip" else "application/x-tar"
+    # Sync generator: Starlette iterates it on a worker thread
+    return StreamingResponse(
+        archive_stream(job, outputs, batch_store, archive),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=batch_{job_id}.{archive}"}
+    )
+
+
+@app.delete("/api/batch/{job_id}")
+async def cancel_batch(job_id: str):
+    """Cancel the items of a batch job that have not started"""
+    await asyncio.to_thread(require_batch_job, job_id)
+    cancelled = await asyncio.to_thread(batch_queue.cancel, job_id)
+    return {"success": True, "cancelled": cancelled}
+
+
 @app.get("/api/chat/history")
-async def get_chat_history():
-    """Get chat history"""
+async def get_chat_history(
+    session_id: Optional[str] = Query(None, description="Conversation (defaults per user)"),
+    user_id: Optional[str] = Query(None, description="User identifier"),
+    limit: int = Query(50, ge=1, le=200, description="Messages per page"),
+    before: Optional[int] = Query(None, ge=1, description="Cursor from next_before")
+):
+    """Get one page of chat history, newest first"""
     if not lua_assistant:
         raise HTTPException(status_code=503, detail="Lua Assistant not initialized")
         
+    page = await asyncio.to_thread(
+        lua_assistant.get_conversation_history,
+        lua_assistant.resolve_session(session_id, user_id),
+        limit,
+        before
+    )
     return {
         "success": True,
-        "history": lua_assistant.get_conversation_history(),
-        "session_id": lua_assistant.session_id
+        "history": page["messages"],
+        "session_id": page["session_id"],
+        "next_before": page["next_before"]
     }
 
 
 @app.delete("/api/chat/history")
-async def clear_chat_history():
+async def clear_chat_history(
+    session_id: Optional[str] = Query(None, description="Conversation (defaults per user)"),
+    user_id: Optional[str] = Query(None, description="User identifier")
+):
     """Clear chat history"""
     if not lua_assistant:
         raise HTTPException(status_code=503, detail="Lua Assistant not initialized")
         
-    lua_assistant.clear_conversation()
+    await asyncio.to_thread(
+        lua_assistant.clear_conversation,
+        lua_assistant.resolve_session(session_id, user_id)
+    )
     return {"success": True, "message": "Chat history cleared"}
 
 
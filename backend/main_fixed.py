@@ -14,7 +14,7 @@ from datetime import datetime
 
 from fastapi import FastAPI, HTTPException, File, UploadFile, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 import uvicorn
@@ -23,8 +23,18 @@ import uvicorn
 sys.path.append(str(Path(__file__).parent.parent))
 
 from backend.core import settings, logger
+from backend.core.metrics import CONTENT_TYPE, WS_CONNECTIONS, MetricsMiddleware, registry
+from backend.core.tracing import TracingMiddleware
 from backend.modules.lua import LuaAssistant
 from backend.modules.tts.kokoro_engine import KokoroEngine
+from backend.modules.tts.provider import engine_provider
+from backend.modules.tts.audio_encoder import get_encoder
+from backend.modules.tts.stream_protocol import (
+    FRAME_AUDIO,
+    FRAME_END,
+    PROTOCOL_VERSION,
+    pack_frame,
+)
 
 # Global instances
 lua_assistant: Optional[LuaAssistant] = None
@@ -61,9 +71,11 @@ class ConnectionManager:
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        WS_CONNECTIONS.inc()
         
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
+        WS_CONNECTIONS.dec()
         
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
@@ -89,11 +101,12 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting Lua TTS System (FIXED)...")
     logger.info("=" * 50)
     
+    settings.ensure_directories()
+    
     try:
-        # Initialize TTS Engine
+        # Initialize the shared TTS Engine (also used by Lua Assistant)
         logger.info("Initializing TTS Engine...")
-        tts_engine = KokoroEngine()
-        await tts_engine.initialize()
+        tts_engine = await engine_provider.acquire()
         
         # Initialize Lua Assistant
         logger.info("Initializing Lua Assistant...")
@@ -113,6 +126,8 @@ async def lifespan(app: FastAPI):
         class MockEngine:
             async def generate_speech(self, text, voice="luna", speed=1.0, lang_code="p"):
                 yield b"mock_audio_data"
+            async def stream_speech(self, text, voice="luna", speed=1.0, lang_code="p", audio_format="wav"):
+                yield b"mock_audio_data"
             async def mix_voices(self, text, voices, weights=None, speed=1.0):
                 yield b"mock_mixed_audio"
             def get_available_voices(self):
@@ -134,8 +149,8 @@ async def lifespan(app: FastAPI):
     try:
         if lua_assistant and hasattr(lua_assistant, 'cleanup'):
             await lua_assistant.cleanup()
-        if tts_engine and hasattr(tts_engine, 'cleanup'):
-            await tts_engine.cleanup()
+        if isinstance(tts_engine, KokoroEngine):
+            await engine_provider.release()
     except Exception as e:
         logger.error(f"Shutdown error: {e}")
 
@@ -157,6 +172,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics
+if settings.enable_metrics:
+    app.add_middleware(MetricsMiddleware)
+
+# Per-request stage tracing (opt-in by header or sampling)
+if settings.enable_tracing:
+    app.add_middleware(TracingMiddleware)
+
 # Mount static files
 frontend_path = Path(__file__).parent.parent / "frontend"
 if frontend_path.exists():
@@ -164,6 +187,14 @@ if frontend_path.exists():
     app.mount("/videos", StaticFiles(directory=str(frontend_path / "public" / "videos")), name="videos")
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    if not settings.enable_metrics:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
 # Health check endpoint
 @app.get("/health")
 @app.get("/api/health")
@@ -301,18 +332,90 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def stream_utterance(
+    websocket: WebSocket,
+    utterance_id: int,
+    text: str,
+    audio_format: str
+):
+    """Synthesize text and send each segment as a binary frame once ready"""
+    encoder = get_encoder(audio_format)
+    sequence = 0
+    status = "completed"
+    
+    try:
+        await manager.send_personal_message(json.dumps({
+            "type": "audio_start",
+            "utterance_id": utterance_id,
+            "format": encoder.name,
+            "media_type": encoder.media_type,
+            "sample_rate": settings.sample_rate,
+            "timestamp": datetime.now().isoformat()
+        }), websocket)
+        
+        async for chunk in tts_engine.stream_speech(
+            text=text,
+            voice="luna",
+            audio_format=encoder.name
+        ):
+            await manager.send_personal_bytes(
+                pack_frame(FRAME_AUDIO, utterance_id, sequence, chunk),
+                websocket
+            )
+            sequence += 1
+            
+    except asyncio.CancelledError:
+        status = "cancelled"
+    except Exception as e:
+        logger.error(f"Utterance {utterance_id} failed: {e}")
+        status = "error"
+        
+    # End-of-utterance marker (the socket may already be gone)
+    try:
+        await manager.send_personal_bytes(
+            pack_frame(FRAME_END, utterance_id, sequence),
+            websocket
+        )
+        await manager.send_personal_message(json.dumps({
+            "type": "audio_end",
+            "utterance_id": utterance_id,
+            "frames": sequence,
+            "status": status,
+            "timestamp": datetime.now().isoformat()
+        }), websocket)
+    except Exception:
+        pass
+
+
 # WebSocket endpoint for real-time communication
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time conversation"""
+    """
+    WebSocket endpoint for real-time conversation
+    
+    Audio replies are streamed as binary frames (see
+    backend.modules.tts.stream_protocol). Clients may send
+    {"type": "cancel", "utterance_id": n} to stop an utterance in flight;
+    a new chat message also replaces the current one.
+    """
     await manager.connect(websocket)
+    in_flight: Dict[int, asyncio.Task] = {}
+    next_utterance = 1
     
+    def cancel_utterances(utterance_id: Optional[int] = None):
+        ids = list(in_flight) if utterance_id is None else [utterance_id]
+        for uid in ids:
+            task = in_flight.get(uid)
+            if task:
+                task.cancel()
+                
     try:
         # Send welcome message
         await manager.send_personal_message(json.dumps({
             "type": "connection",
             "status": "connected",
-            "message": "Olá! Eu sou a Lua. Como posso ajudá-lo?"
+            "message": "Olá! Eu sou a Lua. Como posso ajudá-lo?",
+            "protocol": PROTOCOL_VERSION
         }), websocket)
         
         while True:
@@ -334,32 +437,42 @@ async def websocket_endpoint(websocket: WebSocket):
                     response_text = result.get("response", "")
                 else:
                     response_text = f"Echo: {user_message}"
+                    
+                want_audio = bool(tts_engine and message_data.get("audio", True))
+                utterance_id = next_utterance if want_audio else None
                 
                 # Send text response
                 await manager.send_personal_message(json.dumps({
                     "type": "text",
                     "message": response_text,
+                    "utterance_id": utterance_id,
                     "timestamp": datetime.now().isoformat()
                 }), websocket)
                 
-                # Generate and send audio response
-                if tts_engine and message_data.get("audio", True):
-                    audio_chunks = []
-                    async for chunk in tts_engine.generate_speech(
-                        text=response_text,
-                        voice="luna"
-                    ):
-                        audio_chunks.append(chunk)
-                        
-                    if audio_chunks:
-                        audio_data = b''.join(audio_chunks)
+                # Stream audio response without blocking the receive loop
+                if want_audio:
+                    audio_format = message_data.get("format", "wav")
+                    try:
+                        get_encoder(audio_format)
+                    except ValueError as e:
                         await manager.send_personal_message(json.dumps({
-                            "type": "audio",
-                            "data": base64.b64encode(audio_data).decode('utf-8'),
-                            "format": "wav",
-                            "timestamp": datetime.now().isoformat()
+                            "type": "error",
+                            "utterance_id": utterance_id,
+                            "message": str(e)
                         }), websocket)
+                        continue
                         
+                    cancel_utterances()
+                    next_utterance += 1
+                    task = asyncio.create_task(
+                        stream_utterance(websocket, utterance_id, response_text, audio_format)
+                    )
+                    in_flight[utterance_id] = task
+                    task.add_done_callback(lambda _, uid=utterance_id: in_flight.pop(uid, None))
+                    
+            elif message_data.get("type") == "cancel":
+                cancel_utterances(message_data.get("utterance_id"))
+                
             elif message_data.get("type") == "audio":
                 # Handle audio input (STT)
                 audio_data = base64.b64decode(message_data.get("data", ""))
@@ -382,6 +495,8 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         manager.disconnect(websocket)
+    finally:
+        cancel_utterances()
         
 
 # Serve frontend (for development)
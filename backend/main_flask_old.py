@@ -36,6 +36,7 @@ from src.models.financial import FinancialTransaction, ProductionReport, Advance
 from src.models.customer import Customer
 from src.models.supplier import Supplier
 from src.models.size import Size # Importar modelo Size
+from src.services import caixa_balance, inventory_valuation, search_index
 
 # Importar rotas
 from src.routes.user import user_bp
@@ -396,6 +397,11 @@ def init_database():
             db.create_all()
             print(f"✅ Banco de dados criado em: {DATABASE_PATH}")
 
+            # Tabelas materializadas: constrói a partir da origem na primeira vez
+            caixa_balance.ensure_built()
+            inventory_valuation.ensure_built()
+            search_index.ensure_built()
+
             # Criar usuários administradores usando helper robusto
             print("🔧 Criando usuários administradores...")
             
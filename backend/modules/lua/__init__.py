@@ -2,6 +2,8 @@
 Lua Assistant Module
 """
 from .assistant import LuaAssistant
+from .conversation import ConversationStore
+from .intents import Intent, IntentMatcher
 from .personality import LuaPersonality
 
-__all__ = ["LuaAssistant", "LuaPersonality"]
\ No newline at end of file
+__all__ = ["LuaAssistant", "ConversationStore", "Intent", "IntentMatcher", "LuaPersonality"]
\ No newline at end of file
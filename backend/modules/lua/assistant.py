@@ -6,33 +6,66 @@ from typing import Optional, Dict, Any, List, AsyncGenerator
 from datetime import datetime
 import json
 
+from backend.core.config import settings
 from backend.core.logger import logger
 from backend.modules.tts.kokoro_engine import KokoroEngine
+from backend.modules.tts.provider import EngineProvider, engine_provider
+from .conversation import ConversationStore
+from .intents import DEFAULT_INTENTS_PATH, IntentMatcher
 from .personality import LuaPersonality
 
 
 class LuaAssistant:
     """Main Lua Assistant class"""
     
-    def __init__(self):
-        """Initialize Lua Assistant"""
+    def __init__(
+        self,
+        provider: EngineProvider = engine_provider,
+        conversations: Optional[ConversationStore] = None
+    ):
+        """
+        Initialize Lua Assistant
+        
+        Args:
+            provider: Source of the shared TTS engine
+            conversations: History store (defaults to one built from settings)
+        """
         self.personality = LuaPersonality()
-        self.tts_engine = KokoroEngine()
-        self.conversation_history: List[Dict[str, Any]] = []
+        self.intents = IntentMatcher.from_file(settings.intents_path or DEFAULT_INTENTS_PATH)
+        self.provider = provider
+        self.tts_engine: Optional[KokoroEngine] = None
+        self.conversations = conversations or ConversationStore(
+            max_messages=settings.conversation_max_messages,
+            idle_seconds=settings.conversation_idle_minutes * 60,
+            max_sessions=settings.conversation_max_sessions,
+            db_path=settings.conversation_db_path
+        )
         self.is_initialized = False
         self.session_id: Optional[str] = None
+        self._precompute_task: Optional[asyncio.Task] = None
         
     async def initialize(self) -> bool:
         """Initialize all components"""
         try:
             logger.info("Initializing Lua Assistant...")
             
-            # Initialize TTS engine
-            if not await self.tts_engine.initialize():
+            # Share the process-wide TTS engine
+            if self.tts_engine is None:
+                self.tts_engine = await self.provider.acquire()
+            if not self.tts_engine.is_initialized:
                 logger.error("Failed to initialize TTS engine")
                 return False
                 
-            # Generate session ID
+            # Pre-synthesize canned replies in the background
+            if self._precompute_task is None:
+                self._precompute_task = asyncio.create_task(
+                    self.tts_engine.precompute(
+                        self.personality.canned_responses(),
+                        voice=self.personality.voice
+                    )
+                )
+                
+            # Default session for requests without a user or session
             self.session_id = f"lua_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             
             self.is_initialized = True
@@ -47,7 +80,8 @@ class LuaAssistant:
         self,
         message: str,
         user_id: Optional[str] = None,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Process user message and generate response
@@ -56,52 +90,115 @@ class LuaAssistant:
             message: User's message
             user_id: Optional user identifier
             context: Optional context data
+            session_id: Conversation to continue (defaults per user)
             
         Returns:
             Response dictionary with text and metadata
         """
+        result: Dict[str, Any] = {}
+        fragments = [
+            fragment async for fragment in
+            self.process_message_stream(
+                message, user_id, context, session_id=session_id, result=result
+            )
+        ]
+        
+        if not result.get("success"):
+            return {
+                "success": False,
+                "error": result.get("error"),
+                "response": self.personality.get_response("error")
+            }
+            
+        return {
+            "success": True,
+            "response": "".join(fragments),
+            "session_id": result["session_id"],
+            "timestamp": datetime.now().isoformat(),
+            "metadata": {
+                "personality": self.personality.name,
+                "language": self.personality.language,
+                "voice": self.personality.voice
+            }
+        }
+        
+    async def process_message_stream(
+        self,
+        message: str,
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Process user message and yield the response as it is generated
+        
+        The reply is logged once complete. On failure the error reply is
+        yielded instead.
+        
+        Args:
+            message: User's message
+            user_id: Optional user identifier
+            context: Optional context data
+            session_id: Conversation to continue (defaults per user)
+            result: Optional dict filled with "session_id", "success" (and "error")
+            
+        Yields:
+            Response text fragments
+        """
+        if result is None:
+            result = {}
+            
         if not self.is_initialized:
             await self.initialize()
             
+        session_id = self.resolve_session(session_id, user_id)
+        result["session_id"] = session_id
+        
+        # Log conversation
+        await asyncio.to_thread(
+            self.conversations.append, session_id, "user", message, user_id
+        )
+        
+        fragments: List[str] = []
         try:
-            # Log conversation
-            self.conversation_history.append({
-                "timestamp": datetime.now().isoformat(),
-                "user_id": user_id,
-                "role": "user",
-                "message": message
-            })
-            
-            # Generate response (placeholder for LLM integration)
-            response_text = await self._generate_response(message, context)
-            
-            # Log response
-            self.conversation_history.append({
-                "timestamp": datetime.now().isoformat(),
-                "role": "assistant",
-                "message": response_text
-            })
-            
-            return {
-                "success": True,
-                "response": response_text,
-                "session_id": self.session_id,
-                "timestamp": datetime.now().isoformat(),
-                "metadata": {
-                    "personality": self.personality.name,
-                    "language": self.personality.language,
-                    "voice": self.personality.voice
-                }
-            }
-            
+            async for fragment in self._generate_response_stream(message, context):
+                fragments.append(fragment)
+                yield fragment
+                
         except Exception as e:
             logger.error(f"Failed to process message: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "response": self.personality.get_response("error")
-            }
+            result.update(success=False, error=str(e))
+            if not fragments:
+                yield self.personality.get_response("error")
+            return
             
+        # Log response
+        await asyncio.to_thread(
+            self.conversations.append, session_id, "assistant", "".join(fragments), user_id
+        )
+        result["success"] = True
+        
+    def resolve_session(self, session_id: Optional[str], user_id: Optional[str]) -> str:
+        """Conversation a request belongs to: explicit, per user, or the default"""
+        if session_id:
+            return session_id
+        if user_id:
+            return f"user_{user_id}"
+        return self.session_id
+        
+    async def _generate_response_stream(
+        self,
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Generate response incrementally
+        An LLM integration would yield tokens here; the rule-based
+        responses arrive in one piece
+        """
+        yield await self._generate_response(message, context)
+        
     async def _generate_response(
         self,
         message: str,
@@ -111,36 +208,15 @@ class LuaAssistant:
         Generate response based on message
         This is a placeholder for LLM integration
         """
-        # Simple rule-based responses for now
-        message_lower = message.lower().strip()
+        intent = self.intents.match(message.strip())
         
-        # Greetings
-        if any(word in message_lower for word in ["olá", "oi", "bom dia", "boa tarde", "boa noite"]):
+        if intent is None:
+            return self.intents.fallback(message)
+        if intent.response_type == "greeting":
             return self.personality.get_greeting()
-            
-        # Farewells
-        elif any(word in message_lower for word in ["tchau", "até logo", "adeus", "até mais"]):
-            return self.personality.get_response("farewell")
-            
-        # Thanks
-        elif any(word in message_lower for word in ["obrigado", "obrigada", "valeu", "thanks"]):
-            return self.personality.get_response("thanks")
-            
-        # About Lua
-        elif "quem é você" in message_lower or "seu nome" in message_lower:
-            return "Eu sou a Lua! 🌙 Sou sua assistente virtual, criada para ajudar você com diversas tarefas. Posso conversar, responder perguntas e até mesmo falar com você usando minha voz!"
-            
-        # Capabilities
-        elif "o que você pode fazer" in message_lower or "suas capacidades" in message_lower:
-            return "Posso fazer muitas coisas! 🎯 Conversar com você, responder perguntas, gerar áudio com diferentes vozes, e muito mais. Estou sempre aprendendo coisas novas!"
-            
-        # Voice
-        elif "sua voz" in message_lower or "falar" in message_lower:
-            return "Sim! Eu posso falar com você usando minha voz. Uso a tecnologia Kokoro para gerar fala natural em português brasileiro. Quer me ouvir falando?"
-            
-        # Default response
-        else:
-            return f"Entendi sua mensagem: '{message}'. Ainda estou aprendendo, mas farei o meu melhor para ajudar! Como posso ser útil?"
+        if intent.response_type:
+            return self.personality.get_response(intent.response_type)
+        return intent.response
             
     async def speak(
         self,
@@ -176,46 +252,71 @@ class LuaAssistant:
         message: str,
         user_id: Optional[str] = None,
         voice: Optional[str] = None,
-        speed: float = 1.0
+        speed: float = 1.0,
+        audio_format: str = "wav",
+        session_id: Optional[str] = None
     ) -> AsyncGenerator[bytes, None]:
         """
-        Process message and speak the response
+        Process message and speak the response while it is generated
+        
+        Each sentence is synthesized as soon as it is complete, so audio
+        starts before the whole reply exists.
         
         Args:
             message: User's message
             user_id: User identifier
             voice: Voice to use
             speed: Speech speed
+            audio_format: Stream encoding
+            session_id: Conversation to continue (defaults per user)
             
         Yields:
-            Audio chunks of the response
-        """
-        # Process message to get response
-        result = await self.process_message(message, user_id)
-        
-        if result["success"]:
-            # Speak the response
-            async for audio_chunk in self.speak(
-                result["response"],
-                voice=voice,
-                speed=speed
-            ):
-                yield audio_chunk
-                
-    def get_conversation_history(self) -> List[Dict[str, Any]]:
-        """Get conversation history"""
-        return self.conversation_history
+            Progressive audio stream of the response, header first
+        """
+        if not self.is_initialized:
+            await self.initialize()
+            
+        async for audio_chunk in self.tts_engine.stream_incremental(
+            self.process_message_stream(message, user_id, session_id=session_id),
+            voice=voice or self.personality.voice,
+            speed=speed,
+            audio_format=audio_format
+        ):
+            yield audio_chunk
+            
+    def get_conversation_history(
+        self,
+        session_id: Optional[str] = None,
+        limit: int = 50,
+        before: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of a session's history
+        
+        Args:
+            session_id: Conversation to read (defaults to the default session)
+            limit: Messages per page
+            before: Cursor from a previous page's next_before
+            
+        Returns:
+            Dict with session_id, messages and next_before
+        """
+        return self.conversations.history(session_id or self.session_id, limit, before)
         
-    def clear_conversation(self):
-        """Clear conversation history"""
-        self.conversation_history.clear()
-        logger.info("Conversation history cleared")
+    def clear_conversation(self, session_id: Optional[str] = None):
+        """Clear a session's history"""
+        self.conversations.clear(session_id or self.session_id)
         
     async def cleanup(self):
         """Clean up resources"""
         try:
-            await self.tts_engine.cleanup()
-            self.conversation_history.clear()
+            if self._precompute_task is not None:
+                self._precompute_task.cancel()
+                self._precompute_task = None
+            if self.tts_engine is not None:
+                self.tts_engine = None
+                await self.provider.release()
+            self.conversations.close()
             self.is_initialized = False
             logger.info("Lua Assistant cleaned up")
         except Exception as e:
@@ -0,0 +1,267 @@
+"""
+Conversation store for Lua Assistant
+Per-session ring buffers in memory, idle-session eviction and optional
+SQLite persistence with keyset-paginated history
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from backend.core.logger import logger
+
+
+@dataclass
+class Session:
+    """In-memory state of one conversation"""
+    session_id: str
+    user_id: Optional[str]
+    messages: Deque[Dict[str, Any]]
+    last_seq: int = 0
+    last_active: float = field(default_factory=time.monotonic)
+
+
+class ConversationStore:
+    """Bounded per-session conversation history"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS messages (
+            session_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            user_id TEXT,
+            role TEXT NOT NULL,
+            message TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            PRIMARY KEY (session_id, seq)
+        ) WITHOUT ROWID
+    """
+
+    def __init__(
+        self,
+        max_messages: int = 200,
+        idle_seconds: float = 1800.0,
+        max_sessions: int = 10000,
+        db_path: Optional[Path] = None
+    ):
+        """
+        Args:
+            max_messages: Messages kept in memory per session (oldest dropped)
+            idle_seconds: Inactivity after which a session leaves memory
+            max_sessions: Sessions kept in memory (least recently active dropped)
+            db_path: SQLite file for persistence (None keeps memory only)
+        """
+        self.max_messages = max_messages
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self.db_path = Path(db_path) if db_path else None
+
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._evictions = 0
+        self._db: Optional[sqlite3.Connection] = None
+
+        if self.db_path:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(self.SCHEMA)
+            self._db.commit()
+            logger.info(f"Conversation store persisted to {self.db_path}")
+
+    @property
+    def persistent(self) -> bool:
+        return self._db is not None
+
+    def _session(self, session_id: str, user_id: Optional[str] = None) -> Session:
+        """Get a session, restoring it from disk or creating it (lock held)"""
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            session.last_active = time.monotonic()
+            return session
+
+        session = Session(session_id, user_id, deque(maxlen=self.max_messages))
+        if self._db is not None:
+            rows = self._db.execute(
+                "SELECT seq, user_id, role, message, timestamp FROM messages "
+                "WHERE session_id = ? ORDER BY seq DESC LIMIT ?",
+                (session_id, self.max_messages)
+            ).fetchall()
+            for seq, row_user, role, message, timestamp in reversed(rows):
+                session.messages.append(self._record(seq, row_user, role, message, timestamp))
+            if rows:
+                session.last_seq = rows[0][0]
+                session.user_id = session.user_id or rows[0][1]
+
+        self._sessions[session_id] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self._evictions += 1
+        return session
+
+    @staticmethod
+    def _record(
+        seq: int,
+        user_id: Optional[str],
+        role: str,
+        message: str,
+        timestamp: str
+    ) -> Dict[str, Any]:
+        return {
+            "seq": seq,
+            "timestamp": timestamp,
+            "user_id": user_id,
+            "role": role,
+            "message": message
+        }
+
+    def append(
+        self,
+        session_id: str,
+        role: str,
+        message: str,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Add a message to a session
+
+        Returns:
+            The stored record (with its sequence number)
+        """
+        self._maybe_sweep()
+
+        with self._lock:
+            session = self._session(session_id, user_id)
+            session.last_seq += 1
+            record = self._record(
+                session.last_seq,
+                user_id or session.user_id,
+                role,
+                message,
+                datetime.now().isoformat()
+            )
+            session.messages.append(record)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT INTO messages (session_id, seq, user_id, role, message, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (session_id, record["seq"], record["user_id"], role, message, record["timestamp"])
+                )
+                self._db.commit()
+
+        return record
+
+    def history(
+        self,
+        session_id: str,
+        limit: int = 50,
+        before: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Page through a session's history, newest page first
+
+        Args:
+            session_id: Conversation to read
+            limit: Messages per page
+            before: Only messages with seq below this cursor
+
+        Returns:
+            Dict with messages (oldest first within the page) and the
+            next_before cursor (None on the last page)
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None and self._db is None:
+                return {"session_id": session_id, "messages": [], "next_before": None}
+            if session is None:
+                session = self._session(session_id)
+
+            newer = [m for m in session.messages if before is None or m["seq"] < before]
+            page = newer[-limit:] if limit > 0 else []
+            oldest_in_memory = session.messages[0]["seq"] if session.messages else session.last_seq + 1
+
+            # Older than the ring buffer holds: read the rest from disk
+            if self._db is not None and len(page) < limit:
+                cursor = page[0]["seq"] if page else min(before or oldest_in_memory, oldest_in_memory)
+                rows = self._db.execute(
+                    "SELECT seq, user_id, role, message, timestamp FROM messages "
+                    "WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+                    (session_id, cursor, limit - len(page))
+                ).fetchall()
+                page = [self._record(*row) for row in reversed(rows)] + page
+
+            has_more = bool(page) and page[0]["seq"] > 1 and (
+                self._db is not None or page[0]["seq"] > oldest_in_memory
+            )
+
+        return {
+            "session_id": session_id,
+            "messages": page,
+            "next_before": page[0]["seq"] if has_more else None
+        }
+
+    def clear(self, session_id: str):
+        """Delete a session's history from memory and disk"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                self._db.commit()
+        logger.info(f"Conversation {session_id} cleared")
+
+    def _maybe_sweep(self):
+        """Evict idle sessions at most once per sweep interval"""
+        now = time.monotonic()
+        if now - self._last_sweep >= min(self.idle_seconds, 60.0):
+            self._last_sweep = now
+            self.evict_idle()
+
+    def evict_idle(self) -> int:
+        """
+        Drop sessions idle for longer than idle_seconds from memory
+
+        Persisted history stays on disk and is reloaded on the next access.
+
+        Returns:
+            Number of sessions evicted
+        """
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            # Sessions are ordered by activity, so the idle ones come first
+            evicted = 0
+            while self._sessions:
+                session = next(iter(self._sessions.values()))
+                if session.last_active > cutoff:
+                    break
+                self._sessions.popitem(last=False)
+                evicted += 1
+            self._evictions += evicted
+
+        if evicted:
+            logger.debug(f"Evicted {evicted} idle conversations")
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Session counts and memory footprint"""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "messages_in_memory": sum(len(s.messages) for s in self._sessions.values()),
+                "evictions": self._evictions,
+                "persistent": self.persistent,
+            }
+
+    def close(self):
+        """Release the database connection"""
+        with self._lock:
+            self._sessions.clear()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
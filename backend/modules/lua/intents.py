@@ -0,0 +1,99 @@
+"""
+Intent matching for Lua Assistant
+Trigger phrases from a data file compiled into a single regex, so a
+message is scanned once no matter how many intents there are
+"""
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+DEFAULT_INTENTS_PATH = Path(__file__).with_name("intents.json")
+
+
+@dataclass
+class Intent:
+    """A rule: trigger phrases and the reply they lead to"""
+    name: str
+    triggers: List[str]
+    response: Optional[str] = None  # literal reply
+    response_type: Optional[str] = None  # reply from the personality
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Intent":
+        if not data.get("triggers"):
+            raise ValueError(f"Intent '{data.get('name')}' has no triggers")
+        if not (data.get("response") or data.get("response_type")):
+            raise ValueError(f"Intent '{data.get('name')}' has no response")
+        return cls(
+            name=data["name"],
+            triggers=list(data["triggers"]),
+            response=data.get("response"),
+            response_type=data.get("response_type")
+        )
+
+
+class IntentMatcher:
+    """
+    First-listed intent whose trigger occurs anywhere in the message
+
+    Every trigger becomes one alternative of a single pattern with a named
+    group per intent, wrapped in a lookahead so matches may overlap; one
+    finditer pass finds every intent present.
+    """
+
+    def __init__(self, intents: List[Intent], default: str = "{message}"):
+        """
+        Args:
+            intents: Rules in priority order
+            default: Reply template when nothing matches ({message} is filled in)
+        """
+        names = [intent.name for intent in intents]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate intents: {', '.join(sorted(duplicates))}")
+
+        self.intents = intents
+        self.default = default
+        self._groups = {f"i{index}": intent for index, intent in enumerate(intents)}
+
+        alternatives = []
+        for group, intent in self._groups.items():
+            # Longest first, so a phrase is not shadowed by its own prefix
+            triggers = sorted({t.lower() for t in intent.triggers}, key=len, reverse=True)
+            alternatives.append(f"(?P<{group}>{'|'.join(map(re.escape, triggers))})")
+        self._pattern = re.compile(f"(?=(?:{'|'.join(alternatives)}))") if alternatives else None
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path] = DEFAULT_INTENTS_PATH) -> "IntentMatcher":
+        """
+        Load rules from a JSON file: {"default": ..., "intents": [...]}
+
+        Raises:
+            ValueError: If a rule is malformed
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            [Intent.from_dict(item) for item in data.get("intents", [])],
+            default=data.get("default", "{message}")
+        )
+
+    def match(self, message: str) -> Optional[Intent]:
+        """Highest-priority intent triggered by the message, if any"""
+        if self._pattern is None:
+            return None
+
+        best = None
+        for found in self._pattern.finditer(message.lower()):
+            index = int(found.lastgroup[1:])
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return self.intents[best] if best is not None else None
+
+    def fallback(self, message: str) -> str:
+        """Reply for a message no intent matched"""
+        return self.default.replace("{message}", message)
@@ -60,6 +60,10 @@ class LuaPersonality:
             return f"Olá, {user_name}! Eu sou a Lua, sua assistente virtual. Como posso te ajudar hoje? 😊"
         return self.response_style["greeting"]
         
+    def canned_responses(self) -> List[str]:
+        """Fixed replies worth pre-synthesizing"""
+        return list(self.response_style.values())
+        
     def get_response(self, response_type: str) -> str:
         """Get response by type"""
         return self.response_style.get(
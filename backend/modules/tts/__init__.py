@@ -2,5 +2,22 @@
 TTS Module for Lua System
 """
 from .kokoro_engine import KokoroEngine
+from .provider import EngineProvider, engine_provider
+from .audio_encoder import AudioEncoder, get_encoder, register_encoder, available_formats
+from .admission import AdmissionController, AdmissionError
+from .jobs import JobQueue, OutputStore, BatchRunner
 
-__all__ = ["KokoroEngine"]
\ No newline at end of file
+__all__ = [
+    "KokoroEngine",
+    "EngineProvider",
+    "engine_provider",
+    "AudioEncoder",
+    "get_encoder",
+    "register_encoder",
+    "available_formats",
+    "AdmissionController",
+    "AdmissionError",
+    "JobQueue",
+    "OutputStore",
+    "BatchRunner",
+]
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""
+Admission control for synthesis requests
+Bounds concurrent syntheses, serves priority classes in order, rotates
+fairly between clients within a class and rejects early instead of
+letting requests queue past their deadline
+"""
+import asyncio
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+from backend.core.logger import logger
+from backend.core.metrics import registry
+
+# Priority classes, most urgent first
+INTERACTIVE = "interactive"
+PREVIEW = "preview"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, PREVIEW, BULK)
+
+
+class AdmissionError(Exception):
+    """Request rejected before synthesis"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int = 1):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A granted synthesis slot; release it exactly once when done"""
+
+    def __init__(self, controller: Optional["AdmissionController"], client_id: str, priority: str):
+        self._controller = controller
+        self.client_id = client_id
+        self.priority = priority
+        self._released = False
+
+    def release(self):
+        """Free the slot (idempotent)"""
+        if self._released:
+            return
+        self._released = True
+        if self._controller is not None:
+            self._controller._release(self)
+
+
+class AdmissionController:
+    """
+    Gatekeeper in front of the TTS engine
+
+    At most `concurrency` requests synthesize at once. Waiting requests are
+    granted strictly by priority class, round-robin across clients within a
+    class. A client may hold at most `per_client` active or waiting
+    requests (429 beyond that); a request that cannot start within its
+    class deadline, or arrives to a full waiting room, gets a 503.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        per_client: int,
+        max_waiting: int,
+        deadlines: Dict[str, float],
+        enabled: bool = True
+    ):
+        """
+        Args:
+            concurrency: Requests allowed to synthesize at the same time
+            per_client: Active plus waiting requests allowed per client
+            max_waiting: Requests allowed to wait across all classes
+            deadlines: Longest wait in seconds per priority class
+            enabled: When False every request is admitted immediately
+        """
+        self.concurrency = max(1, concurrency)
+        self.per_client = max(1, per_client)
+        self.max_waiting = max(0, max_waiting)
+        self.deadlines = deadlines
+        self.enabled = enabled
+
+        self._active = 0
+        self._load: Dict[str, int] = {}
+        # Per class: client -> waiting (ticket, future) pairs, in rotation order
+        self._queues: Dict[str, "OrderedDict[str, Deque]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._waiting = 0
+        self._rejected: Dict[tuple, int] = {}
+
+        registry.callback(
+            "lua_admission_active", "Requests holding a synthesis slot", "gauge",
+            lambda: {(): self._active}
+        )
+        registry.callback(
+            "lua_admission_waiting", "Requests waiting for a synthesis slot", "gauge",
+            lambda: {(p,): sum(len(q) for q in self._queues[p].values()) for p in PRIORITIES},
+            ("priority",)
+        )
+        registry.callback(
+            "lua_admission_rejected_total", "Requests rejected by admission control", "counter",
+            lambda: dict(self._rejected), ("priority", "reason")
+        )
+
+    def _reject(self, priority: str, reason: str, status_code: int, detail: str, retry_after: int = 1):
+        key = (priority, reason)
+        self._rejected[key] = self._rejected.get(key, 0) + 1
+        logger.debug(f"Admission rejected ({priority}, {reason}): {detail}")
+        raise AdmissionError(status_code, detail, retry_after)
+
+    async def acquire(self, client_id: str, priority: str = PREVIEW) -> Ticket:
+        """
+        Wait for a synthesis slot
+
+        Raises:
+            AdmissionError: 429 over the per-client limit, 503 when the
+                waiting room is full or the class deadline passes
+            ValueError: If the priority class is unknown
+        """
+        if priority not in self.deadlines:
+            raise ValueError(f"Unknown priority: {priority} (choose from {', '.join(PRIORITIES)})")
+
+        if not self.enabled:
+            return Ticket(None, client_id, priority)
+
+        if self._load.get(client_id, 0) >= self.per_client:
+            self._reject(
+                priority, "client_limit", 429,
+                f"Too many concurrent requests for client ({self.per_client} allowed)"
+            )
+
+        ticket = Ticket(self, client_id, priority)
+
+        # Free slot and nobody ahead: start right away
+        if self._active < self.concurrency and not self._waiting:
+            self._active += 1
+            self._load[client_id] = self._load.get(client_id, 0) + 1
+            return ticket
+
+        if self._waiting >= self.max_waiting:
+            self._reject(priority, "queue_full", 503, "Synthesis queue full, try again later")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (ticket, future)
+        self._queues[priority].setdefault(client_id, deque()).append(entry)
+        self._waiting += 1
+        self._load[client_id] = self._load.get(client_id, 0) + 1
+
+        deadline = self.deadlines[priority]
+        try:
+            await asyncio.wait({future}, timeout=deadline)
+        except asyncio.CancelledError:
+            # Caller went away; hand back a slot granted in the meantime
+            if future.done():
+                ticket.release()
+            else:
+                self._withdraw(entry)
+            raise
+
+        if not future.done():
+            self._withdraw(entry)
+            self._reject(
+                priority, "deadline", 503,
+                f"No synthesis slot within {deadline:.1f}s, try again later",
+                retry_after=max(1, int(deadline))
+            )
+        return ticket
+
+    def _withdraw(self, entry):
+        """Remove a waiter that gave up"""
+        ticket, future = entry
+        clients = self._queues[ticket.priority]
+        waiters = clients.get(ticket.client_id)
+        if waiters is not None and entry in waiters:
+            waiters.remove(entry)
+            if not waiters:
+                del clients[ticket.client_id]
+            self._waiting -= 1
+        future.cancel()
+        self._unload(ticket.client_id)
+
+    def _unload(self, client_id: str):
+        load = self._load.get(client_id, 0) - 1
+        if load > 0:
+            self._load[client_id] = load
+        else:
+            self._load.pop(client_id, None)
+
+    def _release(self, ticket: Ticket):
+        self._active -= 1
+        self._unload(ticket.client_id)
+        self._grant()
+
+    def _grant(self):
+        """Hand free slots to waiters: best class first, clients in rotation"""
+        while self._active < self.concurrency and self._waiting:
+            for priority in PRIORITIES:
+                clients = self._queues[priority]
+                if clients:
+                    break
+            else:
+                return
+
+            client_id, waiters = next(iter(clients.items()))
+            ticket, future = waiters.popleft()
+            if waiters:
+                clients.move_to_end(client_id)
+            else:
+                del clients[client_id]
+            self._waiting -= 1
+
+            self._active += 1
+            future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Slots in use, waiting requests per class and rejections"""
+        return {
+            "enabled": self.enabled,
+            "active": self._active,
+            "concurrency": self.concurrency,
+            "waiting": {p: sum(len(q) for q in self._queues[p].values()) for p in PRIORITIES},
+            "clients": len(self._load),
+            "rejected": {f"{p}:{r}": n for (p, r), n in self._rejected.items()},
+        }
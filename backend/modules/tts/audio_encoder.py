@@ -0,0 +1,197 @@
+"""
+In-memory audio encoders for the Kokoro TTS engine
+Encodes synthesized segments straight into reusable buffers, either as
+standalone files or as one progressive stream
+"""
+import io
+import struct
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import soundfile as sf
+
+
+class AudioEncoder:
+    """Base class for in-memory audio encoders"""
+
+    name: str = ""
+    media_type: str = "application/octet-stream"
+    extension: str = ""
+
+    def is_available(self) -> bool:
+        """Check whether the encoder can run in this environment"""
+        return True
+
+    def encode(self, audio: np.ndarray, sample_rate: int) -> bytes:
+        """
+        Encode a complete audio segment
+
+        Args:
+            audio: Mono float waveform in [-1.0, 1.0]
+            sample_rate: Sample rate in Hz
+
+        Returns:
+            Encoded audio bytes
+        """
+        raise NotImplementedError
+
+    def stream_header(self, sample_rate: int) -> bytes:
+        """Bytes sent once at the start of a progressive stream"""
+        return b""
+
+    def encode_frames(self, audio: np.ndarray, sample_rate: int) -> bytes:
+        """
+        Encode a segment as the continuation of a progressive stream
+
+        Formats without a streamable container fall back to chunked mode,
+        where every segment is a self-contained bitstream (MP3 frames and
+        chained Ogg pages both play back-to-back).
+        """
+        return self.encode(audio, sample_rate)
+
+
+def to_pcm16(audio: np.ndarray) -> np.ndarray:
+    """Convert a float waveform to little-endian 16-bit PCM samples"""
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    return (np.clip(audio, -1.0, 1.0) * 32767.0).astype("<i2")
+
+
+class PCMEncoder(AudioEncoder):
+    """Raw 16-bit little-endian PCM without any container"""
+
+    name = "pcm"
+    media_type = "audio/L16"
+    extension = "pcm"
+
+    def encode(self, audio: np.ndarray, sample_rate: int) -> bytes:
+        return to_pcm16(audio).tobytes()
+
+
+class WAVEncoder(AudioEncoder):
+    """16-bit PCM WAV written into a preallocated buffer"""
+
+    name = "wav"
+    media_type = "audio/wav"
+    extension = "wav"
+
+    HEADER_SIZE = 44
+    STREAMING_SIZE = 0xFFFFFFFF
+
+    @staticmethod
+    def header(sample_rate: int, data_size: int) -> bytes:
+        """Build a canonical 44-byte RIFF/WAVE header for mono PCM16"""
+        return struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF",
+            min(data_size + 36, WAVEncoder.STREAMING_SIZE),
+            b"WAVE",
+            b"fmt ",
+            16,              # fmt chunk size
+            1,               # PCM
+            1,               # mono
+            sample_rate,
+            sample_rate * 2, # byte rate
+            2,               # block align
+            16,              # bits per sample
+            b"data",
+            min(data_size, WAVEncoder.STREAMING_SIZE),
+        )
+
+    def encode(self, audio: np.ndarray, sample_rate: int) -> bytes:
+        samples = to_pcm16(audio)
+        data_size = samples.nbytes
+
+        buffer = bytearray(self.HEADER_SIZE + data_size)
+        buffer[:self.HEADER_SIZE] = self.header(sample_rate, data_size)
+        np.frombuffer(buffer, dtype="<i2", offset=self.HEADER_SIZE)[:] = samples
+        return bytes(buffer)
+
+    def stream_header(self, sample_rate: int) -> bytes:
+        # Open-ended length: players read PCM until the connection closes
+        return self.header(sample_rate, self.STREAMING_SIZE)
+
+    def encode_frames(self, audio: np.ndarray, sample_rate: int) -> bytes:
+        return to_pcm16(audio).tobytes()
+
+
+class SoundFileEncoder(AudioEncoder):
+    """Encoder backed by libsndfile writing into a reusable BytesIO"""
+
+    def __init__(
+        self,
+        name: str,
+        format: str,
+        subtype: Optional[str],
+        media_type: str,
+        extension: str
+    ):
+        self.name = name
+        self.format = format
+        self.subtype = subtype
+        self.media_type = media_type
+        self.extension = extension
+        self._local = threading.local()
+
+    def is_available(self) -> bool:
+        if self.format not in sf.available_formats():
+            return False
+        return self.subtype is None or self.subtype in sf.available_subtypes(self.format)
+
+    def _buffer(self) -> io.BytesIO:
+        """Get this thread's reusable buffer, emptied"""
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = io.BytesIO()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return buffer
+
+    def encode(self, audio: np.ndarray, sample_rate: int) -> bytes:
+        buffer = self._buffer()
+        sf.write(
+            buffer,
+            np.asarray(audio, dtype=np.float32),
+            sample_rate,
+            format=self.format,
+            subtype=self.subtype
+        )
+        return buffer.getvalue()
+
+
+# Format registry
+_ENCODERS: Dict[str, AudioEncoder] = {}
+
+
+def register_encoder(encoder: AudioEncoder) -> AudioEncoder:
+    """Register an encoder under its format name (replaces any existing one)"""
+    _ENCODERS[encoder.name.lower()] = encoder
+    return encoder
+
+
+def get_encoder(name: str) -> AudioEncoder:
+    """
+    Get a registered encoder by format name
+
+    Raises:
+        ValueError: If the format is unknown or unavailable here
+    """
+    encoder = _ENCODERS.get((name or "").lower())
+    if encoder is None:
+        raise ValueError(f"Unknown audio format: {name}")
+    if not encoder.is_available():
+        raise ValueError(f"Audio format not available: {name}")
+    return encoder
+
+
+def available_formats() -> List[str]:
+    """List formats that can be encoded in this environment"""
+    return [name for name, encoder in _ENCODERS.items() if encoder.is_available()]
+
+
+register_encoder(PCMEncoder())
+register_encoder(WAVEncoder())
+register_encoder(SoundFileEncoder("flac", "FLAC", "PCM_16", "audio/flac", "flac"))
+register_encoder(SoundFileEncoder("ogg", "OGG", "VORBIS", "audio/ogg", "ogg"))
+register_encoder(SoundFileEncoder("opus", "OGG", "OPUS", "audio/ogg; codecs=opus", "opus"))
+register_encoder(SoundFileEncoder("mp3", "MP3", "MPEG_LAYER_III", "audio/mpeg", "mp3"))
@@ -0,0 +1,197 @@
+"""
+Inference backends for the Kokoro TTS engine
+Turns the loaded full-precision KModel into the runtime model handed to
+pipeline calls: plain PyTorch, dynamic int8, torch.compile or ONNX Runtime
+"""
+import copy
+from pathlib import Path
+from typing import Callable, Dict, Union
+
+import numpy as np
+import torch
+from kokoro import KModel
+from kokoro.model import KModelForONNX
+
+from backend.core.logger import logger
+
+
+class OnnxKModel:
+    """
+    KModel stand-in running an exported graph on onnxruntime
+
+    Exposes the parts of the KModel interface KPipeline relies on: vocab,
+    context_length, device and forward(phonemes, ref_s, speed, return_output).
+    """
+
+    def __init__(self, path: Path, vocab: Dict[str, int], context_length: int, threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            str(path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.vocab = vocab
+        self.context_length = context_length
+
+    @property
+    def device(self) -> torch.device:
+        return torch.device("cpu")
+
+    def __call__(
+        self,
+        phonemes: str,
+        ref_s: torch.FloatTensor,
+        speed: float = 1,
+        return_output: bool = False
+    ):
+        input_ids = [i for i in map(self.vocab.get, phonemes) if i is not None]
+        assert len(input_ids) + 2 <= self.context_length, (
+            len(input_ids) + 2, self.context_length
+        )
+
+        waveform, duration = self.session.run(None, {
+            "input_ids": np.array([[0, *input_ids, 0]], dtype=np.int64),
+            "ref_s": ref_s.reshape(1, -1).cpu().numpy().astype(np.float32),
+            "speed": np.array(speed, dtype=np.float32),
+        })
+        audio = torch.from_numpy(waveform).squeeze()
+        if not return_output:
+            return audio
+        return KModel.Output(audio=audio, pred_dur=torch.from_numpy(duration).squeeze())
+
+
+def export_onnx(model: KModel, path: Path) -> Path:
+    """Export KModel.forward_with_tokens to ONNX (no-op if the file exists)"""
+    if path.exists():
+        logger.info(f"Using cached ONNX export: {path}")
+        return path
+
+    logger.info(f"Exporting Kokoro model to ONNX: {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+
+    input_ids = torch.LongTensor([[0, *range(1, 31), 0]])
+    ref_s = torch.randn(1, 256)
+    speed = torch.tensor(1.0)
+
+    # Export from a CPU copy: the caller's model stays on its device
+    torch.onnx.export(
+        KModelForONNX(copy.deepcopy(model).cpu()).eval(),
+        (input_ids, ref_s, speed),
+        str(tmp_path),
+        input_names=["input_ids", "ref_s", "speed"],
+        output_names=["waveform", "duration"],
+        dynamic_axes={
+            "input_ids": {1: "n_tokens"},
+            "waveform": {0: "n_samples"},
+            "duration": {0: "n_tokens"},
+        },
+        opset_version=17,
+        do_constant_folding=True
+    )
+    tmp_path.replace(path)
+    return path
+
+
+def _torch(model: KModel, **_) -> KModel:
+    return model
+
+
+def _int8(model: KModel, **_) -> KModel:
+    """
+    Dynamic int8 quantization of Linear and LSTM layers (CPU only)
+
+    In place: a quantized copy would leave the fp32 weights alive next to
+    it and cost more memory than the plain backend.
+    """
+    if model.device.type != "cpu":
+        raise ValueError("int8 backend requires the CPU device")
+    torch.ao.quantization.quantize_dynamic(
+        model,
+        {torch.nn.Linear, torch.nn.LSTM},
+        dtype=torch.qint8,
+        inplace=True
+    )
+    # Kokoro calls flatten_parameters() before each LSTM; the quantized
+    # LSTM keeps packed weights and has no such method
+    for module in model.modules():
+        if isinstance(module, torch.ao.nn.quantized.dynamic.LSTM):
+            module.flatten_parameters = _no_op
+    return model
+
+
+def _no_op():
+    pass
+
+
+def weight_bytes(model: torch.nn.Module) -> int:
+    """Bytes held by a model's weights, counting int8-packed layers too"""
+    tensors = list(model.parameters()) + list(model.buffers())
+    # Dynamic quantized layers keep their weights packed, outside parameters()
+    for module in model.modules():
+        if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+            tensors.append(module.weight())
+            if module.bias() is not None:
+                tensors.append(module.bias())
+        elif isinstance(module, torch.ao.nn.quantized.dynamic.LSTM):
+            tensors.extend(module.get_weight().values())
+            tensors.extend(module.get_bias().values())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+def _compile(model: KModel, **_) -> KModel:
+    """
+    torch.compile the heavy submodules; KModel.forward itself takes strings
+
+    forward_with_tokens (and the batcher) never call predictor.forward, so
+    the predictor's pieces are compiled individually. Its LSTM is left
+    eager because the batcher feeds it packed sequences.
+    """
+    model.decoder = torch.compile(model.decoder, dynamic=True)
+    model.text_encoder = torch.compile(model.text_encoder, dynamic=True)
+    model.predictor.text_encoder = torch.compile(model.predictor.text_encoder, dynamic=True)
+    model.predictor.F0Ntrain = torch.compile(model.predictor.F0Ntrain, dynamic=True)
+    return model
+
+
+def _onnx(model: KModel, cache_dir: Path, threads: int = 0, **_) -> OnnxKModel:
+    path = export_onnx(model, cache_dir / f"{model.repo_id.replace('/', '--')}.onnx")
+    return OnnxKModel(path, model.vocab, model.context_length, threads=threads)
+
+
+BACKENDS: Dict[str, Callable[..., Union[KModel, OnnxKModel]]] = {
+    "torch": _torch,
+    "int8": _int8,
+    "compile": _compile,
+    "onnx": _onnx,
+}
+
+
+def prepare_backend(
+    name: str,
+    model: KModel,
+    cache_dir: Path,
+    threads: int = 0
+) -> Union[KModel, OnnxKModel]:
+    """
+    Build the runtime model for an inference backend
+
+    Args:
+        name: One of BACKENDS
+        model: Loaded full-precision KModel (int8 and compile modify it in place)
+        cache_dir: Where exported artifacts are kept
+        threads: Intra-op threads for runtimes with their own pool
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {name} (choose from {', '.join(BACKENDS)})")
+
+    runtime = BACKENDS[name](model, cache_dir=cache_dir, threads=threads)
+    logger.info(f"Inference backend: {name}")
+    return runtime
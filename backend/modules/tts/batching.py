@@ -0,0 +1,304 @@
+"""
+Dynamic micro-batching for Kokoro inference
+Collects phoneme sequences from concurrent requests within a short window,
+groups them by length and runs one padded forward pass per group
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import torch
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
+from kokoro import KModel
+
+from backend.core.logger import logger
+
+
+@dataclass
+class _BatchItem:
+    """One segment waiting for the model"""
+    input_ids: List[int]
+    ref_s: torch.FloatTensor
+    speed: float
+    done: threading.Event = field(default_factory=threading.Event)
+    output: Optional[KModel.Output] = None
+    error: Optional[BaseException] = None
+    abandoned: bool = False  # caller stopped waiting; skip it
+
+
+class BatcherUnavailableError(RuntimeError):
+    """The scheduler is shut down or its dispatcher thread has exited"""
+
+
+@torch.no_grad()
+def batched_forward(model: KModel, items: List[_BatchItem]) -> List[KModel.Output]:
+    """
+    Padded batched equivalent of KModel.forward_with_tokens
+
+    The text encoders, BERT and duration predictor run once for the whole
+    batch (masked and packed so padding does not leak into the results);
+    alignment, F0/N prediction and the decoder run per item because their
+    lengths depend on each item's predicted durations.
+    """
+    device = model.device
+    lengths = [len(item.input_ids) for item in items]
+    max_len = max(lengths)
+
+    input_ids = torch.zeros((len(items), max_len), dtype=torch.long)
+    for row, item in enumerate(items):
+        input_ids[row, :len(item.input_ids)] = torch.LongTensor(item.input_ids)
+    input_ids = input_ids.to(device)
+    input_lengths = torch.LongTensor(lengths).to(device)
+
+    text_mask = torch.arange(max_len, device=device).unsqueeze(0).expand(len(items), -1)
+    text_mask = torch.gt(text_mask + 1, input_lengths.unsqueeze(1))
+
+    ref_s = torch.cat([item.ref_s.to(device) for item in items], dim=0)
+    s = ref_s[:, 128:]
+    speeds = torch.tensor([item.speed for item in items], device=device).unsqueeze(1)
+
+    bert_dur = model.bert(input_ids, attention_mask=(~text_mask).int())
+    d_en = model.bert_encoder(bert_dur).transpose(-1, -2)
+    d = model.predictor.text_encoder(d_en, s, input_lengths, text_mask)
+
+    packed = pack_padded_sequence(d, input_lengths.cpu(), batch_first=True, enforce_sorted=False)
+    x, _ = model.predictor.lstm(packed)
+    x, _ = pad_packed_sequence(x, batch_first=True, total_length=max_len)
+
+    duration = model.predictor.duration_proj(x)
+    duration = torch.sigmoid(duration).sum(axis=-1) / speeds
+    t_en = model.text_encoder(input_ids, input_lengths, text_mask)
+
+    outputs = []
+    for row, length in enumerate(lengths):
+        pred_dur = torch.round(duration[row, :length]).clamp(min=1).long()
+        indices = torch.repeat_interleave(torch.arange(length, device=device), pred_dur)
+        pred_aln_trg = torch.zeros((length, indices.shape[0]), device=device)
+        pred_aln_trg[indices, torch.arange(indices.shape[0])] = 1
+        pred_aln_trg = pred_aln_trg.unsqueeze(0)
+
+        en = d[row:row + 1, :length].transpose(-1, -2) @ pred_aln_trg
+        F0_pred, N_pred = model.predictor.F0Ntrain(en, s[row:row + 1])
+        asr = t_en[row:row + 1, :, :length] @ pred_aln_trg
+        audio = model.decoder(asr, F0_pred, N_pred, ref_s[row:row + 1, :128]).squeeze()
+        outputs.append(KModel.Output(audio=audio.cpu(), pred_dur=pred_dur.cpu()))
+
+    return outputs
+
+
+class BatchScheduler:
+    """
+    Model proxy that batches concurrent forward calls
+
+    Passed to KPipeline as its model: pipeline workers block in __call__
+    while a single dispatcher thread runs the batches.
+    """
+
+    def __init__(
+        self,
+        model: KModel,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        length_ratio: float = 1.5,
+        timeout_s: float = 120.0
+    ):
+        """
+        Args:
+            model: Loaded KModel
+            max_batch_size: Most segments per forward pass
+            max_wait_ms: How long the first segment waits for company
+            length_ratio: Longest/shortest token count allowed in one group
+            timeout_s: Longest a caller waits for its segment
+        """
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.length_ratio = max(1.0, length_ratio)
+        self.timeout = timeout_s
+        self.batches = 0
+        self.segments = 0
+
+        self._queue: "queue.Queue[Optional[_BatchItem]]" = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()  # orders submissions against shutdown
+        self._inflight: List[_BatchItem] = []
+        self._thread = threading.Thread(
+            target=self._dispatch,
+            name="kokoro-batcher",
+            daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def device(self):
+        return self.model.device
+
+    @property
+    def pending(self) -> int:
+        """Segments waiting to be batched"""
+        return self._queue.qsize()
+
+    def __call__(
+        self,
+        phonemes: str,
+        ref_s: torch.FloatTensor,
+        speed: float = 1,
+        return_output: bool = False
+    ):
+        """
+        Same contract as KModel.forward; blocks until the batch has run
+
+        Raises:
+            BatcherUnavailableError: If the scheduler is shut down or its
+                dispatcher exits before the segment runs
+            TimeoutError: If the segment is not done within timeout_s
+        """
+        input_ids = [i for i in map(self.model.vocab.get, phonemes) if i is not None]
+        assert len(input_ids) + 2 <= self.model.context_length, (
+            len(input_ids) + 2, self.model.context_length
+        )
+
+        item = _BatchItem(
+            input_ids=[0, *input_ids, 0],
+            ref_s=ref_s.reshape(1, -1),
+            speed=float(speed)
+        )
+        with self._lock:
+            if self._closed or not self._thread.is_alive():
+                raise BatcherUnavailableError("Batch scheduler is not running")
+            self._queue.put(item)
+        self._wait(item)
+
+        if item.error is not None:
+            raise item.error
+        return item.output if return_output else item.output.audio
+
+    def _wait(self, item: _BatchItem):
+        """Wait for the dispatcher, noticing if it dies or takes too long"""
+        deadline = time.monotonic() + self.timeout
+        while not item.done.wait(timeout=min(1.0, max(0.0, deadline - time.monotonic()))):
+            if not self._thread.is_alive():
+                item.abandoned = True
+                raise BatcherUnavailableError("Batch dispatcher exited")
+            if time.monotonic() >= deadline:
+                item.abandoned = True
+                raise TimeoutError(f"Segment not synthesized within {self.timeout:g}s")
+
+    def _collect(self, first: _BatchItem) -> List[_BatchItem]:
+        """Gather segments arriving within the wait window"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            if not item.abandoned:
+                batch.append(item)
+
+        return batch
+
+    def _group(self, batch: List[_BatchItem]) -> List[List[_BatchItem]]:
+        """Split a batch into groups of similar length to limit padding"""
+        groups: List[List[_BatchItem]] = []
+        for item in sorted(batch, key=lambda i: len(i.input_ids)):
+            if groups and len(item.input_ids) <= len(groups[-1][0].input_ids) * self.length_ratio:
+                groups[-1].append(item)
+            else:
+                groups.append([item])
+        return groups
+
+    def _run(self, group: List[_BatchItem]):
+        """Run one group, falling back to single forwards on failure"""
+        try:
+            if len(group) == 1:
+                item = group[0]
+                audio, pred_dur = self.model.forward_with_tokens(
+                    torch.LongTensor([item.input_ids]).to(self.device),
+                    item.ref_s.to(self.device),
+                    item.speed
+                )
+                outputs = [KModel.Output(audio=audio.squeeze().cpu(), pred_dur=pred_dur.cpu())]
+            else:
+                outputs = batched_forward(self.model, group)
+
+            for item, output in zip(group, outputs):
+                item.output = output
+
+        except Exception as e:
+            if len(group) > 1:
+                logger.warning(f"Batched forward failed, running singly: {e}")
+                for item in group:
+                    self._run([item])
+                return
+            group[0].error = e
+
+        self.batches += 1
+        self.segments += len(group)
+        for item in group:
+            item.done.set()
+
+    def _dispatch(self):
+        """Dispatcher thread main loop"""
+        try:
+            while True:
+                first = self._queue.get()
+                if first is None:
+                    break
+                if first.abandoned:
+                    continue
+                self._inflight = self._collect(first)
+                for group in self._group(self._inflight):
+                    self._run(group)
+                self._inflight = []
+        except BaseException as e:
+            logger.error(f"Batch dispatcher died: {e}")
+            raise
+        finally:
+            self._fail_pending()
+
+    def _fail_pending(self):
+        """Close the scheduler and release every segment still waiting"""
+        with self._lock:
+            self._closed = True
+        error = BatcherUnavailableError("Batch dispatcher exited")
+
+        pending = [item for item in self._inflight if not item.done.is_set()]
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                pending.append(item)
+
+        for item in pending:
+            item.error = error
+            item.done.set()
+
+    def stats(self):
+        """Batching counters"""
+        return {
+            "batches": self.batches,
+            "segments": self.segments,
+            "avg_batch_size": self.segments / self.batches if self.batches else 0.0,
+            "pending": self.pending,
+        }
+
+    def shutdown(self):
+        """Stop the dispatcher after the queued segments; later calls are rejected"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout=5)
@@ -0,0 +1,230 @@
+"""
+Content-addressed cache for synthesized audio
+In-process LRU with a byte budget in front of an on-disk store with
+TTL and size eviction
+"""
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.core.logger import logger
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of a text for cache keys"""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class AudioCache:
+    """Two-tier cache of raw waveform segments keyed by synthesis request"""
+
+    def __init__(
+        self,
+        directory: Optional[Path],
+        memory_bytes: int = 64 * 1024 * 1024,
+        disk_bytes: int = 512 * 1024 * 1024,
+        ttl_seconds: float = 7 * 24 * 3600
+    ):
+        """
+        Args:
+            directory: On-disk store (None keeps the cache in memory only)
+            memory_bytes: Budget for the in-process LRU
+            disk_bytes: Budget for the on-disk store
+            ttl_seconds: Age after which disk entries are dropped
+        """
+        self.directory = Path(directory) if directory else None
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._memory: "OrderedDict[str, List[np.ndarray]]" = OrderedDict()
+        self._memory_size = 0
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._disk_size = sum(f.stat().st_size for f in self.directory.glob("*.npz"))
+
+    @staticmethod
+    def make_key(text: str, voice: str, speed: float, lang_code: str) -> str:
+        """Content address of a synthesis request"""
+        payload = "\x1f".join([normalize_text(text), voice, f"{speed:.3f}", lang_code])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[List[np.ndarray]]:
+        """
+        Look up cached segments (memory first, then disk)
+
+        Returns:
+            List of float32 segments, or None on a miss
+        """
+        with self._lock:
+            segments = self._memory.get(key)
+            if segments is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return segments
+
+        segments = self._read_disk(key)
+        with self._lock:
+            if segments is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._remember(key, segments)
+        return segments
+
+    def put(self, key: str, segments: List[np.ndarray]):
+        """Store the segments of a completed synthesis in both tiers"""
+        if not segments:
+            return
+
+        with self._lock:
+            self._remember(key, segments)
+            self._counters["stores"] += 1
+
+        self._write_disk(key, segments)
+
+    def _remember(self, key: str, segments: List[np.ndarray]):
+        """Insert into the memory LRU (lock held)"""
+        size = sum(s.nbytes for s in segments)
+        if size > self.memory_bytes:
+            return
+
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= sum(s.nbytes for s in previous)
+
+        self._memory[key] = segments
+        self._memory_size += size
+
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= sum(s.nbytes for s in evicted)
+            self._counters["evictions"] += 1
+
+    def _read_disk(self, key: str) -> Optional[List[np.ndarray]]:
+        if not self.directory:
+            return None
+
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if time.time() - stat.st_mtime > self.ttl_seconds:
+                path.unlink()
+                with self._lock:
+                    self._disk_size -= stat.st_size
+                return None
+
+            with np.load(path) as data:
+                segments = [data[f"s{i}"] for i in range(len(data.files))]
+
+            # Refresh the entry so size eviction drops the coldest first
+            os.utime(path)
+            return segments
+
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable audio cache entry {key}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def _write_disk(self, key: str, segments: List[np.ndarray]):
+        if not self.directory:
+            return
+
+        buffer = io.BytesIO()
+        np.savez(buffer, **{f"s{i}": s for i, s in enumerate(segments)})
+        data = buffer.getvalue()
+
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write audio cache entry: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._disk_size += len(data)
+            over_budget = self._disk_size > self.disk_bytes
+
+        if over_budget:
+            self.evict_disk()
+
+    def evict_disk(self):
+        """Drop expired entries, then the oldest ones until under budget"""
+        if not self.directory:
+            return
+
+        entries = []
+        for path in self.directory.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            if total <= self.disk_bytes and now - mtime <= self.ttl_seconds:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+        with self._lock:
+            self._disk_size = total
+
+    def clear(self):
+        """Empty both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+
+        if self.directory:
+            for path in self.directory.glob("*.npz"):
+                path.unlink(missing_ok=True)
+            self._disk_size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            lookups = (
+                self._counters["memory_hits"]
+                + self._counters["disk_hits"]
+                + self._counters["misses"]
+            )
+            hits = lookups - self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_bytes": self._disk_size,
+            }
@@ -0,0 +1,177 @@
+"""
+Inference executor for the Kokoro TTS engine
+Runs blocking G2P and model work on a bounded worker pool so the asyncio
+event loop stays responsive
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncGenerator, Callable, Iterator, Optional, TypeVar
+
+import torch
+
+from backend.core.logger import logger
+from backend.core.metrics import REJECTED
+
+T = TypeVar("T")
+
+
+class EngineBusyError(RuntimeError):
+    """Raised when the inference queue is full"""
+
+
+class InferenceExecutor:
+    """Bounded thread pool for synthesis jobs"""
+    
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 8,
+        torch_threads: int = 0,
+        buffer_size: int = 2
+    ):
+        """
+        Args:
+            workers: Concurrent synthesis jobs
+            max_queue: Jobs allowed to wait for a worker before rejecting
+            torch_threads: Intra-op threads for torch (0 keeps torch's default)
+            buffer_size: Segments a job may produce ahead of its consumer
+        """
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.buffer_size = max(1, buffer_size)
+        self._pending = 0
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="kokoro-infer"
+        )
+        
+        if torch_threads > 0:
+            # Process-wide: keeps workers * threads within the core budget
+            torch.set_num_threads(torch_threads)
+            
+        logger.info(
+            f"Inference executor ready: {self.workers} workers, "
+            f"queue {self.max_queue}, torch threads {torch.get_num_threads()}"
+        )
+        
+    @property
+    def pending(self) -> int:
+        """Jobs running or waiting for a worker"""
+        return self._pending
+        
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a worker"""
+        return max(0, self._pending - self.workers)
+        
+    @property
+    def is_saturated(self) -> bool:
+        """True when a new job would be rejected"""
+        return self._pending >= self.workers + self.max_queue
+        
+    def check_capacity(self):
+        """
+        Reject now if a new job would be rejected
+        
+        Raises:
+            EngineBusyError: If the queue is full
+        """
+        if self.is_saturated:
+            REJECTED.inc()
+            raise EngineBusyError(
+                f"Inference queue full ({self._pending} jobs pending)"
+            )
+            
+    def _admit(self, check: bool = True):
+        if check:
+            self.check_capacity()
+        self._pending += 1
+        
+    def _done(self, _future: Any = None):
+        self._pending -= 1
+        
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking call on a worker
+        
+        Raises:
+            EngineBusyError: If the queue is full
+        """
+        self._admit()
+        # Carry the caller's context (request trace) onto the worker
+        context = contextvars.copy_context()
+        future = asyncio.get_running_loop().run_in_executor(self._pool, context.run, fn, *args)
+        future.add_done_callback(self._done)
+        return await future
+        
+    async def iterate(
+        self,
+        factory: Callable[..., Iterator[T]],
+        *args: Any,
+        admitted: bool = False
+    ) -> AsyncGenerator[T, None]:
+        """
+        Run a blocking generator on a worker and yield its items
+        
+        The worker stays at most buffer_size items ahead of the consumer, and
+        stops at the next item once the consumer goes away.
+        
+        Args:
+            factory: Generator function run on the worker
+            admitted: The caller already passed check_capacity() for the
+                work this job belongs to; the job is counted but never rejected
+        
+        Raises:
+            EngineBusyError: If the queue is full (and not admitted)
+        """
+        self._admit(check=not admitted)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        space = threading.Semaphore(self.buffer_size)
+        cancelled = threading.Event()
+        
+        def publish(done: bool, value: Any):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (done, value))
+            except RuntimeError:
+                # Event loop already closed
+                cancelled.set()
+                
+        def produce():
+            iterator = factory(*args)
+            try:
+                for item in iterator:
+                    while not space.acquire(timeout=0.1):
+                        if cancelled.is_set():
+                            return
+                    if cancelled.is_set():
+                        return
+                    publish(False, item)
+                publish(True, None)
+            except Exception as e:
+                publish(True, e)
+            finally:
+                close = getattr(iterator, "close", None)
+                if close:
+                    close()
+                    
+        future = loop.run_in_executor(self._pool, contextvars.copy_context().run, produce)
+        future.add_done_callback(self._done)
+        
+        try:
+            while True:
+                done, value = await queue.get()
+                if done:
+                    if value is not None:
+                        raise value
+                    return
+                space.release()
+                yield value
+        finally:
+            cancelled.set()
+            
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work and release the worker threads"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,107 @@
+"""
+Grapheme-to-phoneme result cache for Kokoro pipelines
+Memoizes text normalization + G2P so repeated and templated text skips
+straight to the model forward pass
+"""
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+from backend.core.tracing import span
+
+
+class G2PCache:
+    """Bounded LRU of G2P results shared by all pipelines"""
+    
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+    def get(self, key: Tuple[Hashable, ...]) -> Any:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+            
+    def put(self, key: Tuple[Hashable, ...], result: Any):
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+class CachedG2P:
+    """
+    Drop-in replacement for KPipeline.g2p
+    
+    Cache hits are served concurrently; misses are serialized on the shared
+    lock because espeak is not thread-safe.
+    """
+    
+    def __init__(
+        self,
+        g2p,
+        cache: G2PCache,
+        lang_code: str,
+        lexicon_version: Hashable,
+        lock: threading.Lock
+    ):
+        """
+        Args:
+            g2p: The pipeline's original G2P callable
+            cache: Shared result cache
+            lang_code: Pipeline language, part of the key
+            lexicon_version: Fingerprint of custom lexicon entries, part of the key
+            lock: Lock serializing calls into the underlying G2P
+        """
+        self._g2p = g2p
+        self._cache = cache
+        self._lang_code = lang_code
+        self._lexicon_version = lexicon_version
+        self._lock = lock
+        
+    def __call__(self, text: str):
+        key = (self._lang_code, self._lexicon_version, text)
+        result = self._cache.get(key)
+        
+        if result is None:
+            with span("g2p", chars=len(text)):
+                with self._lock:
+                    result = self._g2p(text)
+            self._cache.put(key, result)
+            
+        phonemes, tokens = result
+        if tokens is not None:
+            # English tokens are annotated in place (timestamps) downstream
+            tokens = copy.deepcopy(tokens)
+        return phonemes, tokens
+        
+    def __getattr__(self, name: str):
+        return getattr(self._g2p, name)
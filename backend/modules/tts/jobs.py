@@ -0,0 +1,613 @@
+"""
+Batch synthesis jobs for Lua TTS System
+A persistent SQLite job queue shared by any number of worker tasks or
+processes, a content-addressed store for the rendered files and
+streamed zip/tar archives of a finished job
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sqlite3
+import tarfile
+import threading
+import time
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from backend.core.config import settings
+from backend.core.logger import logger
+from backend.core.metrics import registry
+from .admission import AdmissionController, AdmissionError, BULK
+from .audio_encoder import get_encoder
+from .cache import normalize_text
+
+# Item and job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+COMPLETED = "completed"
+
+ARCHIVE_FORMATS = ("zip", "tar")
+
+
+class JobQueue:
+    """
+    Batch jobs and their items in a SQLite database
+
+    Items are claimed one at a time inside an immediate transaction, so
+    workers in other processes can share the same file safely. A claim
+    that is not finished within `stale_seconds` (a worker died) goes back
+    to the queue.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            audio_format TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            done INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS items (
+            job_id TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            voice TEXT NOT NULL,
+            speed REAL NOT NULL,
+            lang_code TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            claimed_at REAL,
+            digest TEXT,
+            size INTEGER,
+            error TEXT,
+            PRIMARY KEY (job_id, idx)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS items_queued ON items (status, claimed_at);
+    """
+
+    def __init__(self, db_path: Path, max_attempts: int = 3, stale_seconds: float = 600.0):
+        """
+        Args:
+            db_path: SQLite file shared by the API and the workers
+            max_attempts: Tries per item before it is marked failed
+            stale_seconds: Age after which a running claim is given up on
+        """
+        self.db_path = Path(db_path)
+        self.max_attempts = max(1, max_attempts)
+        self.stale_seconds = stale_seconds
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit; transactions are opened explicitly where needed
+        self._db = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, timeout=30.0, isolation_level=None
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(self.SCHEMA)
+
+    def submit(self, items: List[Dict[str, Any]], audio_format: str) -> str:
+        """
+        Enqueue a job
+
+        Args:
+            items: Dicts with text, voice, speed and lang_code
+            audio_format: Encoding of every output file
+
+        Returns:
+            The new job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO jobs (job_id, status, audio_format, total, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, QUEUED, audio_format, len(items), now, now)
+                )
+                self._db.executemany(
+                    "INSERT INTO items (job_id, idx, text, voice, speed, lang_code, status) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (job_id, idx, item["text"], item["voice"], item["speed"], item["lang_code"], QUEUED)
+                        for idx, item in enumerate(items)
+                    ]
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest queued item (or a stale claim) for a worker
+
+        Returns:
+            The item with its job's audio_format, or None when idle
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._db.execute(
+                        "SELECT i.*, j.audio_format FROM items i JOIN jobs j USING (job_id) "
+                        "WHERE i.status = ? OR (i.status = ? AND i.claimed_at < ?) "
+                        "ORDER BY j.created_at, i.idx LIMIT 1",
+                        (QUEUED, RUNNING, now - self.stale_seconds)
+                    ).fetchone()
+                    if row is None:
+                        self._db.execute("COMMIT")
+                        return None
+                    if row["status"] == QUEUED or row["attempts"] < self.max_attempts:
+                        break
+                    # Every attempt died with its worker; stop feeding it to new ones
+                    self._db.execute(
+                        "UPDATE items SET status = ?, error = ?, claimed_at = NULL WHERE job_id = ? AND idx = ?",
+                        (FAILED, "Worker lost", row["job_id"], row["idx"])
+                    )
+                    self._count(row["job_id"], "failed", now)
+
+                self._db.execute(
+                    "UPDATE items SET status = ?, worker = ?, claimed_at = ?, attempts = attempts + 1 "
+                    "WHERE job_id = ? AND idx = ?",
+                    (RUNNING, worker, now, row["job_id"], row["idx"])
+                )
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                    (RUNNING, now, row["job_id"], QUEUED)
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+        item = dict(row)
+        item["attempts"] += 1
+        return item
+
+    def _finish(self, job_id: str, idx: int, worker: str, updates: str, params: tuple, column: str):
+        """Record an item outcome if the worker still owns it (lock held)"""
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self._db.execute(
+                f"UPDATE items SET {updates}, claimed_at = NULL "
+                "WHERE job_id = ? AND idx = ? AND status = ? AND worker = ?",
+                params + (job_id, idx, RUNNING, worker)
+            )
+            if cursor.rowcount and column:
+                self._count(job_id, column, now)
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _count(self, job_id: str, column: str, now: float):
+        """Bump a job's done/failed counter, completing it with its last item"""
+        self._db.execute(
+            f"UPDATE jobs SET {column} = {column} + 1, updated_at = ? WHERE job_id = ?",
+            (now, job_id)
+        )
+        self._db.execute(
+            "UPDATE jobs SET status = ? WHERE job_id = ? AND status = ? AND done + failed >= total",
+            (COMPLETED, job_id, RUNNING)
+        )
+
+    def complete(self, item: Dict[str, Any], worker: str, digest: str, size: int):
+        """Mark an item rendered and stored under `digest`"""
+        with self._lock:
+            self._finish(
+                item["job_id"], item["idx"], worker,
+                "status = ?, digest = ?, size = ?, error = NULL", (DONE, digest, size), "done"
+            )
+
+    def fail(self, item: Dict[str, Any], worker: str, error: str, retry: bool = True):
+        """Requeue an item, or mark it failed once out of attempts"""
+        with self._lock:
+            if retry and item["attempts"] < self.max_attempts:
+                self._finish(item["job_id"], item["idx"], worker, "status = ?, error = ?", (QUEUED, error), "")
+            else:
+                self._finish(item["job_id"], item["idx"], worker, "status = ?, error = ?", (FAILED, error), "failed")
+
+    def release(self, item: Dict[str, Any], worker: str):
+        """Put an item back without counting the attempt (worker shutting down)"""
+        with self._lock:
+            self._finish(
+                item["job_id"], item["idx"], worker,
+                "status = ?, attempts = attempts - 1", (QUEUED,), ""
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop the queued items of a job; running items finish normally"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._db.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status IN (?, ?)",
+                    (CANCELLED, time.time(), job_id, QUEUED, RUNNING)
+                )
+                if cursor.rowcount:
+                    self._db.execute(
+                        "UPDATE items SET status = ? WHERE job_id = ? AND status = ?",
+                        (CANCELLED, job_id, QUEUED)
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return bool(cursor.rowcount)
+
+    def get(self, job_id: str, with_items: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Job progress
+
+        Returns:
+            Job fields with progress (0.0 - 1.0), items when asked, or None
+        """
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = dict(row)
+            if with_items:
+                job["items"] = [
+                    dict(item) for item in self._db.execute(
+                        "SELECT idx, voice, speed, status, attempts, digest, size, error "
+                        "FROM items WHERE job_id = ? ORDER BY idx",
+                        (job_id,)
+                    )
+                ]
+
+        job["progress"] = round((job["done"] + job["failed"]) / job["total"], 4) if job["total"] else 1.0
+        return job
+
+    def outputs(self, job_id: str) -> List[Dict[str, Any]]:
+        """Finished items of a job, in submission order"""
+        with self._lock:
+            return [
+                dict(row) for row in self._db.execute(
+                    "SELECT idx, text, voice, speed, digest, size FROM items "
+                    "WHERE job_id = ? AND status = ? ORDER BY idx",
+                    (job_id, DONE)
+                )
+            ]
+
+    def counts(self) -> Dict[str, int]:
+        """Items per state across all jobs"""
+        with self._lock:
+            return {
+                status: count for status, count in self._db.execute(
+                    "SELECT status, COUNT(*) FROM items GROUP BY status"
+                )
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class OutputStore:
+    """
+    Rendered files addressed by the request that produced them
+
+    Identical items (same text, voice, speed and format) in any job share
+    one file and are only synthesized once.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(text: str, voice: str, speed: float, lang_code: str, audio_format: str) -> str:
+        payload = "\x1f".join([normalize_text(text), voice, f"{speed:.3f}", lang_code, audio_format])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path(self, key: str, extension: str) -> Path:
+        return self.directory / key[:2] / f"{key}.{extension}"
+
+    def exists(self, key: str, extension: str) -> bool:
+        return self.path(key, extension).exists()
+
+    def put(self, key: str, extension: str, data: bytes) -> int:
+        """Write a file atomically; returns its size"""
+        path = self.path(key, extension)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        return len(data)
+
+
+class _Spool(io.RawIOBase):
+    """Write-only sink that hands its bytes out in pieces as an archive is built"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def archive_stream(
+    job: Dict[str, Any],
+    outputs: List[Dict[str, Any]],
+    store: OutputStore,
+    archive_format: str = "zip",
+    chunk_size: int = 1 << 20
+) -> Iterator[bytes]:
+    """
+    Stream a job's files as a zip or tar archive
+
+    Built on the fly without seeking, so memory stays at one chunk no
+    matter how large the job. A manifest.json maps entries to their texts.
+
+    Raises:
+        ValueError: If the archive format is unknown
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unknown archive format: {archive_format} (choose from {', '.join(ARCHIVE_FORMATS)})")
+
+    extension = get_encoder(job["audio_format"]).extension
+    manifest = {"job_id": job["job_id"], "audio_format": job["audio_format"], "items": []}
+    entries = []
+    for output in outputs:
+        name = f"{output['idx']:05d}_{output['voice']}.{extension}"
+        entries.append((name, store.path(output["digest"], extension)))
+        manifest["items"].append({**output, "file": name})
+    manifest_bytes = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+
+    spool = _Spool()
+    if archive_format == "zip":
+        # Audio barely compresses; storing keeps the stream CPU-cheap
+        with zipfile.ZipFile(spool, "w", compression=zipfile.ZIP_STORED) as archive:
+            for name, path in entries:
+                with open(path, "rb") as source, archive.open(name, "w") as target:
+                    while True:
+                        data = source.read(chunk_size)
+                        if not data:
+                            break
+                        target.write(data)
+                        yield spool.drain()
+            archive.writestr("manifest.json", manifest_bytes)
+    else:
+        with tarfile.open(fileobj=spool, mode="w|") as archive:
+            for name, path in entries:
+                info = tarfile.TarInfo(name)
+                info.size = path.stat().st_size
+                info.mtime = int(job["updated_at"])
+                with open(path, "rb") as source:
+                    archive.addfile(info, source)
+                yield spool.drain()
+            info = tarfile.TarInfo("manifest.json")
+            info.size = len(manifest_bytes)
+            info.mtime = int(job["updated_at"])
+            archive.addfile(info, io.BytesIO(manifest_bytes))
+
+    tail = spool.drain()
+    if tail:
+        yield tail
+
+
+class BatchRunner:
+    """
+    Worker tasks draining the job queue through a KokoroEngine
+
+    In the API process the runner goes through admission control at bulk
+    priority, so batch work only uses slots interactive traffic leaves
+    free. Standalone worker processes (see main()) run without it.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        store: OutputStore,
+        engine,
+        workers: int = 1,
+        admission: Optional[AdmissionController] = None,
+        poll_seconds: float = 1.0
+    ):
+        """
+        Args:
+            queue: Job queue to drain
+            store: Where rendered files go
+            engine: Initialized KokoroEngine
+            workers: Items rendered concurrently
+            admission: Controller to take bulk slots from (None = no limit)
+            poll_seconds: Idle wait between claims (other processes may submit)
+        """
+        self.queue = queue
+        self.store = store
+        self.engine = engine
+        self.workers = max(1, workers)
+        self.admission = admission
+        self.poll_seconds = poll_seconds
+
+        self._name = f"{os.uname().nodename}:{os.getpid()}"
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def notify(self):
+        """Wake idle workers (new job submitted in this process)"""
+        self._wakeup.set()
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self._name}:{n}"))
+            for n in range(self.workers)
+        ]
+        logger.info(f"Batch runner started with {self.workers} worker(s)")
+
+    async def join(self):
+        """Run until the workers are cancelled"""
+        await asyncio.gather(*self._tasks)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, worker: str):
+        while True:
+            item = await asyncio.to_thread(self.queue.claim, worker)
+            if item is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self.process(item, worker)
+            except asyncio.CancelledError:
+                await asyncio.to_thread(self.queue.release, item, worker)
+                raise
+
+    async def process(self, item: Dict[str, Any], worker: str):
+        """Render one item into the store and record the outcome"""
+        encoder = get_encoder(item["audio_format"])
+        key = OutputStore.make_key(
+            item["text"], item["voice"], item["speed"], item["lang_code"], encoder.name
+        )
+        path = self.store.path(key, encoder.extension)
+
+        if path.exists():
+            await asyncio.to_thread(self.queue.complete, item, worker, key, path.stat().st_size)
+            return
+
+        ticket = None
+        try:
+            if self.admission is not None:
+                ticket = await self.admission.acquire(f"batch:{item['job_id']}", BULK)
+
+            segments = [
+                audio async for audio in self.engine.synthesize(
+                    item["text"], item["voice"], item["speed"], item["lang_code"]
+                )
+            ]
+            audio = np.concatenate(segments) if segments else np.zeros(0, dtype=np.float32)
+            data = await asyncio.to_thread(encoder.encode, audio, settings.sample_rate)
+            size = await asyncio.to_thread(self.store.put, key, encoder.extension, data)
+
+        except AdmissionError as e:
+            # Interactive traffic has the slots; try again later without penalty
+            logger.debug(f"Batch item {item['job_id']}/{item['idx']} deferred: {e.detail}")
+            await asyncio.to_thread(self.queue.release, item, worker)
+            await asyncio.sleep(self.poll_seconds)
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Batch item {item['job_id']}/{item['idx']} failed: {e}")
+            await asyncio.to_thread(self.queue.fail, item, worker, str(e))
+            return
+        finally:
+            if ticket is not None:
+                ticket.release()
+
+        await asyncio.to_thread(self.queue.complete, item, worker, key, size)
+
+
+def register_metrics(queue: JobQueue):
+    """Expose batch item counts by state"""
+    registry.callback(
+        "lua_batch_items", "Batch synthesis items by state", "gauge",
+        lambda: {(status,): count for status, count in queue.counts().items()},
+        ("status",)
+    )
+
+
+def open_queue() -> JobQueue:
+    """Job queue at the configured location"""
+    return JobQueue(
+        settings.batch_db_path,
+        max_attempts=settings.batch_max_attempts,
+        stale_seconds=settings.batch_stale_seconds
+    )
+
+
+async def _run_worker(workers: int):
+    from .provider import engine_provider
+
+    engine = await engine_provider.acquire()
+    if not engine.is_initialized:
+        raise RuntimeError("TTS engine failed to initialize")
+
+    queue = open_queue()
+    runner = BatchRunner(queue, OutputStore(settings.batch_output_dir), engine, workers=workers)
+    runner.start()
+    try:
+        await runner.join()
+    finally:
+        await runner.stop()
+        queue.close()
+        await engine_provider.release()
+
+
+def _worker_process(workers: int):
+    try:
+        asyncio.run(_run_worker(workers))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: Optional[List[str]] = None):
+    """Standalone batch workers: python -m backend.modules.tts.jobs --processes 2"""
+    parser = argparse.ArgumentParser(description="Drain the Lua TTS batch job queue")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes (each loads the model)")
+    parser.add_argument("--workers", type=int, default=settings.tts_workers, help="Items rendered at once per process")
+    args = parser.parse_args(argv)
+
+    settings.ensure_directories()
+    if args.processes <= 1:
+        _worker_process(args.workers)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_worker_process, args=(args.workers,), name=f"lua-batch-{n}")
+        for n in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
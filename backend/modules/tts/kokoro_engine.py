@@ -2,18 +2,57 @@
 Kokoro TTS Engine for Portuguese (PT-BR)
 Based on Kokoro-82M model
 """
-import os
-import tempfile
-from typing import Optional, AsyncGenerator, Dict, Union, List, Tuple
+import asyncio
+import shutil
+import threading
+import time
+from collections import deque
+from typing import Optional, AsyncGenerator, AsyncIterator, Dict, Iterator, Union, List, Tuple
 from pathlib import Path
 
 import numpy as np
 import torch
-import soundfile as sf
+from huggingface_hub import hf_hub_download
 from kokoro import KModel, KPipeline
 
 from backend.core.logger import logger
 from backend.core.config import settings
+from backend.core.metrics import AUDIO_SECONDS, MODEL_LOAD_SECONDS, SYNTHESIS_SECONDS, registry
+from backend.core.readiness import Readiness
+from backend.core import tracing
+from .audio_encoder import AudioEncoder, get_encoder
+from .executor import InferenceExecutor
+from .batching import BatchScheduler
+from .cache import AudioCache
+from .g2p_cache import CachedG2P, G2PCache
+from .voice_mixer import VoiceMixer
+from .long_text import CrossfadeStitcher, SentenceBuffer, split_sentences
+from .backends import OnnxKModel, prepare_backend, weight_bytes
+
+
+class _TracedModel:
+    """Inference model proxy recording a span (and optionally a torch.profiler capture) per forward pass"""
+    
+    def __init__(self, model, trace: tracing.Trace):
+        self._model = model
+        self._trace = trace
+        self._calls = 0
+        
+    def __call__(self, phonemes: str, *args, **kwargs):
+        self._calls += 1
+        with self._trace.span("forward", phonemes=len(phonemes)) as attrs:
+            if not self._trace.profile:
+                return self._model(phonemes, *args, **kwargs)
+                
+            with torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU]) as profiler:
+                output = self._model(phonemes, *args, **kwargs)
+            path = tracing.profile_path(self._trace, f"forward{self._calls}")
+            profiler.export_chrome_trace(str(path))
+            attrs["torch_profile"] = str(path)
+            return output
+            
+    def __getattr__(self, name: str):
+        return getattr(self._model, name)
 
 
 class KokoroEngine:
@@ -29,13 +68,38 @@ class KokoroEngine:
         "luna": "af_heart",      # Luna's default voice
     }
     
+    # Custom Portuguese pronunciations (lexicon.golds entries)
+    CUSTOM_PRONUNCIATIONS = {
+        "lua": "lˈuɐ",
+        "olá": "ɔlˈa",
+        "kokoro": "kɔkˈɔɾu",
+    }
+    
     def __init__(self):
         """Initialize Kokoro engine"""
         self.device = self._get_device()
         self.model: Optional[KModel] = None
+        self.runtime_model: Optional[Union[KModel, OnnxKModel]] = None
         self.pipelines: Dict[str, KPipeline] = {}
+        self.executor: Optional[InferenceExecutor] = None
+        self.batcher: Optional[BatchScheduler] = None
+        self.cache: Optional[AudioCache] = None
+        self._g2p_lock = threading.Lock()
+        self.g2p_cache = G2PCache(settings.g2p_cache_size)
+        self.voice_mixer = VoiceMixer(settings.voice_mix_cache_size)
+        self.readiness = Readiness("tts_engine")
         self.is_initialized = False
         
+    @property
+    def inference_model(self) -> Union[KModel, OnnxKModel, BatchScheduler]:
+        """Model handed to pipeline calls (backend runtime, behind the batcher if enabled)"""
+        return self.batcher or self.runtime_model or self.model
+        
+    @property
+    def is_busy(self) -> bool:
+        """True when the inference queue cannot take another job"""
+        return self.executor is not None and self.executor.is_saturated
+        
     def _get_device(self) -> str:
         """Determine the best available device"""
         if settings.use_gpu:
@@ -48,13 +112,66 @@ class KokoroEngine:
         logger.info("Using CPU device")
         return "cpu"
         
+    def _load_model(self) -> KModel:
+        """
+        Load KModel from the local model cache
+        
+        The first run copies config and weights out of the HF hub cache into
+        settings.models_dir; later starts make no hub calls and mmap the
+        weights instead of reading them into fresh buffers.
+        """
+        repo_id = settings.model_repo_id
+        local_dir = settings.models_dir / repo_id.replace("/", "--")
+        config_path = local_dir / "config.json"
+        weights_path = local_dir / KModel.MODEL_NAMES[repo_id]
+        
+        if not (config_path.exists() and weights_path.exists()):
+            logger.info(f"Populating local model cache: {local_dir}")
+            local_dir.mkdir(parents=True, exist_ok=True)
+            for target in (config_path, weights_path):
+                shutil.copyfile(hf_hub_download(repo_id=repo_id, filename=target.name), target)
+                
+        # Build the architecture without weights, then attach the mmap'd tensors
+        empty_path = local_dir / "empty.pth"
+        if not empty_path.exists():
+            torch.save({}, empty_path)
+        model = KModel(repo_id=repo_id, config=str(config_path), model=str(empty_path))
+        
+        try:
+            weights = torch.load(weights_path, map_location="cpu", weights_only=True, mmap=True)
+        except RuntimeError:
+            # Legacy (non-zip) checkpoints cannot be mmap'd
+            weights = torch.load(weights_path, map_location="cpu", weights_only=True)
+            
+        for key, state_dict in weights.items():
+            module = getattr(model, key)
+            try:
+                module.load_state_dict(state_dict, assign=True)
+            except RuntimeError:
+                # Checkpoints saved from DataParallel carry a "module." prefix
+                state_dict = {k[7:]: v for k, v in state_dict.items()}
+                module.load_state_dict(state_dict, strict=False, assign=True)
+                
+        return model
+        
     async def initialize(self) -> bool:
-        """Initialize the Kokoro model and pipelines"""
+        """
+        Initialize the Kokoro model and pipelines
+        
+        Weight loading and G2P pipeline setup run concurrently off the event
+        loop; progress is tracked in self.readiness.
+        """
         try:
             logger.info("Initializing Kokoro TTS Engine...")
+            self.readiness.advance(Readiness.LOADING)
             
-            # Initialize model
-            self.model = KModel()
+            # Load weights while the Portuguese pipeline sets up G2P
+            started = time.perf_counter()
+            self.model, _ = await asyncio.gather(
+                asyncio.to_thread(self._load_model),
+                asyncio.to_thread(self._create_pipeline, "p")
+            )
+            MODEL_LOAD_SECONDS.set(time.perf_counter() - started)
             
             # Move to appropriate device
             if self.device == "cuda":
@@ -66,28 +183,109 @@ class KokoroEngine:
                 
             self.model.eval()
             
-            # Create pipeline for Portuguese
-            self._create_pipeline("p")  # 'p' for Portuguese
+            # Runtime for the configured inference backend
+            self.runtime_model = prepare_backend(
+                settings.inference_backend,
+                self.model,
+                cache_dir=settings.models_dir,
+                threads=settings.torch_threads
+            )
+            
+            # Worker pool for blocking inference
+            if self.executor is None:
+                self.executor = InferenceExecutor(
+                    workers=settings.tts_workers,
+                    max_queue=settings.tts_max_queue,
+                    torch_threads=settings.torch_threads
+                )
+                
+            # Cache synthesized audio across requests
+            if settings.enable_audio_cache and self.cache is None:
+                self.cache = AudioCache(
+                    settings.cache_dir / "audio",
+                    memory_bytes=settings.audio_cache_memory_mb * 1024 * 1024,
+                    disk_bytes=settings.audio_cache_disk_mb * 1024 * 1024,
+                    ttl_seconds=settings.audio_cache_ttl_hours * 3600
+                )
+                
+            # Batch forward passes across concurrent requests
+            if settings.enable_batching and self.batcher is None:
+                if not isinstance(self.runtime_model, KModel):
+                    logger.warning(f"Batching not supported by the {settings.inference_backend} backend")
+                else:
+                    self.batcher = BatchScheduler(
+                        self.runtime_model,
+                        max_batch_size=settings.tts_max_batch_size,
+                        max_wait_ms=settings.tts_batch_wait_ms,
+                        timeout_s=settings.tts_batch_timeout_seconds
+                    )
+                
+            self._register_metrics()
             
             # Warm up the model
+            self.readiness.advance(Readiness.WARMING)
             await self._warmup()
             
             self.is_initialized = True
+            self.readiness.advance(Readiness.READY)
             logger.info("✅ Kokoro TTS Engine initialized successfully")
             return True
             
         except Exception as e:
             logger.error(f"Failed to initialize Kokoro engine: {e}")
+            self.readiness.advance(Readiness.FAILED, error=str(e))
             return False
             
+    def _register_metrics(self):
+        """Expose engine state read at scrape time (nothing on the hot path)"""
+        def caches():
+            stats = {"g2p": self.g2p_cache.stats(), "voice_mix": self.voice_mixer.stats()}
+            if self.cache:
+                audio = self.cache.stats()
+                stats["audio"] = {
+                    "hits": audio["memory_hits"] + audio["disk_hits"],
+                    "misses": audio["misses"],
+                }
+            return stats
+            
+        def ratio(stats: Dict[str, int]) -> float:
+            lookups = stats["hits"] + stats["misses"]
+            return stats["hits"] / lookups if lookups else 0.0
+            
+        registry.callback(
+            "lua_tts_queue_depth", "Synthesis jobs waiting for a worker", "gauge",
+            lambda: {(): self.executor.queue_depth}
+        )
+        registry.callback(
+            "lua_tts_jobs_pending", "Synthesis jobs running or queued", "gauge",
+            lambda: {(): self.executor.pending}
+        )
+        registry.callback(
+            "lua_tts_cache_hits_total", "Cache hits", "counter",
+            lambda: {(name,): s["hits"] for name, s in caches().items()}, ("cache",)
+        )
+        registry.callback(
+            "lua_tts_cache_misses_total", "Cache misses", "counter",
+            lambda: {(name,): s["misses"] for name, s in caches().items()}, ("cache",)
+        )
+        registry.callback(
+            "lua_tts_cache_hit_ratio", "Cache hit ratio since startup", "gauge",
+            lambda: {(name,): ratio(s) for name, s in caches().items()}, ("cache",)
+        )
+        registry.callback(
+            "lua_tts_ready", "1 when the engine serves requests", "gauge",
+            lambda: {(): float(self.readiness.is_ready)}
+        )
+        
     def _create_pipeline(self, lang_code: str) -> KPipeline:
         """Create or get pipeline for language code"""
         if lang_code not in self.pipelines:
             logger.info(f"Creating pipeline for language: {lang_code}")
+            # Model-less pipeline: the inference model is passed per call
             self.pipelines[lang_code] = KPipeline(
                 lang_code=lang_code,
-                model=self.model,
-                device=self.device
+                repo_id=settings.model_repo_id,
+                model=False
             )
             
             # Try to add custom pronunciations for Portuguese if supported
@@ -97,14 +295,22 @@ class KokoroEngine:
                     if hasattr(self.pipelines[lang_code], 'g2p') and hasattr(self.pipelines[lang_code].g2p, 'lexicon'):
                         lexicon = self.pipelines[lang_code].g2p.lexicon
                         if hasattr(lexicon, 'golds'):
-                            lexicon.golds['lua'] = 'lˈuɐ'
-                            lexicon.golds['olá'] = 'ɔlˈa'
-                            lexicon.golds['kokoro'] = 'kɔkˈɔɾu'
+                            lexicon.golds.update(self.CUSTOM_PRONUNCIATIONS)
                             logger.info("Custom pronunciations added successfully")
                     else:
                         logger.warning("G2P lexicon not available in current Kokoro version")
                 except Exception as e:
                     logger.warning(f"Could not add custom pronunciations: {e}")
+                    
+            # Memoize G2P; misses are serialized since pipelines run on worker threads
+            pipeline = self.pipelines[lang_code]
+            pipeline.g2p = CachedG2P(
+                pipeline.g2p,
+                self.g2p_cache,
+                lang_code,
+                lexicon_version=hash(frozenset(self.CUSTOM_PRONUNCIATIONS.items())),
+                lock=self._g2p_lock
+            )
                 
         return self.pipelines[lang_code]
         
@@ -118,77 +324,482 @@ class KokoroEngine:
                 voice = self.PTBR_VOICES["luna"]
                 
                 # Generate small test audio
-                for result in pipeline(test_text, voice=voice, speed=1.0):
-                    if result.audio is not None:
-                        logger.info("✅ Model warmup successful")
-                        break
+                warmed = False
+                async for _ in self.executor.iterate(
+                    self._run_pipeline, pipeline, test_text, voice, 1.0
+                ):
+                    warmed = True
+                if warmed:
+                    logger.info("✅ Model warmup successful")
         except Exception as e:
             logger.warning(f"Warmup failed (non-critical): {e}")
             
-    async def generate_speech(
+    def _run_pipeline(
+        self,
+        pipeline: KPipeline,
+        text: str,
+        kokoro_voice: Union[str, torch.FloatTensor],
+        speed: float
+    ) -> Iterator[np.ndarray]:
+        """Blocking pipeline run (G2P + forward pass), executed on a worker"""
+        model = self.inference_model
+        trace = tracing.current()
+        if trace is not None:
+            model = _TracedModel(model, trace)
+        for result in pipeline(text, voice=kokoro_voice, speed=speed, model=model):
+            if result.audio is not None:
+                yield result.audio.numpy()
+            
+    async def synthesize(
         self,
         text: str,
         voice: str = "luna",
         speed: float = 1.0,
-        lang_code: str = "p"
-    ) -> AsyncGenerator[bytes, None]:
+        lang_code: str = "p",
+        voice_pack: Optional[torch.FloatTensor] = None
+    ) -> AsyncGenerator[np.ndarray, None]:
         """
-        Generate speech from text
+        Synthesize raw waveform segments
         
         Args:
             text: Text to synthesize
             voice: Voice identifier
             speed: Speech speed (0.5 to 2.0)
             lang_code: Language code ('p' for Portuguese)
+            voice_pack: Precomputed style pack to use instead of loading `voice`
+                (which then only names it, e.g. for cache keys)
             
         Yields:
-            Audio chunks in bytes
+            Float32 waveform per pipeline segment
         """
         if not self.is_initialized:
             raise RuntimeError("Engine not initialized")
             
+        if (
+            settings.enable_parallel_long_text
+            and len(text) > settings.long_text_threshold
+            and self.executor.workers > 1
+        ):
+            segments = self._synthesize_parallel(text, voice, speed, lang_code, voice_pack)
+        else:
+            segments = self._synthesize_text(text, voice, speed, lang_code, voice_pack)
+            
+        async for audio in segments:
+            yield audio
+            
+    async def _synthesize_text(
+        self,
+        text: str,
+        voice: str,
+        speed: float,
+        lang_code: str,
+        voice_pack: Optional[torch.FloatTensor] = None,
+        admitted: bool = False
+    ) -> AsyncGenerator[np.ndarray, None]:
+        """
+        Single-pass synthesis through one pipeline run (audio-cached)
+        
+        Args:
+            admitted: Capacity was checked for the whole utterance this text
+                is part of, so the executor must not reject it
+        """
+        # Map voice to Kokoro voice
+        kokoro_voice = self.PTBR_VOICES.get(voice, voice)
+        
+        # Get or create pipeline
+        pipeline = self._create_pipeline(lang_code)
+        
+        started = time.perf_counter()
+        cache_key = None
+        if self.cache and len(text) <= settings.audio_cache_max_chars:
+            with tracing.span("normalize", chars=len(text)):
+                cache_key = AudioCache.make_key(text, kokoro_voice, speed, lang_code)
+            with tracing.span("cache_lookup") as attrs:
+                cached = await asyncio.to_thread(self.cache.get, cache_key)
+                attrs["hit"] = cached is not None
+            if cached is not None:
+                logger.debug(f"Audio cache hit: '{text[:50]}'")
+                SYNTHESIS_SECONDS.observe(time.perf_counter() - started, "hit")
+                for audio in cached:
+                    AUDIO_SECONDS.inc(amount=len(audio) / settings.sample_rate)
+                    yield audio
+                return
+                
+        logger.info(f"Generating speech: '{text[:50]}...' with voice '{voice}'")
+        
+        segments = []
+        async for audio in self.executor.iterate(
+            self._run_pipeline,
+            pipeline,
+            text,
+            kokoro_voice if voice_pack is None else voice_pack,
+            speed,
+            admitted=admitted
+        ):
+            if cache_key:
+                segments.append(audio)
+            AUDIO_SECONDS.inc(amount=len(audio) / settings.sample_rate)
+            yield audio
+            
+        # Only completed syntheses reach this point
+        SYNTHESIS_SECONDS.observe(time.perf_counter() - started, "miss" if cache_key else "off")
+        if cache_key:
+            await asyncio.to_thread(self.cache.put, cache_key, segments)
+            
+    async def _synthesize_parallel(
+        self,
+        text: str,
+        voice: str,
+        speed: float,
+        lang_code: str,
+        voice_pack: Optional[torch.FloatTensor] = None
+    ) -> AsyncGenerator[np.ndarray, None]:
+        """
+        Long-text mode: synthesize sentences in parallel, yield them in order
+        
+        Up to one sentence per worker is in flight; parts are cross-faded at
+        the joins as they are emitted.
+        
+        Capacity is checked once, before the first part: once audio has been
+        sent, a later part must not fail with EngineBusyError and truncate
+        the stream. Extra parts are only prefetched while the pool has room.
+        
+        Raises:
+            EngineBusyError: If the queue is full when the utterance starts
+        """
+        self.executor.check_capacity()
+        units = split_sentences(text, settings.long_text_chunk_chars)
+        logger.info(f"Long text: {len(units)} parts across {self.executor.workers} workers")
+        
+        async def render(unit: str) -> np.ndarray:
+            parts = [
+                audio async for audio in
+                self._synthesize_text(unit, voice, speed, lang_code, voice_pack, admitted=True)
+            ]
+            return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+            
+        stitcher = CrossfadeStitcher(int(settings.crossfade_ms * settings.sample_rate / 1000))
+        pending = deque(units)
+        in_flight: deque = deque()
+        
         try:
-            # Map voice to Kokoro voice
-            kokoro_voice = self.PTBR_VOICES.get(voice, voice)
+            while pending or in_flight:
+                # Keep the pool busy, but never prefetch into a full queue
+                while pending and (
+                    not in_flight
+                    or (len(in_flight) < self.executor.workers and not self.executor.is_saturated)
+                ):
+                    in_flight.append(asyncio.create_task(render(pending.popleft())))
+                    
+                audio = stitcher.push(await in_flight.popleft())
+                if len(audio):
+                    yield audio
+                    
+            tail = stitcher.flush()
+            if len(tail):
+                yield tail
+                
+        finally:
+            for task in in_flight:
+                task.cancel()
+                
+    async def synthesize_incremental(
+        self,
+        fragments: AsyncIterator[str],
+        voice: str = "luna",
+        speed: float = 1.0,
+        lang_code: str = "p",
+        admitted: bool = False
+    ) -> AsyncGenerator[np.ndarray, None]:
+        """
+        Synthesize text that is still being generated
+        
+        Fragments are split into sentences as they arrive; each sentence is
+        rendered while later text is still being produced, with up to one
+        in flight per worker, and yielded in order with cross-faded joins.
+        Time to first audio is bounded by the first sentence, not by the
+        whole reply.
+        
+        Capacity is checked once, before the first sentence, as in
+        _synthesize_parallel; extra sentences are only prefetched while the
+        pool has room.
+        
+        Args:
+            fragments: Async iterator of text pieces (tokens, lines, ...)
+            voice: Voice identifier
+            speed: Speech speed (0.5 to 2.0)
+            lang_code: Language code ('p' for Portuguese)
+            admitted: The caller already passed check_capacity()
+            
+        Yields:
+            Float32 waveform parts
+            
+        Raises:
+            EngineBusyError: If the queue is full when the reply starts
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Engine not initialized")
+        if not admitted:
+            self.executor.check_capacity()
             
-            # Get or create pipeline
-            pipeline = self._create_pipeline(lang_code)
+        async def render(unit: str) -> np.ndarray:
+            parts = [
+                audio async for audio in
+                self._synthesize_text(unit, voice, speed, lang_code, admitted=True)
+            ]
+            return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+            
+        in_flight = 0
+        progress = asyncio.Event()  # set whenever a render is consumed
+        renders: asyncio.Queue = asyncio.Queue()
+        
+        def has_room() -> bool:
+            # Keep the pool busy, but never prefetch into a full queue
+            return not in_flight or (
+                in_flight < self.executor.workers and not self.executor.is_saturated
+            )
             
-            # Generate audio
-            logger.info(f"Generating speech: '{text[:50]}...' with voice '{voice}'")
+        async def schedule():
+            splitter = SentenceBuffer(settings.long_text_chunk_chars)
             
-            for result in pipeline(text, voice=kokoro_voice, speed=speed):
-                if result.audio is not None:
-                    audio_numpy = result.audio.numpy()
+            async def submit(units: List[str]):
+                nonlocal in_flight
+                for unit in units:
+                    while not has_room():
+                        progress.clear()
+                        await progress.wait()
+                    in_flight += 1
+                    await renders.put(asyncio.create_task(render(unit)))
+                    
+            try:
+                async for fragment in fragments:
+                    await submit(splitter.feed(fragment))
+                await submit(splitter.flush())
+            except Exception as e:
+                await renders.put(e)
+            finally:
+                await renders.put(None)
+                
+        producer = asyncio.create_task(schedule())
+        stitcher = CrossfadeStitcher(int(settings.crossfade_ms * settings.sample_rate / 1000))
+        outstanding: List[asyncio.Task] = []
+        
+        try:
+            while True:
+                item = await renders.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
                     
-                    # Convert to bytes
-                    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-                        sf.write(tmp.name, audio_numpy, settings.sample_rate)
-                        tmp.seek(0)
-                        audio_bytes = open(tmp.name, 'rb').read()
-                        os.unlink(tmp.name)
-                        
-                    yield audio_bytes
+                outstanding.append(item)
+                try:
+                    audio = stitcher.push(await item)
+                finally:
+                    outstanding.remove(item)
+                    in_flight -= 1
+                    progress.set()
+                if len(audio):
+                    yield audio
                     
+            tail = stitcher.flush()
+            if len(tail):
+                yield tail
+                
+        finally:
+            producer.cancel()
+            while not renders.empty():
+                item = renders.get_nowait()
+                if isinstance(item, asyncio.Task):
+                    item.cancel()
+            for task in outstanding:
+                task.cancel()
+                
+    async def precompute(
+        self,
+        texts: List[str],
+        voice: str = "luna",
+        speed: float = 1.0,
+        lang_code: str = "p"
+    ) -> int:
+        """
+        Synthesize texts ahead of time so later requests hit the cache
+        
+        Returns:
+            Number of texts cached
+        """
+        if not self.cache:
+            return 0
+            
+        count = 0
+        for text in texts:
+            try:
+                async for _ in self.synthesize(text, voice, speed, lang_code):
+                    pass
+                count += 1
+            except Exception as e:
+                logger.warning(f"Could not precompute '{text[:30]}': {e}")
+                
+        logger.info(f"Precomputed {count} phrases for voice '{voice}'")
+        return count
+        
+    @staticmethod
+    async def _encode(
+        segments: AsyncGenerator[np.ndarray, None],
+        encoder: AudioEncoder,
+        stream: bool
+    ) -> AsyncGenerator[bytes, None]:
+        """Encode segments as standalone files or as one progressive stream"""
+        if stream:
+            header = encoder.stream_header(settings.sample_rate)
+            if header:
+                yield header
+                
+        async for audio in segments:
+            with tracing.span("encode", format=encoder.name, samples=len(audio)):
+                if stream:
+                    chunk = encoder.encode_frames(audio, settings.sample_rate)
+                else:
+                    chunk = encoder.encode(audio, settings.sample_rate)
+            yield chunk
+                
+    async def generate_speech(
+        self,
+        text: str,
+        voice: str = "luna",
+        speed: float = 1.0,
+        lang_code: str = "p",
+        audio_format: Optional[str] = None
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Generate speech from text, one standalone audio file per segment
+        
+        Args:
+            text: Text to synthesize
+            voice: Voice identifier
+            speed: Speech speed (0.5 to 2.0)
+            lang_code: Language code ('p' for Portuguese)
+            audio_format: Encoding for each chunk (defaults to settings.audio_format)
+            
+        Yields:
+            Audio chunks in bytes
+        """
+        encoder = get_encoder(audio_format or settings.audio_format)
+        
+        try:
+            segments = self.synthesize(text, voice, speed, lang_code)
+            async for chunk in self._encode(segments, encoder, stream=False):
+                yield chunk
+                
         except Exception as e:
             logger.error(f"Speech generation failed: {e}")
             raise
             
+    async def stream_speech(
+        self,
+        text: str,
+        voice: str = "luna",
+        speed: float = 1.0,
+        lang_code: str = "p",
+        audio_format: str = "wav"
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Generate speech as one progressive stream
+        
+        For WAV a single header with open-ended length is sent first, then
+        raw PCM frames as each segment is produced. Formats without a
+        streamable container (mp3, opus, ...) are sent in chunked mode.
+        
+        Args:
+            text: Text to synthesize
+            voice: Voice identifier
+            speed: Speech speed (0.5 to 2.0)
+            lang_code: Language code ('p' for Portuguese)
+            audio_format: Stream encoding
+            
+        Yields:
+            Stream bytes, header first
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Engine not initialized")
+            
+        encoder = get_encoder(audio_format)
+        
+        try:
+            segments = self.synthesize(text, voice, speed, lang_code)
+            async for chunk in self._encode(segments, encoder, stream=True):
+                yield chunk
+                
+        except Exception as e:
+            logger.error(f"Speech streaming failed: {e}")
+            raise
+            
+    async def stream_incremental(
+        self,
+        fragments: AsyncIterator[str],
+        voice: str = "luna",
+        speed: float = 1.0,
+        lang_code: str = "p",
+        audio_format: str = "wav"
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Progressive stream of text that is still being generated
+        
+        Same framing as stream_speech; the header goes out immediately and
+        each sentence follows as soon as it is synthesized. Capacity is
+        checked before the header, so a busy engine fails the request
+        instead of cutting the stream short.
+        
+        Args:
+            fragments: Async iterator of text pieces
+            voice: Voice identifier
+            speed: Speech speed (0.5 to 2.0)
+            lang_code: Language code ('p' for Portuguese)
+            audio_format: Stream encoding
+            
+        Yields:
+            Stream bytes, header first
+            
+        Raises:
+            EngineBusyError: If the queue is full when the reply starts
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Engine not initialized")
+            
+        encoder = get_encoder(audio_format)
+        self.executor.check_capacity()
+        
+        try:
+            segments = self.synthesize_incremental(fragments, voice, speed, lang_code, admitted=True)
+            async for chunk in self._encode(segments, encoder, stream=True):
+                yield chunk
+                
+        except Exception as e:
+            logger.error(f"Incremental speech streaming failed: {e}")
+            raise
+            
     async def mix_voices(
         self,
         text: str,
         voices: List[str],
         weights: Optional[List[float]] = None,
-        speed: float = 1.0
+        speed: float = 1.0,
+        audio_format: Optional[str] = None,
+        stream: bool = False
     ) -> AsyncGenerator[bytes, None]:
         """
         Generate speech with mixed voices
         
+        Voices are blended once in style-embedding space (cached per
+        voices/weights), so a mix costs the same as a single voice.
+        
         Args:
             text: Text to synthesize
             voices: List of voice identifiers
             weights: Voice mixing weights (sum to 1.0)
             speed: Speech speed
+            audio_format: Output encoding (defaults to settings.audio_format)
+            stream: Send one progressive stream instead of a file per segment
             
         Yields:
             Mixed audio chunks
@@ -199,6 +810,8 @@ class KokoroEngine:
         if not voices:
             raise ValueError("At least one voice required")
             
+        encoder = get_encoder(audio_format or settings.audio_format)
+            
         # Default equal weights
         if weights is None:
             weights = [1.0 / len(voices)] * len(voices)
@@ -209,38 +822,20 @@ class KokoroEngine:
         
         try:
             pipeline = self._create_pipeline("p")
+            kokoro_voices = [self.PTBR_VOICES.get(voice, voice) for voice in voices]
             
-            # Generate audio for each voice
-            audios = []
-            for voice, weight in zip(voices, weights):
-                kokoro_voice = self.PTBR_VOICES.get(voice, voice)
-                
-                for result in pipeline(text, voice=kokoro_voice, speed=speed):
-                    if result.audio is not None:
-                        audio_numpy = result.audio.numpy() * weight
-                        audios.append(audio_numpy)
-                        break
-                        
-            # Mix audios
-            if audios:
-                # Pad to same length
-                max_len = max(len(a) for a in audios)
-                padded = [np.pad(a, (0, max_len - len(a))) for a in audios]
-                
-                # Sum weighted audios
-                mixed = np.sum(padded, axis=0)
-                
-                # Normalize
-                mixed = mixed / np.max(np.abs(mixed))
-                
-                # Convert to bytes
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-                    sf.write(tmp.name, mixed, settings.sample_rate)
-                    tmp.seek(0)
-                    audio_bytes = open(tmp.name, 'rb').read()
-                    os.unlink(tmp.name)
-                    
-                yield audio_bytes
+            voice_pack = await self.executor.run(
+                self.voice_mixer.blend, pipeline, kokoro_voices, weights
+            )
+            segments = self.synthesize(
+                text,
+                VoiceMixer.describe(kokoro_voices, weights),
+                speed,
+                "p",
+                voice_pack=voice_pack
+            )
+            async for chunk in self._encode(segments, encoder, stream):
+                yield chunk
                 
         except Exception as e:
             logger.error(f"Voice mixing failed: {e}")
@@ -260,17 +855,41 @@ class KokoroEngine:
             ]
         }
         
+    def memory_usage(self) -> Dict[str, int]:
+        """Report bytes held by model weights and loaded voice packs"""
+        model_bytes = weight_bytes(self.model) if self.model is not None else 0
+                
+        voice_bytes = 0
+        for pipeline in self.pipelines.values():
+            for pack in getattr(pipeline, "voices", {}).values():
+                voice_bytes += pack.numel() * pack.element_size()
+                
+        return {
+            "model_bytes": model_bytes,
+            "voice_bytes": voice_bytes,
+            "pipelines": len(self.pipelines),
+        }
+        
     async def cleanup(self):
         """Clean up resources"""
         try:
             if self.model:
                 del self.model
                 self.model = None
+            self.runtime_model = None
                 
             for pipeline in self.pipelines.values():
                 del pipeline
             self.pipelines.clear()
             
+            if self.batcher:
+                self.batcher.shutdown()
+                self.batcher = None
+                
+            if self.executor:
+                self.executor.shutdown()
+                self.executor = None
+            
             # Clear GPU cache if available
             if self.device == "cuda" and torch.cuda.is_available():
                 torch.cuda.empty_cache()
@@ -279,6 +898,7 @@ class KokoroEngine:
                 torch.mps.empty_cache()
                 
             self.is_initialized = False
+            self.readiness.advance(Readiness.STOPPING)
             logger.info("Kokoro engine cleaned up")
             
         except Exception as e:
@@ -0,0 +1,147 @@
+"""
+Long-text helpers for the Kokoro TTS engine
+Sentence/phrase splitting and cross-fade stitching of synthesized parts
+"""
+import re
+from typing import List, Optional
+
+import numpy as np
+
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+PHRASE_END = re.compile(r"(?<=[;:,—])\s+")
+
+
+def _wrap_words(text: str, max_chars: int) -> List[str]:
+    """Hard-wrap text on word boundaries"""
+    parts, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > max_chars:
+            parts.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_sentences(text: str, max_chars: int = 200) -> List[str]:
+    """
+    Split text into synthesis units at sentence boundaries
+
+    Sentences longer than max_chars are split at phrase punctuation, then
+    at word boundaries; short neighbouring sentences are merged up to
+    max_chars so each unit is worth a job.
+
+    Args:
+        text: Input text
+        max_chars: Target upper bound per unit
+
+    Returns:
+        Ordered list of non-empty units
+    """
+    pieces: List[str] = []
+    for line in text.splitlines():
+        for sentence in SENTENCE_END.split(line.strip()):
+            if not sentence:
+                continue
+            if len(sentence) <= max_chars:
+                pieces.append(sentence)
+                continue
+            for phrase in PHRASE_END.split(sentence):
+                if len(phrase) <= max_chars:
+                    pieces.append(phrase)
+                else:
+                    pieces.extend(_wrap_words(phrase, max_chars))
+
+    units: List[str] = []
+    for piece in pieces:
+        if units and len(units[-1]) + 1 + len(piece) <= max_chars:
+            units[-1] = f"{units[-1]} {piece}"
+        else:
+            units.append(piece)
+    return units
+
+
+class SentenceBuffer:
+    """
+    Incremental sentence splitter for text that arrives in fragments
+
+    Completed sentences are released as soon as their boundary is seen, so
+    synthesis can start while the rest of the reply is still generated.
+    Text that grows past max_chars without a boundary is released at the
+    last phrase or word break.
+    """
+
+    def __init__(self, max_chars: int = 200):
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, fragment: str) -> List[str]:
+        """Add text and get the sentences it completed"""
+        self._buffer += fragment
+        sentences: List[str] = []
+
+        while True:
+            match = SENTENCE_END.search(self._buffer)
+            if match and match.start() <= self.max_chars:
+                end = match.start()
+            elif len(self._buffer) > self.max_chars:
+                head = self._buffer[:self.max_chars]
+                breaks = [m.start() for m in PHRASE_END.finditer(head)] or \
+                    [m.start() for m in re.finditer(r"\s+", head)]
+                end = breaks[-1] if breaks else self.max_chars
+            else:
+                break
+
+            sentence = self._buffer[:end].strip()
+            self._buffer = self._buffer[end:].lstrip()
+            if sentence:
+                sentences.append(sentence)
+
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once the text is complete"""
+        rest, self._buffer = self._buffer, ""
+        return split_sentences(rest, self.max_chars) if rest.strip() else []
+
+
+class CrossfadeStitcher:
+    """
+    Joins consecutive audio parts with a short linear cross-fade
+
+    Works incrementally: each push returns the audio that is final so far,
+    holding back the last fade window to blend with the next part.
+    """
+
+    def __init__(self, fade_samples: int):
+        self.fade_samples = max(0, fade_samples)
+        self._tail: Optional[np.ndarray] = None
+
+    def push(self, audio: np.ndarray) -> np.ndarray:
+        """Add the next part and get the audio ready to emit"""
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        out = []
+
+        if self._tail is not None:
+            overlap = min(len(self._tail), len(audio))
+            if overlap:
+                ramp = np.linspace(0.0, 1.0, overlap, dtype=np.float32)
+                out.append(self._tail[:len(self._tail) - overlap])
+                out.append(self._tail[len(self._tail) - overlap:] * (1.0 - ramp) + audio[:overlap] * ramp)
+                audio = audio[overlap:]
+            else:
+                out.append(self._tail)
+
+        keep = min(self.fade_samples, len(audio))
+        self._tail = audio[len(audio) - keep:]
+        out.append(audio[:len(audio) - keep])
+
+        return np.concatenate(out) if out else np.zeros(0, dtype=np.float32)
+
+    def flush(self) -> np.ndarray:
+        """Return the held-back tail after the last part"""
+        tail = self._tail if self._tail is not None else np.zeros(0, dtype=np.float32)
+        self._tail = None
+        return tail
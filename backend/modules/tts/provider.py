@@ -0,0 +1,89 @@
+"""
+Shared KokoroEngine provider
+Hands one loaded model and pipeline set to every consumer in the process
+"""
+import asyncio
+import resource
+from typing import Any, Callable, Dict, Optional
+
+from backend.core.logger import logger
+from .kokoro_engine import KokoroEngine
+
+
+def _process_rss() -> int:
+    """Current resident set size in bytes (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class EngineProvider:
+    """Reference-counted owner of the process-wide KokoroEngine"""
+    
+    def __init__(self, factory: Callable[[], KokoroEngine] = KokoroEngine):
+        self._factory = factory
+        self._engine: Optional[KokoroEngine] = None
+        self._refcount = 0
+        self._lock = asyncio.Lock()
+        
+    @property
+    def engine(self) -> Optional[KokoroEngine]:
+        """The shared engine, if one has been created"""
+        return self._engine
+        
+    @property
+    def refcount(self) -> int:
+        """Number of consumers currently holding the engine"""
+        return self._refcount
+        
+    async def acquire(self) -> KokoroEngine:
+        """
+        Get the shared engine, loading it on first use
+        
+        Initialization is retried on later acquires if it failed, so callers
+        should check engine.is_initialized.
+        
+        Returns:
+            The shared KokoroEngine
+        """
+        async with self._lock:
+            if self._engine is None:
+                self._engine = self._factory()
+                
+            if not self._engine.is_initialized:
+                await self._engine.initialize()
+                
+            self._refcount += 1
+            logger.debug(f"TTS engine acquired (refs: {self._refcount})")
+            return self._engine
+            
+    async def release(self):
+        """Drop one reference; the engine is cleaned up with the last one"""
+        async with self._lock:
+            if self._refcount == 0:
+                logger.warning("TTS engine released more times than acquired")
+                return
+                
+            self._refcount -= 1
+            logger.debug(f"TTS engine released (refs: {self._refcount})")
+            
+            if self._refcount == 0 and self._engine is not None:
+                await self._engine.cleanup()
+                self._engine = None
+                
+    def stats(self) -> Dict[str, Any]:
+        """Reference count and memory use of the shared engine"""
+        usage = self._engine.memory_usage() if self._engine else {}
+        return {
+            "initialized": self._engine is not None and self._engine.is_initialized,
+            "refcount": self._refcount,
+            "process_rss_bytes": _process_rss(),
+            **usage,
+        }
+
+
+# Global provider instance
+engine_provider = EngineProvider()
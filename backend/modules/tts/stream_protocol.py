@@ -0,0 +1,56 @@
+"""
+Binary audio streaming protocol for the /ws WebSocket
+
+Control messages stay JSON text frames; audio travels in binary frames
+with a fixed 12-byte little-endian header:
+
+    offset  size  field
+    0       1     version (1)
+    1       1     frame type (1 = audio, 2 = end of utterance)
+    2       2     reserved (0)
+    4       4     utterance id
+    8       4     sequence number (per utterance, from 0)
+    12      ...   payload (encoded audio; empty for end frames)
+
+A stream starts with a JSON {"type": "audio_start", ...} text frame
+describing the format, and its first audio frame carries the stream
+header (e.g. the WAV header) followed by raw frames.
+"""
+import struct
+from dataclasses import dataclass
+
+PROTOCOL_VERSION = 1
+
+FRAME_AUDIO = 1
+FRAME_END = 2
+
+HEADER = struct.Struct("<BBHII")
+
+
+@dataclass
+class Frame:
+    """Decoded binary frame"""
+    frame_type: int
+    utterance_id: int
+    sequence: int
+    payload: bytes = b""
+
+
+def pack_frame(frame_type: int, utterance_id: int, sequence: int, payload: bytes = b"") -> bytes:
+    """Build a binary frame"""
+    return HEADER.pack(PROTOCOL_VERSION, frame_type, 0, utterance_id, sequence) + payload
+
+
+def unpack_frame(data: bytes) -> Frame:
+    """
+    Parse a binary frame
+
+    Raises:
+        ValueError: If the frame is truncated or from another protocol version
+    """
+    if len(data) < HEADER.size:
+        raise ValueError(f"Frame too short: {len(data)} bytes")
+    version, frame_type, _, utterance_id, sequence = HEADER.unpack_from(data)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported protocol version: {version}")
+    return Frame(frame_type, utterance_id, sequence, bytes(data[HEADER.size:]))
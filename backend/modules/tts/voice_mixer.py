@@ -0,0 +1,82 @@
+"""
+Voice-style blending for Kokoro
+Mixes voices in style-embedding space and caches the blended voice packs
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+import torch
+from kokoro import KPipeline
+
+
+class VoiceMixer:
+    """LRU of blended voice packs keyed by (voices, weights)"""
+    
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max(1, max_entries)
+        self._packs: "OrderedDict[Tuple[Tuple[str, float], ...], torch.FloatTensor]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+    @staticmethod
+    def make_key(voices: List[str], weights: List[float]) -> Tuple[Tuple[str, float], ...]:
+        """Order-independent key; weights are rounded so float noise still hits"""
+        return tuple(sorted((v, round(w, 4)) for v, w in zip(voices, weights)))
+        
+    @staticmethod
+    def describe(voices: List[str], weights: List[float]) -> str:
+        """Stable text identity of a mix, e.g. for audio cache keys"""
+        return "+".join(f"{v}*{w}" for v, w in VoiceMixer.make_key(voices, weights))
+        
+    def blend(
+        self,
+        pipeline: KPipeline,
+        voices: List[str],
+        weights: List[float]
+    ) -> torch.FloatTensor:
+        """
+        Get the weighted sum of the voices' style packs
+        
+        Blocking on a miss (voice packs may be downloaded), so call it from
+        a worker.
+        
+        Args:
+            pipeline: Pipeline that loads and holds the individual voice packs
+            voices: Kokoro voice names
+            weights: Normalized weights, one per voice
+            
+        Returns:
+            Blended pack with the same shape as a single voice pack
+        """
+        key = self.make_key(voices, weights)
+        with self._lock:
+            pack = self._packs.get(key)
+            if pack is not None:
+                self._packs.move_to_end(key)
+                self.hits += 1
+                return pack
+            self.misses += 1
+            
+        packs = [pipeline.load_single_voice(voice) for voice in voices]
+        pack = sum(weight * p for weight, p in zip(weights, packs))
+        
+        with self._lock:
+            self._packs[key] = pack
+            while len(self._packs) > self.max_entries:
+                self._packs.popitem(last=False)
+        return pack
+        
+    def clear(self):
+        with self._lock:
+            self._packs.clear()
+            
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._packs),
+                "bytes": sum(p.numel() * p.element_size() for p in self._packs.values()),
+            }
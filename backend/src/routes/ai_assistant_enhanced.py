@@ -12,6 +12,7 @@ from src.models.cost import Cost, Profit
 from src.models.payroll import Payroll
 from src.models.nota import Nota
 from src.models.imposto import Imposto
+from src.services import caixa_balance
 from datetime import datetime, timedelta
 from sqlalchemy import func, and_, or_
 import re
@@ -822,14 +823,11 @@ def process_report_command(command, command_lower, ai):
     elif 'financeiro' in command_lower or 'caixa' in command_lower:
         date = ai.extract_date(command) or datetime.now().date()
         
-        # Buscar transações do caixa
-        transactions = CaixaTransaction.query.filter(
-            func.date(CaixaTransaction.created_at) == date
-        ).all()
-        
-        entradas = sum(t.amount for t in transactions if t.type == 'entrada')
-        saidas = sum(t.amount for t in transactions if t.type == 'saida')
-        saldo = entradas - saidas
+        # Movimento do dia (saldos diários materializados)
+        totals = caixa_balance.day_totals(date)
+        entradas = totals['total_entradas']
+        saidas = totals['total_saidas']
+        saldo = totals['saldo']
         
         message = f'💰 RELATÓRIO FINANCEIRO\n'
         message += f'{"=" * 40}\n'
@@ -837,7 +835,7 @@ def process_report_command(command, command_lower, ai):
         message += f'✅ Entradas: R$ {entradas:.2f}\n'
         message += f'❌ Saídas: R$ {saidas:.2f}\n'
         message += f'💵 Saldo: R$ {saldo:.2f}\n'
-        message += f'📊 Total de transações: {len(transactions)}\n'
+        message += f'📊 Total de transações: {totals["total_transacoes"]}\n'
         
         return {
             'success': True,
@@ -849,7 +847,7 @@ def process_report_command(command, command_lower, ai):
                 'entradas': entradas,
                 'saidas': saidas,
                 'saldo': saldo,
-                'transactions': len(transactions)
+                'transactions': totals['total_transacoes']
             }
         }
     
@@ -1067,19 +1065,13 @@ def process_financial_command(command, command_lower, ai):
     if 'saldo' in command_lower:
         date = ai.extract_date(command) or datetime.now().date()
         
-        # Calcular saldo
-        transactions = CaixaTransaction.query.filter(
-            func.date(CaixaTransaction.created_at) <= date
-        ).all()
-        
-        entradas = sum(t.amount for t in transactions if t.type == 'entrada')
-        saidas = sum(t.amount for t in transactions if t.type == 'saida')
-        saldo = entradas - saidas
+        # Calcular saldo (saldos diários materializados)
+        saldo = caixa_balance.balance_as_of(date)['saldo']
         
         # Transações do dia
-        today_transactions = [t for t in transactions if t.created_at.date() == date]
-        today_entradas = sum(t.amount for t in today_transactions if t.type == 'entrada')
-        today_saidas = sum(t.amount for t in today_transactions if t.type == 'saida')
+        today = caixa_balance.day_totals(date)
+        today_entradas = today['total_entradas']
+        today_saidas = today['total_saidas']
         
         message = f'💰 SALDO DO CAIXA\n'
         message += f'{"=" * 40}\n'
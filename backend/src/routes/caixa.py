@@ -5,6 +5,8 @@ from datetime import datetime
 
 # Importar os novos modelos (serão adicionados ao sistema)
 from src.models.caixa import CaixaCategory, CaixaTransaction
+from src.services import caixa_balance
+from src.utils.listing import list_response
 
 caixa_bp = Blueprint("caixa", __name__)
 
@@ -58,8 +60,7 @@ def get_transactions():
     if employee_id:
         query = query.filter(CaixaTransaction.employee_id == employee_id)
     
-    transactions = query.order_by(CaixaTransaction.created_at.desc()).all()
-    return jsonify([transaction.to_dict() for transaction in transactions]), 200
+    return list_response(query, order_by=CaixaTransaction.created_at, descending=True)
 
 @caixa_bp.route("/caixa/transactions", methods=["POST"])
 def create_transaction():
@@ -109,25 +110,13 @@ def get_summary():
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    query = CaixaTransaction.query
-    
-    if start_date:
-        query = query.filter(CaixaTransaction.date >= start_date)
-    if end_date:
-        query = query.filter(CaixaTransaction.date <= end_date)
-    
-    transactions = query.all()
-    
-    total_entradas = sum(t.amount for t in transactions if t.type == 'entrada')
-    total_saidas = sum(t.amount for t in transactions if t.type == 'saida')
-    saldo = total_entradas - total_saidas
+    # Somado a partir dos saldos diários materializados (O(dias))
+    try:
+        summary = caixa_balance.period_totals(start_date, end_date)
+    except ValueError:
+        return jsonify({"error": "Datas devem estar no formato AAAA-MM-DD"}), 400
     
-    return jsonify({
-        "total_entradas": total_entradas,
-        "total_saidas": total_saidas,
-        "saldo": saldo,
-        "total_transacoes": len(transactions)
-    }), 200
+    return jsonify(summary), 200
 
 @caixa_bp.route("/caixa/employees", methods=["GET"])
 def get_employees_for_caixa():
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.cost import Cost, Profit
 from src.models.order import Order
+from src.utils.listing import list_response
 from datetime import datetime
 
 costs_bp = Blueprint("costs", __name__)
@@ -29,8 +30,7 @@ def get_costs():
             end_date = datetime.fromisoformat(end_date)
             query = query.filter(Cost.date <= end_date)
         
-        costs = query.order_by(Cost.date.desc()).all()
-        return jsonify([cost.to_dict() for cost in costs]), 200
+        return list_response(query, order_by=Cost.date, descending=True)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -194,8 +194,7 @@ def get_profits():
             end_date = datetime.fromisoformat(end_date)
             query = query.filter(Profit.date_calculated <= end_date)
         
-        profits = query.order_by(Profit.date_calculated.desc()).all()
-        return jsonify([profit.to_dict() for profit in profits]), 200
+        return list_response(query, order_by=Profit.date_calculated, descending=True)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
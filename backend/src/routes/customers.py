@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from src.models.customer import Customer
 from src.models.user import db
+from src.utils.listing import list_response
 
 customers_bp = Blueprint('customers', __name__)
 
@@ -60,31 +61,27 @@ def create_customer():
         print(f"Erro ao criar customer: {str(e)}")
         return jsonify({'error': 'Erro interno do servidor'}), 500
 
+def _customer_to_dict(customer):
+    return {
+        'id': customer.id,
+        'name': customer.name,
+        'email': customer.email,
+        'phone': customer.phone if hasattr(customer, 'phone') else '',
+        'address': customer.address if hasattr(customer, 'address') else '',
+        'city': customer.city if hasattr(customer, 'city') else '',
+        'state': customer.state if hasattr(customer, 'state') else '',
+        'zip_code': customer.zip_code if hasattr(customer, 'zip_code') else '',
+        'cpf': customer.cpf if hasattr(customer, 'cpf') else '',
+        'birth_date': customer.birth_date.isoformat() if hasattr(customer, 'birth_date') and customer.birth_date else None,
+        'notes': customer.notes if hasattr(customer, 'notes') else '',
+        'created_at': customer.created_at.isoformat() if hasattr(customer, 'created_at') else ''
+    }
+
 @customers_bp.route("/customers", methods=["GET"])
 def get_customers():
-    """Get all customers"""
+    """Get all customers (keyset-paginated with ?limit=&cursor=)"""
     try:
-        # Simple query without pagination for now
-        customers = Customer.query.all()
-        
-        customers_list = []
-        for customer in customers:
-            customers_list.append({
-                'id': customer.id,
-                'name': customer.name,
-                'email': customer.email,
-                'phone': customer.phone if hasattr(customer, 'phone') else '',
-                'address': customer.address if hasattr(customer, 'address') else '',
-                'city': customer.city if hasattr(customer, 'city') else '',
-                'state': customer.state if hasattr(customer, 'state') else '',
-                'zip_code': customer.zip_code if hasattr(customer, 'zip_code') else '',
-                'cpf': customer.cpf if hasattr(customer, 'cpf') else '',
-                'birth_date': customer.birth_date.isoformat() if hasattr(customer, 'birth_date') and customer.birth_date else None,
-                'notes': customer.notes if hasattr(customer, 'notes') else '',
-                'created_at': customer.created_at.isoformat() if hasattr(customer, 'created_at') else ''
-            })
-
-        return jsonify(customers_list), 200
+        return list_response(Customer.query, serialize=_customer_to_dict)
 
     except Exception as e:
         print(f"Erro ao buscar customers: {str(e)}")
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.employee import Employee
 from src.models.payroll import Payroll
+from src.utils.listing import list_response
 from datetime import datetime
 
 employees_bp = Blueprint("employees", __name__)
@@ -55,8 +56,7 @@ def create_employee():
 
 @employees_bp.route("/employees", methods=["GET"])
 def get_employees():
-    employees = Employee.query.all()
-    return jsonify([employee.to_dict() for employee in employees]), 200
+    return list_response(Employee.query)
 
 @employees_bp.route("/employees/<int:id>", methods=["DELETE"])
 def delete_employee(id):
@@ -8,6 +8,8 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime
 import sqlite3
 
+from src.services.search_index import ensure_joias_index, match_expression
+
 enhanced_jewelry_bp = Blueprint("enhanced_jewelry", __name__)
 
 def get_db():
@@ -40,14 +42,24 @@ def get_joias_enhanced():
         cursor = conn.cursor()
         
         # Query base
-        base_query = "FROM joias WHERE 1=1"
+        base_query = "FROM joias"
         params = []
         
-        # Aplicar filtros
-        if search:
-            base_query += " AND (nome LIKE ? OR descricao_completa LIKE ? OR descricao LIKE ?)"
-            search_param = f"%{search}%"
-            params.extend([search_param, search_param, search_param])
+        # Busca textual pelo índice FTS5 (sem acentos, por prefixo, com relevância)
+        expression = match_expression(search)
+        if expression:
+            ensure_joias_index(conn)
+            base_query += """
+            JOIN (
+                SELECT rowid AS fts_id, rank AS fts_rank FROM joias_fts WHERE joias_fts MATCH ?
+            ) ON fts_id = joias.id"""
+            params.append(expression)
+            # Sem ordenação pedida, os mais relevantes primeiro
+            if "order_by" not in request.args:
+                order_by = "fts_rank"
+                order_dir = "ASC"
+        
+        base_query += " WHERE 1=1"
         
         if categoria:
             base_query += " AND descricao LIKE ?"
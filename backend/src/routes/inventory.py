@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.inventory import Inventory
 from src.models.material import Material
+from src.services import inventory_valuation
+from src.utils.listing import list_response
 
 inventory_bp = Blueprint("inventory", __name__)
 
@@ -16,12 +18,10 @@ def get_inventory():
         if material_id:
             query = query.filter(Inventory.material_id == material_id)
         
-        inventory_items = query.all()
-        
         if low_stock_only:
-            inventory_items = [item for item in inventory_items if item.is_low_stock()]
+            query = inventory_valuation.low_stock_query(query)
         
-        return jsonify([item.to_dict() for item in inventory_items]), 200
+        return list_response(query)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -271,23 +271,12 @@ def delete_inventory_item(id):
 def get_inventory_stats():
     """Estatísticas do estoque"""
     try:
-        total_items = Inventory.query.count()
-        low_stock_items = len([item for item in Inventory.query.all() if item.is_low_stock()])
-        
-        # Valor total do estoque
-        total_value = sum(item.calculate_total_value() for item in Inventory.query.all())
+        stats = inventory_valuation.totals()
         
         # Itens com maior valor
-        high_value_items = Inventory.query.all()
-        high_value_items.sort(key=lambda x: x.calculate_total_value(), reverse=True)
-        top_5_value = [item.to_dict() for item in high_value_items[:5]]
+        stats["top_value_items"] = [item.to_dict() for item in inventory_valuation.top_by_value(5)]
         
-        return jsonify({
-            "total_items": total_items,
-            "low_stock_items": low_stock_items,
-            "total_inventory_value": total_value,
-            "top_value_items": top_5_value
-        }), 200
+        return jsonify(stats), 200
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -296,10 +285,7 @@ def get_inventory_stats():
 def get_low_stock_items():
     """Itens com estoque baixo"""
     try:
-        all_items = Inventory.query.all()
-        low_stock_items = [item for item in all_items if item.is_low_stock()]
-        
-        return jsonify([item.to_dict() for item in low_stock_items]), 200
+        return list_response(inventory_valuation.low_stock_query())
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
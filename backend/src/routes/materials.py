@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from src.utils.auth import auth_required
 from src.models.user import db
 from src.models.material import Material
+from src.services import dashboard_stats
 
 materials_bp = Blueprint('materials', __name__)
 
@@ -161,34 +162,14 @@ def get_material_types(current_user):
 def get_materials_stats(current_user):
     """Obter estatísticas dos materiais"""
     try:
-        total = Material.query.count()
-        web_export = Material.query.filter(Material.webexport == True).count()
-        
-        # Preço médio
-        avg_price = db.session.query(db.func.avg(Material.precopordimensao)).scalar() or 0
-        
-        # Materiais por tipo
-        tipos_query = db.session.query(
-            Material.tipo, 
-            db.func.count(Material.id)
-        ).group_by(Material.tipo).all()
-        
-        tipos = [{'tipo': tipo or 'Sem tipo', 'count': count} for tipo, count in tipos_query]
-        
-        # Materiais por categoria
-        categorias = {}
-        for material in Material.query.all():
-            cat = material.categoria
-            categorias[cat] = categorias.get(cat, 0) + 1
-        
-        categorias_list = [{'categoria': k, 'count': v} for k, v in categorias.items()]
+        stats = dashboard_stats.snapshot()['materials']
         
         return jsonify({
-            'total': total,
-            'web_export': web_export,
-            'preco_medio': round(avg_price, 2),
-            'tipos': tipos,
-            'categorias': categorias_list
+            'total': stats['total'],
+            'web_export': stats['web_export'],
+            'preco_medio': stats['preco_medio'],
+            'tipos': stats['tipos'],
+            'categorias': stats['categorias']
         })
         
     except Exception as e:
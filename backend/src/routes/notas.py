@@ -6,6 +6,8 @@ from src.models.pattern import Pattern
 from src.models.jewelry import Jewelry
 from src.models.material import Material
 from src.models.stone import Stone
+from src.services import search_index
+from src.utils.listing import list_response
 from datetime import datetime
 import re
 
@@ -13,13 +15,11 @@ notas_bp = Blueprint("notas", __name__)
 
 @notas_bp.route("/notas", methods=["GET"])
 def get_notas():
-    notas = Nota.query.all()
-    return jsonify([nota.to_dict() for nota in notas])
+    return list_response(Nota.query)
 
 @notas_bp.route("/impostos", methods=["GET"])
 def get_impostos():
-    impostos = Imposto.query.all()
-    return jsonify([imposto.to_dict() for imposto in impostos])
+    return list_response(Imposto.query)
 
 @notas_bp.route("/notas/<int:nota_id>", methods=["GET"])
 def get_nota(nota_id):
@@ -54,6 +54,43 @@ def delete_nota(nota_id):
     return jsonify({"message": "Nota deletada com sucesso"}), 200
 
 # Rota para preenchimento automático com filtros inteligentes
+def _produto_encontrado(entidade, item):
+    """Formato de um produto sugerido no preenchimento automático"""
+    if entidade == "pattern":
+        return {
+            "tipo": "padrao",
+            "id": item.id,
+            "nome": item.nome,
+            "categoria": item.tipo,
+            "colecao": item.colecao,
+            "descricao": f"Padrão {item.nome} - {item.tipo} - Coleção {item.colecao}"
+        }
+    if entidade == "jewelry":
+        return {
+            "tipo": "joia",
+            "id": item.id,
+            "nome": item.name,
+            "categoria": item.category,
+            "colecao": item.collection,
+            "preco": item.price,
+            "descricao": f"Joia {item.name} - {item.category} - R$ {item.price}"
+        }
+    if entidade == "material":
+        return {
+            "tipo": "material",
+            "id": item.id,
+            "nome": item.name,
+            "preco": item.price_per_gram,
+            "descricao": f"Material {item.name} - R$ {item.price_per_gram}/g"
+        }
+    return {
+        "tipo": item.type,
+        "id": item.id,
+        "nome": item.name,
+        "preco": item.price_per_carat,
+        "descricao": f"Pedra {item.name} - {item.type} - R$ {item.price_per_carat}/ct"
+    }
+
 @notas_bp.route("/notas/preencher_auto", methods=["POST"])
 def preencher_nota_auto():
     data = request.get_json()
@@ -64,14 +101,12 @@ def preencher_nota_auto():
     
     try:
         if tipo_filtro == "auto" or tipo_filtro == "cliente":
-            # Buscar por cliente/remetente
-            nota_cliente = Nota.query.filter(
-                db.or_(
-                    Nota.remetente1.ilike(f"%{filtro}%"),
-                    Nota.des1.ilike(f"%{filtro}%"),
-                    Nota.des2.ilike(f"%{filtro}%")
-                )
-            ).order_by(Nota.data.desc()).first()
+            # Buscar por cliente/remetente (remetente1, des1 e des2 no índice)
+            query = Nota.query
+            ids = search_index.matching_ids("nota", filtro, ["title", "body"])
+            if ids is not None:
+                query = query.filter(Nota.id.in_(ids))
+            nota_cliente = query.order_by(Nota.data.desc()).first()
             
             if nota_cliente:
                 resultado.update({
@@ -100,86 +135,25 @@ def preencher_nota_auto():
         
         if tipo_filtro == "auto" or tipo_filtro == "produto":
             # Buscar produtos relacionados (padrões, joias, materiais, pedras)
-            produtos_encontrados = []
-            
-            # Buscar padrões
-            padroes = Pattern.query.filter(
-                db.or_(
-                    Pattern.nome.ilike(f"%{filtro}%"),
-                    Pattern.tipo.ilike(f"%{filtro}%"),
-                    Pattern.colecao.ilike(f"%{filtro}%")
-                )
-            ).limit(5).all()
-            
-            for padrao in padroes:
-                produtos_encontrados.append({
-                    "tipo": "padrao",
-                    "id": padrao.id,
-                    "nome": padrao.nome,
-                    "categoria": padrao.tipo,
-                    "colecao": padrao.colecao,
-                    "descricao": f"Padrão {padrao.nome} - {padrao.tipo} - Coleção {padrao.colecao}"
-                })
-            
-            # Buscar joias
-            joias = Jewelry.query.filter(
-                db.or_(
-                    Jewelry.name.ilike(f"%{filtro}%"),
-                    Jewelry.category.ilike(f"%{filtro}%"),
-                    Jewelry.collection.ilike(f"%{filtro}%")
-                )
-            ).limit(5).all()
-            
-            for joia in joias:
-                produtos_encontrados.append({
-                    "tipo": "joia",
-                    "id": joia.id,
-                    "nome": joia.name,
-                    "categoria": joia.category,
-                    "colecao": joia.collection,
-                    "preco": joia.price,
-                    "descricao": f"Joia {joia.name} - {joia.category} - R$ {joia.price}"
-                })
-            
-            # Buscar materiais
-            materiais = Material.query.filter(
-                Material.name.ilike(f"%{filtro}%")
-            ).limit(5).all()
-            
-            for material in materiais:
-                produtos_encontrados.append({
-                    "tipo": "material",
-                    "id": material.id,
-                    "nome": material.name,
-                    "preco": material.price_per_gram,
-                    "descricao": f"Material {material.name} - R$ {material.price_per_gram}/g"
-                })
-            
-            # Buscar pedras
-            pedras = Stone.query.filter(
-                db.or_(
-                    Stone.name.ilike(f"%{filtro}%"),
-                    Stone.type.ilike(f"%{filtro}%")
-                )
-            ).limit(5).all()
-            
-            for pedra in pedras:
-                produtos_encontrados.append({
-                    "tipo": "pedra",
-                    "id": pedra.id,
-                    "nome": pedra.name,
-                    "tipo": pedra.type,
-                    "preco": pedra.price_per_carat,
-                    "descricao": f"Pedra {pedra.name} - {pedra.type} - R$ {pedra.price_per_carat}/ct"
-                })
-            
-            resultado["produtos_encontrados"] = produtos_encontrados
+            # numa única consulta ao índice, do mais relevante ao menos
+            encontrados = search_index.search(
+                filtro,
+                entities=["pattern", "jewelry", "material", "stone"],
+                per_entity=5,
+                limit=20
+            )
+            resultado["produtos_encontrados"] = [
+                _produto_encontrado(entidade, item)
+                for entidade, item in search_index.load(encontrados)
+            ]
         
         if tipo_filtro == "auto" or tipo_filtro == "modo":
             # Buscar por modo de pagamento/entrega
-            nota_modo = Nota.query.filter(
-                Nota.modo.ilike(f"%{filtro}%")
-            ).order_by(Nota.data.desc()).first()
+            query = Nota.query
+            ids = search_index.matching_ids("nota", filtro, ["extra"])
+            if ids is not None:
+                query = query.filter(Nota.id.in_(ids))
+            nota_modo = query.order_by(Nota.data.desc()).first()
             
             if nota_modo:
                 resultado.update({
@@ -3,6 +3,7 @@ from src.models.user import db
 from src.models.order import Order
 from src.models.jewelry import Jewelry
 from src.models.inventory import Inventory
+from src.utils.listing import list_response
 from datetime import datetime
 
 orders_bp = Blueprint("orders", __name__)
@@ -92,8 +93,7 @@ def get_orders():
         if jewelry_id:
             query = query.filter(Order.jewelry_id == jewelry_id)
         
-        orders = query.order_by(Order.order_date.desc()).all()
-        return jsonify([order.to_dict() for order in orders]), 200
+        return list_response(query, order_by=Order.order_date, descending=True)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.payment import Payment
+from src.utils.listing import list_response
 
 payments_bp = Blueprint("payments", __name__)
 
@@ -14,8 +15,7 @@ def create_payment():
 
 @payments_bp.route("/payments", methods=["GET"])
 def get_payments():
-    payments = Payment.query.all()
-    return jsonify([payment.to_dict() for payment in payments]), 200
+    return list_response(Payment.query)
 
 @payments_bp.route("/payments/<int:id>", methods=["DELETE"])
 def delete_payment(id):
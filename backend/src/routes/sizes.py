@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.size import Size
+from src.utils.listing import list_response
 
 sizes_bp = Blueprint("sizes", __name__)
 
@@ -8,8 +9,7 @@ sizes_bp = Blueprint("sizes", __name__)
 def get_sizes():
     """Listar todos os tamanhos"""
     try:
-        sizes = Size.query.all()
-        return jsonify([size.to_dict() for size in sizes])
+        return list_response(Size.query)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
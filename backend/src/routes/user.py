@@ -1,12 +1,12 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import User, db
+from src.utils.listing import list_response
 
 user_bp = Blueprint('user', __name__)
 
 @user_bp.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    return list_response(User.query)
 
 @user_bp.route('/users', methods=['POST'])
 def create_user():
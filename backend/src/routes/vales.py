@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.vale import Vale
 from src.models.employee import Employee
+from src.utils.listing import list_response
 from datetime import datetime
 
 vales_bp = Blueprint("vales", __name__)
@@ -70,8 +71,7 @@ def get_vales():
         elif year:
             query = query.filter(db.extract('year', Vale.date) == year)
             
-        vales = query.all()
-        return jsonify([vale.to_dict() for vale in vales]), 200
+        return list_response(query)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
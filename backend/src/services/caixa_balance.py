@@ -0,0 +1,210 @@
+"""
+Motor de Saldo do Caixa
+Totais calculados no banco (SUM ... GROUP BY) e uma tabela materializada
+de saldos diários, mantida a cada inserção, alteração ou exclusão de
+transação, para que o saldo em qualquer data custe O(dias)
+"""
+
+from datetime import date, datetime
+from typing import Dict, Any, Optional, Union
+
+from sqlalchemy import case, event, func
+from sqlalchemy.orm.attributes import get_history
+
+from src.models.user import db
+from src.models.caixa import CaixaTransaction
+from src.utils import materialized
+
+DateLike = Union[date, datetime, str, None]
+
+BUILD_NAME = 'caixa_daily_balances'
+
+
+class CaixaDailyBalance(db.Model):
+    """Entradas e saídas acumuladas por dia (mantida pelos eventos abaixo)"""
+    __tablename__ = 'caixa_daily_balances'
+
+    day = db.Column(db.Date, primary_key=True)
+    entradas = db.Column(db.Float, nullable=False, default=0.0)
+    saidas = db.Column(db.Float, nullable=False, default=0.0)
+    transacoes = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'entradas': round(self.entradas, 2),
+            'saidas': round(self.saidas, 2),
+            'saldo': round(self.entradas - self.saidas, 2),
+            'transacoes': self.transacoes
+        }
+
+
+def to_day(value: DateLike) -> Optional[date]:
+    """Converte datetime, date ou texto ISO ('2024-05-01...') em date"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _business_day(transaction_date: DateLike, created_at: DateLike) -> Optional[date]:
+    """Dia contábil: a data da transação ou, sem ela, o dia em que foi criada"""
+    return to_day(transaction_date) or to_day(created_at)
+
+
+def _apply(connection, day: Optional[date], tipo: str, amount: float, count: int):
+    """
+    Soma (ou subtrai, com sinal negativo) um movimento no saldo do dia
+
+    Toda transação conta em `transacoes`, como no rebuild() e no resumo
+    original; só entradas e saídas mexem nos totais.
+    """
+    if day is None:
+        return
+
+    materialized.apply_delta(
+        connection,
+        CaixaDailyBalance.__table__,
+        {'day': day},
+        {
+            'entradas': amount if tipo == 'entrada' else 0.0,
+            'saidas': amount if tipo == 'saida' else 0.0,
+            'transacoes': count
+        },
+        count_column='transacoes',
+        drop_empty=True
+    )
+
+
+# Atributos que mudam o saldo; o valor antigo é carregado mesmo se expirado
+_TRACKED = ('type', 'amount', 'date', 'created_at')
+materialized.track_history(CaixaTransaction, _TRACKED)
+
+
+@event.listens_for(CaixaTransaction, 'after_insert')
+def _on_insert(mapper, connection, target):
+    day = _business_day(target.date, target.created_at)
+    _apply(connection, day, target.type, target.amount or 0.0, 1)
+
+
+@event.listens_for(CaixaTransaction, 'after_update')
+def _on_update(mapper, connection, target):
+    if not any(get_history(target, name).has_changes() for name in _TRACKED):
+        return
+
+    old = {name: materialized.previous(target, name) for name in _TRACKED}
+    old_day = _business_day(old['date'], old['created_at'])
+    _apply(connection, old_day, old['type'], -(old['amount'] or 0.0), -1)
+
+    new_day = _business_day(target.date, target.created_at)
+    _apply(connection, new_day, target.type, target.amount or 0.0, 1)
+
+
+@event.listens_for(CaixaTransaction, 'after_delete')
+def _on_delete(mapper, connection, target):
+    day = _business_day(target.date, target.created_at)
+    _apply(connection, day, target.type, -(target.amount or 0.0), -1)
+
+
+def totals_by_type(start: DateLike = None, end: DateLike = None) -> Dict[str, Any]:
+    """
+    Entradas e saídas direto das transações, agregadas no banco
+
+    Usado para reconstruir a tabela diária e como referência; as consultas
+    do dia a dia leem a tabela materializada.
+    """
+    day = func.coalesce(func.date(CaixaTransaction.date), func.date(CaixaTransaction.created_at))
+    query = db.session.query(
+        CaixaTransaction.type,
+        func.coalesce(func.sum(CaixaTransaction.amount), 0.0),
+        func.count(CaixaTransaction.id)
+    )
+    if start:
+        query = query.filter(day >= to_day(start).isoformat())
+    if end:
+        query = query.filter(day <= to_day(end).isoformat())
+
+    totals = {tipo: (total, count) for tipo, total, count in query.group_by(CaixaTransaction.type)}
+    return _summary(
+        totals.get('entrada', (0.0, 0))[0],
+        totals.get('saida', (0.0, 0))[0],
+        sum(count for _, count in totals.values())
+    )
+
+
+def rebuild():
+    """Recalcula a tabela diária a partir das transações (uma agregação)"""
+    day = func.coalesce(func.date(CaixaTransaction.date), func.date(CaixaTransaction.created_at))
+    rows = db.session.query(
+        day,
+        func.sum(case((CaixaTransaction.type == 'entrada', CaixaTransaction.amount), else_=0.0)),
+        func.sum(case((CaixaTransaction.type == 'saida', CaixaTransaction.amount), else_=0.0)),
+        func.count(CaixaTransaction.id)
+    ).filter(day.isnot(None)).group_by(day).all()
+
+    CaixaDailyBalance.query.delete()
+    db.session.bulk_insert_mappings(CaixaDailyBalance, [
+        {'day': to_day(dia), 'entradas': entradas or 0.0, 'saidas': saidas or 0.0, 'transacoes': count}
+        for dia, entradas, saidas, count in rows
+    ])
+    materialized.mark_built(BUILD_NAME)
+    db.session.commit()
+
+
+_checked = False
+
+
+def ensure_built():
+    """
+    Preenche a tabela diária a partir das transações se este banco ainda
+    não tem a marca de construída (chamado na inicialização e na primeira
+    consulta de cada processo)
+
+    Alterações em massa (query.update/delete) não disparam os eventos do
+    ORM; quem as fizer deve chamar rebuild() em seguida.
+    """
+    global _checked
+    if _checked:
+        return
+    if not materialized.is_built(BUILD_NAME):
+        rebuild()
+    _checked = True
+
+
+def _summary(entradas: float, saidas: float, transacoes: int) -> Dict[str, Any]:
+    entradas = round(entradas or 0.0, 2)
+    saidas = round(saidas or 0.0, 2)
+    return {
+        'total_entradas': entradas,
+        'total_saidas': saidas,
+        'saldo': round(entradas - saidas, 2),
+        'total_transacoes': int(transacoes or 0)
+    }
+
+
+def period_totals(start: DateLike = None, end: DateLike = None) -> Dict[str, Any]:
+    """Entradas, saídas, saldo e número de transações entre dois dias (inclusive)"""
+    ensure_built()
+    query = db.session.query(
+        func.sum(CaixaDailyBalance.entradas),
+        func.sum(CaixaDailyBalance.saidas),
+        func.sum(CaixaDailyBalance.transacoes)
+    )
+    if start:
+        query = query.filter(CaixaDailyBalance.day >= to_day(start))
+    if end:
+        query = query.filter(CaixaDailyBalance.day <= to_day(end))
+    return _summary(*query.one())
+
+
+def balance_as_of(day: DateLike) -> Dict[str, Any]:
+    """Saldo acumulado até o dia (inclusive)"""
+    return period_totals(end=day)
+
+
+def day_totals(day: DateLike) -> Dict[str, Any]:
+    """Movimento de um único dia"""
+    return period_totals(start=day, end=day)
@@ -0,0 +1,220 @@
+"""
+Estatísticas do Dashboard
+Contagens, médias e faixas de preço calculadas em poucas consultas
+agrupadas (SUM(CASE ...)), guardadas num snapshot que é descartado
+quando uma escrita em joias, materiais, padrões ou pedras é confirmada
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import case, event, func, inspect
+from sqlalchemy.orm import Session
+
+from src.models.user import db
+from src.models.jewelry import Jewelry
+from src.models.material import Material
+from src.models.pattern import Pattern
+from src.models.stone import Stone
+
+# Faixas de preço das joias: (mínimo, máximo exclusivo ou None, rótulo)
+PRICE_RANGES = [
+    (0, 100, '0-100'),
+    (100, 300, '100-300'),
+    (300, 500, '300-500'),
+    (500, 1000, '500-1000'),
+    (1000, None, '1000+'),
+]
+
+# Escritas feitas por outro processo não passam pelos eventos deste;
+# o snapshot expira sozinho depois deste tempo
+SNAPSHOT_TTL = 300
+
+TRACKED_MODELS = (Jewelry, Material, Pattern, Stone)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()  # um cálculo por vez
+_generation_lock = threading.Lock()  # escritores não esperam o cálculo
+_generation = 0
+_snapshot: Optional[Dict[str, Any]] = None
+_snapshot_generation = -1
+_snapshot_time = 0.0
+
+
+@event.listens_for(Session, 'after_flush')
+def _on_flush(session, flush_context):
+    """Marca a sessão se o flush tocou numa tabela do dashboard"""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, TRACKED_MODELS):
+            session.info['dashboard_stale'] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _on_commit(session):
+    # Só depois do commit: antes dele, outra thread ainda lê os dados antigos
+    if session.info.pop('dashboard_stale', False):
+        invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_rollback(session):
+    session.info.pop('dashboard_stale', None)
+
+
+def invalidate():
+    """Descarta o snapshot (chame após query.update/delete em massa, que não disparam eventos)"""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _price_condition(column, minimum, maximum):
+    if maximum is None:
+        return column >= minimum
+    return (column >= minimum) & (column < maximum)
+
+
+def _jewelry_stats() -> Dict[str, Any]:
+    """Totais, visibilidade, exportação, preço médio e faixas de preço numa consulta"""
+    row = db.session.query(
+        func.count(Jewelry.id),
+        _count_if(Jewelry.escondido == False),
+        _count_if(Jewelry.webexport == True),
+        func.avg(Jewelry.preco2),
+        *[_count_if(_price_condition(Jewelry.preco2, low, high)) for low, high, _ in PRICE_RANGES]
+    ).one()
+
+    total, visible, web, avg_price, *buckets = row
+    return {
+        'total': total,
+        'visible': int(visible),
+        'web_export': int(web),
+        'avg_price': round(avg_price or 0, 2),
+        'price_distribution': [
+            {'range': label, 'count': int(count)}
+            for (_, _, label), count in zip(PRICE_RANGES, buckets)
+        ]
+    }
+
+
+def _material_counts(column, key: str, empty_label: Optional[str] = None) -> List[Dict[str, Any]]:
+    rows = db.session.query(column, func.count(Material.id)).group_by(column).all()
+    return [{key: value if value or empty_label is None else empty_label, 'count': count} for value, count in rows]
+
+
+def _material_categories() -> List[Dict[str, Any]]:
+    """
+    Materiais por categoria
+
+    Com categoria mapeada no ORM (coluna ou híbrido), GROUP BY; se for uma
+    propriedade Python, conta lendo os materiais em lotes. Uma falha aqui
+    não derruba as demais estatísticas.
+    """
+    try:
+        if 'categoria' in inspect(Material).all_orm_descriptors:
+            return _material_counts(Material.categoria, 'categoria')
+
+        counts: Dict[Any, int] = {}
+        for material in Material.query.yield_per(500):
+            counts[material.categoria] = counts.get(material.categoria, 0) + 1
+        return [{'categoria': categoria, 'count': count} for categoria, count in counts.items()]
+    except Exception:
+        logger.exception("Falha ao contar materiais por categoria")
+        db.session.rollback()
+        return []
+
+
+def _material_stats() -> Dict[str, Any]:
+    """Totais e médias numa consulta; tipos com GROUP BY"""
+    total, web, avg_price = db.session.query(
+        func.count(Material.id),
+        _count_if(Material.webexport == True),
+        func.avg(Material.precopordimensao)
+    ).one()
+
+    return {
+        'total': total,
+        'web_export': int(web),
+        'preco_medio': round(avg_price or 0, 2),
+        'tipos': _material_counts(Material.tipo, 'tipo', 'Sem tipo'),
+        'categorias': _material_categories()
+    }
+
+
+def _stone_stats() -> Dict[str, Any]:
+    total, web, avg_price = db.session.query(
+        func.count(Stone.id),
+        _count_if(Stone.webexport == True),
+        func.avg(Stone.preco)
+    ).one()
+    return {'total': total, 'web_export': int(web), 'avg_price': round(avg_price or 0, 2)}
+
+
+def _compute() -> Dict[str, Any]:
+    jewelry = _jewelry_stats()
+    materials = _material_stats()
+    stones = _stone_stats()
+    total_patterns = db.session.query(func.count(Pattern.id)).scalar()
+
+    return {
+        'totals': {
+            'jewelry': jewelry['total'],
+            'materials': materials['total'],
+            'patterns': total_patterns,
+            'stones': stones['total']
+        },
+        'visibility': {
+            'visible_jewelry': jewelry['visible'],
+            'hidden_jewelry': jewelry['total'] - jewelry['visible']
+        },
+        'web_export': {
+            'jewelry': jewelry['web_export'],
+            'materials': materials['web_export'],
+            'stones': stones['web_export']
+        },
+        'average_prices': {
+            'jewelry': jewelry['avg_price'],
+            'materials': materials['preco_medio'],
+            'stones': stones['avg_price']
+        },
+        'price_distribution': jewelry['price_distribution'],
+        'materials': materials,
+        'generated_at': datetime.now().isoformat()
+    }
+
+
+def snapshot() -> Dict[str, Any]:
+    """
+    Estatísticas atuais do dashboard
+
+    Recalculadas só quando uma escrita foi confirmada desde o último
+    cálculo (ou o snapshot expirou); chamadas simultâneas esperam um
+    único cálculo em vez de repeti-lo.
+    """
+    global _snapshot, _snapshot_generation, _snapshot_time
+    with _lock:
+        fresh = (
+            _snapshot is not None
+            and _snapshot_generation == _generation
+            and time.monotonic() - _snapshot_time < SNAPSHOT_TTL
+        )
+        if fresh:
+            return _snapshot
+
+        generation = _generation
+        stats = _compute()
+        # Um commit durante o cálculo já invalidou este resultado
+        if generation == _generation:
+            _snapshot = stats
+            _snapshot_generation = generation
+            _snapshot_time = time.monotonic()
+        return stats
@@ -0,0 +1,185 @@
+"""
+Valorização do Estoque
+Estoque baixo, valor total e itens de maior valor calculados no banco,
+com índices de expressão para as duas condições, e um contador de
+valorização mantido a cada movimentação (adicionar, remover, reservar,
+consumir) para que /inventory/stats não percorra a tabela
+"""
+
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import Index, case, event, func
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.schema import CreateIndex
+
+from src.models.user import db
+from src.models.inventory import Inventory
+from src.utils import materialized
+
+BUILD_NAME = 'inventory_valuation'
+
+# Mesmas regras de Inventory.calculate_total_value() e is_low_stock(),
+# escritas como expressões SQL (NULL não conta como valor nem como baixo)
+VALUE = Inventory.quantity_available * Inventory.cost_per_unit
+STOCK_MARGIN = Inventory.quantity_available - Inventory.minimum_stock
+LOW_STOCK = STOCK_MARGIN <= 0
+
+# Índices sobre as próprias expressões: o filtro de estoque baixo vira uma
+# faixa no índice e o top-N por valor lê só as primeiras entradas
+INDEXES = [
+    Index('ix_inventory_stock_margin', STOCK_MARGIN),
+    Index('ix_inventory_value', VALUE),
+]
+
+
+class InventoryValuation(db.Model):
+    """Linha única com os totais do estoque (mantida pelos eventos abaixo)"""
+    __tablename__ = 'inventory_valuation'
+
+    id = db.Column(db.Integer, primary_key=True)
+    total_value = db.Column(db.Float, nullable=False, default=0.0)
+    total_items = db.Column(db.Integer, nullable=False, default=0)
+    low_stock_items = db.Column(db.Integer, nullable=False, default=0)
+
+
+_ROW_ID = 1
+
+
+def _value(quantity: Optional[float], cost: Optional[float]) -> float:
+    if quantity is None or cost is None:
+        return 0.0
+    return quantity * cost
+
+
+def _is_low(quantity: Optional[float], minimum: Optional[float]) -> int:
+    if quantity is None or minimum is None:
+        return 0
+    return 1 if quantity - minimum <= 0 else 0
+
+
+def _apply(connection, value: float, items: int, low: int):
+    """Soma (ou subtrai, com sinal negativo) uma variação nos totais"""
+    materialized.apply_delta(
+        connection,
+        InventoryValuation.__table__,
+        {'id': _ROW_ID},
+        {'total_value': value, 'total_items': items, 'low_stock_items': low},
+        count_column='total_items'
+    )
+
+
+# add_stock, remove_stock e reserve_quantity mudam quantity_available
+# (e add_stock pode mudar cost_per_unit); o PUT pode mudar minimum_stock.
+# O valor antigo é carregado mesmo se o atributo estiver expirado.
+_TRACKED = ('quantity_available', 'cost_per_unit', 'minimum_stock')
+materialized.track_history(Inventory, _TRACKED)
+
+
+@event.listens_for(Inventory, 'after_insert')
+def _on_insert(mapper, connection, target):
+    _apply(
+        connection,
+        _value(target.quantity_available, target.cost_per_unit),
+        1,
+        _is_low(target.quantity_available, target.minimum_stock)
+    )
+
+
+@event.listens_for(Inventory, 'after_update')
+def _on_update(mapper, connection, target):
+    if not any(get_history(target, name).has_changes() for name in _TRACKED):
+        return
+
+    old = {name: materialized.previous(target, name) for name in _TRACKED}
+    _apply(
+        connection,
+        _value(target.quantity_available, target.cost_per_unit)
+        - _value(old['quantity_available'], old['cost_per_unit']),
+        0,
+        _is_low(target.quantity_available, target.minimum_stock)
+        - _is_low(old['quantity_available'], old['minimum_stock'])
+    )
+
+
+@event.listens_for(Inventory, 'after_delete')
+def _on_delete(mapper, connection, target):
+    _apply(
+        connection,
+        -_value(target.quantity_available, target.cost_per_unit),
+        -1,
+        -_is_low(target.quantity_available, target.minimum_stock)
+    )
+
+
+def rebuild():
+    """Recalcula os totais a partir da tabela de estoque (uma agregação)"""
+    total_value, total_items, low_stock_items = db.session.query(
+        func.coalesce(func.sum(VALUE), 0.0),
+        func.count(Inventory.id),
+        func.coalesce(func.sum(case((LOW_STOCK, 1), else_=0)), 0)
+    ).one()
+
+    InventoryValuation.query.delete()
+    db.session.add(InventoryValuation(
+        id=_ROW_ID,
+        total_value=total_value,
+        total_items=total_items,
+        low_stock_items=low_stock_items
+    ))
+    materialized.mark_built(BUILD_NAME)
+    db.session.commit()
+
+
+_checked = False
+
+
+def ensure_built():
+    """
+    Cria os índices que faltarem e preenche o contador a partir do estoque
+    se este banco ainda não tem a marca de construído (chamado na
+    inicialização e na primeira consulta de cada processo)
+
+    Alterações em massa (query.update/delete) não disparam os eventos do
+    ORM; quem as fizer deve chamar rebuild() em seguida.
+    """
+    global _checked
+    if _checked:
+        return
+    connection = db.session.connection()
+    # checkfirst não enxerga índices de expressão no SQLite
+    for index in INDEXES:
+        connection.execute(CreateIndex(index, if_not_exists=True))
+    InventoryValuation.__table__.create(connection, checkfirst=True)
+    if not materialized.is_built(BUILD_NAME):
+        rebuild()
+    else:
+        db.session.commit()
+    _checked = True
+
+
+def totals() -> Dict[str, Any]:
+    """Número de itens, itens com estoque baixo e valor total (uma linha lida)"""
+    ensure_built()
+    # Colunas, não a entidade: a linha muda por SQL direto nos eventos
+    row = db.session.query(
+        InventoryValuation.total_items,
+        InventoryValuation.low_stock_items,
+        InventoryValuation.total_value
+    ).filter_by(id=_ROW_ID).one()
+    return {
+        'total_items': row.total_items,
+        'low_stock_items': row.low_stock_items,
+        'total_inventory_value': round(row.total_value, 2)
+    }
+
+
+def low_stock_query(query=None):
+    """Itens com estoque baixo (filtro no banco, pelo índice de margem)"""
+    ensure_built()
+    return (query if query is not None else Inventory.query).filter(LOW_STOCK)
+
+
+def top_by_value(limit: int = 5) -> List[Inventory]:
+    """Itens de maior valor em estoque (ORDER BY ... LIMIT pelo índice de valor)"""
+    ensure_built()
+    return Inventory.query.filter(VALUE.isnot(None)).order_by(VALUE.desc()).limit(limit).all()
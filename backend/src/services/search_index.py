@@ -0,0 +1,302 @@
+"""
+Índice de Busca Textual (SQLite FTS5)
+Um único índice para joias, materiais, padrões, pedras e notas, mantido
+por eventos do ORM, com tokenização sem acentos, busca por prefixo e
+ordenação por relevância (bm25); e um índice mantido por triggers para a
+tabela crua `joias` usada por /joias/enhanced
+"""
+
+import re
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, text, Integer
+
+from src.models.user import db
+from src.models.jewelry import Jewelry
+from src.models.material import Material
+from src.models.pattern import Pattern
+from src.models.stone import Stone
+from src.models.nota import Nota
+from src.utils import materialized
+
+BUILD_NAME = 'search_index'
+
+# "remove_diacritics 2" faz "anel", "Anél" e "ANEL" casarem
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+# Entidade -> (código, modelo, campos de título, campos de corpo, campos extras).
+# Os modelos variam de nome de coluna entre versões; campos ausentes são ignorados.
+ENTITIES = {
+    'jewelry': (1, Jewelry, ('descricao', 'name', 'nome'), ('noticia', 'category', 'collection', 'descricao_completa'), ()),
+    'material': (2, Material, ('nome', 'name'), ('tipo', 'cor'), ()),
+    'pattern': (3, Pattern, ('nome',), ('code', 'tipo', 'colecao'), ()),
+    'stone': (4, Stone, ('material', 'name'), ('cor', 'type'), ()),
+    'nota': (5, Nota, ('remetente1',), ('des1', 'des2'), ('modo',)),
+}
+_CODE_BITS = 4  # rowid = id << 4 | código da entidade
+
+INDEX_SCHEMA = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        entity UNINDEXED, entity_id UNINDEXED, title, body, extra,
+        tokenize = '{TOKENIZER}', prefix = '2 3'
+    )
+"""
+
+_ready = False  # índice criado e construído, com commit, neste banco
+
+
+def match_expression(query: str, columns: Optional[Sequence[str]] = None) -> Optional[str]:
+    """
+    Converte o texto digitado numa expressão FTS5 segura
+
+    Cada palavra vira um prefixo entre aspas ("ane"* "our"*), todas
+    obrigatórias; operadores digitados pelo usuário não têm efeito.
+
+    Returns:
+        A expressão, ou None se o texto não tem palavras
+    """
+    terms = re.findall(r'\w+', query or '')
+    if not terms:
+        return None
+    expression = ' '.join(f'"{term}"*' for term in terms)
+    if columns:
+        expression = '{' + ' '.join(columns) + '} : (' + expression + ')'
+    return expression
+
+
+def _field_text(obj, names: Iterable[str]) -> str:
+    values = (getattr(obj, name, None) for name in names)
+    return ' '.join(str(value) for value in values if value)
+
+
+def _rowid(code: int, entity_id: int) -> int:
+    return (entity_id << _CODE_BITS) | code
+
+
+def _ensure_table(connection):
+    """
+    Garante a tabela do índice para uma escrita dentro de um flush
+
+    Sem marcar nada: se o flush for desfeito, o CREATE vai junto, e um
+    índice criado aqui ainda não tem a marca de construído, então o
+    próximo ensure_built() o preenche por inteiro.
+    """
+    if not _ready:
+        connection.execute(text(INDEX_SCHEMA))
+
+
+def _document(entity: str, obj) -> Dict[str, Any]:
+    code, _, title, body, extra = ENTITIES[entity]
+    return {
+        'rowid': _rowid(code, obj.id),
+        'entity': entity,
+        'entity_id': obj.id,
+        'title': _field_text(obj, title),
+        'body': _field_text(obj, body),
+        'extra': _field_text(obj, extra),
+    }
+
+
+def _delete(connection, entity: str, entity_id: int):
+    code = ENTITIES[entity][0]
+    connection.execute(
+        text("DELETE FROM search_index WHERE rowid = :rowid"),
+        {'rowid': _rowid(code, entity_id)}
+    )
+
+
+def _insert(connection, documents: List[Dict[str, Any]]):
+    if documents:
+        connection.execute(
+            text(
+                "INSERT INTO search_index (rowid, entity, entity_id, title, body, extra) "
+                "VALUES (:rowid, :entity, :entity_id, :title, :body, :extra)"
+            ),
+            documents
+        )
+
+
+def _listen(entity: str, model):
+    @event.listens_for(model, 'after_insert')
+    def on_insert(mapper, connection, target):
+        _ensure_table(connection)
+        _insert(connection, [_document(entity, target)])
+
+    @event.listens_for(model, 'after_update')
+    def on_update(mapper, connection, target):
+        _ensure_table(connection)
+        _delete(connection, entity, target.id)
+        _insert(connection, [_document(entity, target)])
+
+    @event.listens_for(model, 'after_delete')
+    def on_delete(mapper, connection, target):
+        _ensure_table(connection)
+        _delete(connection, entity, target.id)
+
+
+for _entity, (_code, _model, *_fields) in ENTITIES.items():
+    _listen(_entity, _model)
+
+
+def rebuild(batch_size: int = 500):
+    """Reindexa todas as entidades (alterações em massa não disparam eventos)"""
+    connection = db.session.connection()
+    connection.execute(text(INDEX_SCHEMA))
+    connection.execute(text("DELETE FROM search_index"))
+    for entity, (_, model, *_) in ENTITIES.items():
+        batch = []
+        for obj in model.query.yield_per(batch_size):
+            batch.append(_document(entity, obj))
+            if len(batch) >= batch_size:
+                _insert(connection, batch)
+                batch = []
+        _insert(connection, batch)
+    connection.execute(text("INSERT INTO search_index (search_index) VALUES ('optimize')"))
+    materialized.mark_built(BUILD_NAME)
+    db.session.commit()
+
+
+def ensure_built():
+    """
+    Cria o índice e o preenche a partir das entidades se este banco ainda
+    não tem a marca de construído (chamado na inicialização e na primeira
+    busca de cada processo)
+
+    Alterações em massa (query.update/delete) não disparam os eventos do
+    ORM; quem as fizer deve chamar rebuild() em seguida.
+    """
+    global _ready
+    if _ready:
+        return
+    db.session.connection().execute(text(INDEX_SCHEMA))
+    if not materialized.is_built(BUILD_NAME):
+        rebuild()
+    else:
+        db.session.commit()
+    # Só depois do commit: a tabela já não some com um rollback
+    _ready = True
+
+
+def search(
+    query: str,
+    entities: Optional[Sequence[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+    limit: int = 20,
+    per_entity: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Busca em todas as entidades numa única consulta ao índice
+
+    Args:
+        query: Texto digitado
+        entities: Restringe a estas entidades (padrão: todas)
+        columns: Restringe a estas colunas (title, body, extra)
+        limit: Máximo de resultados
+        per_entity: Máximo de resultados por entidade
+
+    Returns:
+        [{'entity', 'entity_id', 'rank'}] do mais relevante ao menos
+    """
+    expression = match_expression(query, columns)
+    if expression is None:
+        return []
+    ensure_built()
+
+    entities = list(entities or ENTITIES)
+    placeholders = ', '.join(f':e{i}' for i in range(len(entities)))
+    params = {f'e{i}': entity for i, entity in enumerate(entities)}
+    params.update(match=expression, limit=limit, per_entity=per_entity or limit)
+
+    # Título pesa mais que corpo, que pesa mais que os campos extras
+    rows = db.session.execute(text(f"""
+        SELECT entity, entity_id, score FROM (
+            SELECT entity, entity_id, score,
+                   ROW_NUMBER() OVER (PARTITION BY entity ORDER BY score) AS position
+            FROM (
+                SELECT entity, entity_id, bm25(search_index, 0, 0, 10.0, 4.0, 1.0) AS score
+                FROM search_index
+                WHERE search_index MATCH :match AND entity IN ({placeholders})
+            )
+        )
+        WHERE position <= :per_entity
+        ORDER BY score
+        LIMIT :limit
+    """), params)
+    return [{'entity': entity, 'entity_id': int(entity_id), 'rank': score} for entity, entity_id, score in rows]
+
+
+def matching_ids(entity: str, query: str, columns: Optional[Sequence[str]] = None):
+    """
+    Subconsulta com os ids de uma entidade que casam com o texto,
+    para usar em Model.id.in_(...) junto com outros filtros e ordenações
+
+    Returns:
+        A subconsulta, ou None se o texto não tem palavras (sem filtro)
+    """
+    expression = match_expression(query, columns)
+    if expression is None:
+        return None
+    ensure_built()
+    return text(
+        "SELECT entity_id FROM search_index WHERE search_index MATCH :match AND entity = :entity"
+    ).bindparams(match=expression, entity=entity).columns(entity_id=Integer)
+
+
+def load(results: List[Dict[str, Any]]) -> List[Tuple[str, Any]]:
+    """Pares (entidade, objeto) dos resultados, na ordem de relevância (uma consulta por entidade)"""
+    ids_by_entity: Dict[str, List[int]] = {}
+    for result in results:
+        ids_by_entity.setdefault(result['entity'], []).append(result['entity_id'])
+
+    objects = {}
+    for entity, ids in ids_by_entity.items():
+        model = ENTITIES[entity][1]
+        for obj in model.query.filter(model.id.in_(ids)):
+            objects[(entity, obj.id)] = obj
+
+    return [
+        (result['entity'], objects[(result['entity'], result['entity_id'])])
+        for result in results
+        if (result['entity'], result['entity_id']) in objects
+    ]
+
+
+# ===== Tabela crua `joias` (conexão sqlite3 de /joias/enhanced) =====
+
+JOIAS_SCHEMA = f"""
+    CREATE VIRTUAL TABLE joias_fts USING fts5(
+        nome, descricao, descricao_completa,
+        content = 'joias', content_rowid = 'id',
+        tokenize = '{TOKENIZER}', prefix = '2 3'
+    );
+    CREATE TRIGGER joias_fts_insert AFTER INSERT ON joias BEGIN
+        INSERT INTO joias_fts (rowid, nome, descricao, descricao_completa)
+        VALUES (new.id, new.nome, new.descricao, new.descricao_completa);
+    END;
+    CREATE TRIGGER joias_fts_delete AFTER DELETE ON joias BEGIN
+        INSERT INTO joias_fts (joias_fts, rowid, nome, descricao, descricao_completa)
+        VALUES ('delete', old.id, old.nome, old.descricao, old.descricao_completa);
+    END;
+    CREATE TRIGGER joias_fts_update AFTER UPDATE OF nome, descricao, descricao_completa ON joias BEGIN
+        INSERT INTO joias_fts (joias_fts, rowid, nome, descricao, descricao_completa)
+        VALUES ('delete', old.id, old.nome, old.descricao, old.descricao_completa);
+        INSERT INTO joias_fts (rowid, nome, descricao, descricao_completa)
+        VALUES (new.id, new.nome, new.descricao, new.descricao_completa);
+    END;
+"""
+
+
+def ensure_joias_index(conn):
+    """
+    Cria o índice e os triggers da tabela `joias` se ainda não existirem
+
+    Os triggers mantêm o índice a cada escrita, venha de onde vier.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'joias_fts'"
+    ).fetchone()
+    if exists:
+        return
+    conn.executescript(JOIAS_SCHEMA)
+    conn.execute("INSERT INTO joias_fts (joias_fts) VALUES ('rebuild')")
+    conn.commit()
@@ -0,0 +1,201 @@
+"""
+Camada de listagem compartilhada pelos blueprints do ERP
+Paginação por cursor (keyset), seleção de campos e resposta em fluxo
+(array JSON ou NDJSON), com memória constante qualquer que seja o
+tamanho da tabela
+
+Parâmetros aceitos na query string:
+    limit   tamanho da página (sem ele, a lista inteira vem em fluxo)
+    cursor  valor de X-Next-Cursor da página anterior
+    fields  campos a devolver, separados por vírgula (ex.: id,name)
+    format  json (padrão) ou ndjson; também via Accept: application/x-ndjson
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from flask import Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import and_, inspect, or_
+
+MAX_LIMIT = 500
+BATCH_SIZE = 200
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+class ListingError(ValueError):
+    """Parâmetro de listagem inválido (vira resposta 400)"""
+
+
+def _encode_value(value: Any) -> List[Any]:
+    if isinstance(value, datetime):
+        return ['dt', value.isoformat()]
+    if isinstance(value, date):
+        return ['d', value.isoformat()]
+    return ['v', value]
+
+
+def _decode_value(encoded: List[Any]) -> Any:
+    kind, value = encoded
+    if kind == 'dt':
+        return datetime.fromisoformat(value)
+    if kind == 'd':
+        return date.fromisoformat(value)
+    return value
+
+
+def encode_cursor(sort_value: Any, last_id: Any) -> str:
+    """Posição depois da última linha entregue (opaca para o cliente)"""
+    payload = json.dumps([_encode_value(sort_value), last_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        encoded, last_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return _decode_value(encoded), last_id
+    except Exception:
+        raise ListingError('Cursor inválido')
+
+
+def _keyset(column, pk, descending: bool, sort_value: Any, last_id: Any):
+    """Linhas depois da posição do cursor na ordem (coluna, id) com NULLs por último"""
+    after_id = pk < last_id if descending else pk > last_id
+    if column is None:
+        return after_id
+    if sort_value is None:
+        return and_(column.is_(None), after_id)
+    after_value = column < sort_value if descending else column > sort_value
+    return or_(after_value, and_(column == sort_value, after_id), column.is_(None))
+
+
+def _parse_limit() -> Optional[int]:
+    raw = request.args.get('limit')
+    if raw is None or raw == '':
+        return None
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ListingError('limit deve ser um número inteiro')
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ListingError(f'limit deve estar entre 1 e {MAX_LIMIT}')
+    return limit
+
+
+def _parse_fields() -> Optional[List[str]]:
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+
+def _wants_ndjson() -> bool:
+    fmt = request.args.get('format')
+    if fmt:
+        if fmt not in ('json', 'ndjson'):
+            raise ListingError("format deve ser 'json' ou 'ndjson'")
+        return fmt == 'ndjson'
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def _chunks(items: Iterable[Dict[str, Any]], ndjson: bool) -> Iterator[str]:
+    """Serializa em blocos de BATCH_SIZE itens para poucas escritas no socket"""
+    dumps = current_app.json.dumps
+    buffer = []
+    first = True
+
+    if not ndjson:
+        yield '['
+    for item in items:
+        if ndjson:
+            buffer.append(dumps(item) + '\n')
+        else:
+            buffer.append(dumps(item) if first else ',' + dumps(item))
+            first = False
+        if len(buffer) >= BATCH_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+    if not ndjson:
+        yield ']'
+
+
+def list_response(
+    query,
+    order_by=None,
+    descending: bool = False,
+    serialize: Optional[Callable[[Any], Dict[str, Any]]] = None
+):
+    """
+    Resposta de listagem para uma query de modelo
+
+    Args:
+        query: Query já filtrada (sem order_by)
+        order_by: Coluna de ordenação; o id desempata (None = só o id)
+        descending: Ordem decrescente
+        serialize: Converte uma linha em dict (padrão: to_dict())
+
+    Returns:
+        Response em fluxo; com limit, o cursor da próxima página vem em
+        X-Next-Cursor e no cabeçalho Link. Parâmetros inválidos dão 400.
+    """
+    serialize = serialize or (lambda row: row.to_dict())
+
+    try:
+        limit = _parse_limit()
+        cursor = request.args.get('cursor')
+        fields = _parse_fields()
+        ndjson = _wants_ndjson()
+    except ListingError as e:
+        return jsonify({'error': str(e)}), 400
+
+    entity = query.column_descriptions[0]['entity']
+    pk = getattr(entity, inspect(entity).primary_key[0].key)
+
+    direction = (lambda column: column.desc()) if descending else (lambda column: column.asc())
+    ordering = [direction(pk)]
+    if order_by is not None:
+        ordering.insert(0, direction(order_by).nullslast())
+    query = query.order_by(*ordering)
+
+    if cursor:
+        try:
+            sort_value, last_id = decode_cursor(cursor)
+        except ListingError as e:
+            return jsonify({'error': str(e)}), 400
+        query = query.filter(_keyset(order_by, pk, descending, sort_value, last_id))
+
+    headers = {}
+    if limit is None and not cursor:
+        # Tabela inteira, lida em lotes enquanto é enviada
+        rows: Iterable[Any] = query.yield_per(BATCH_SIZE)
+    else:
+        # Página limitada: uma linha a mais diz se há próxima
+        page_size = limit or MAX_LIMIT
+        rows = query.limit(page_size + 1).all()
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            sort_value = getattr(last, order_by.key) if order_by is not None else None
+            next_cursor = encode_cursor(sort_value, getattr(last, pk.key))
+            args = request.args.to_dict()
+            args.update(cursor=next_cursor, limit=page_size)
+            headers['X-Next-Cursor'] = next_cursor
+            headers['Link'] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+
+    def items() -> Iterator[Dict[str, Any]]:
+        for row in rows:
+            item = serialize(row)
+            if fields is not None:
+                item = {field: item[field] for field in fields if field in item}
+            yield item
+
+    return Response(
+        stream_with_context(_chunks(items(), ndjson)),
+        mimetype=NDJSON_MIMETYPE if ndjson else 'application/json',
+        headers=headers
+    )
@@ -0,0 +1,107 @@
+"""
+Tabelas materializadas mantidas por eventos do ORM
+Peças compartilhadas pelos serviços que guardam totais prontos (saldos
+diários do caixa, valorização do estoque): variação incremental de uma
+linha, valores anteriores de uma alteração e a marca de "já construída"
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Any, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import get_history
+
+from src.models.user import db
+
+logger = logging.getLogger(__name__)
+
+
+class MaterializedBuild(db.Model):
+    """Marca de que uma tabela materializada foi preenchida a partir da origem"""
+    __tablename__ = 'materialized_builds'
+
+    name = db.Column(db.String(64), primary_key=True)
+    built_at = db.Column(db.DateTime, nullable=False)
+
+
+def is_built(name: str) -> bool:
+    """A tabela materializada já foi construída neste banco?"""
+    MaterializedBuild.__table__.create(db.session.connection(), checkfirst=True)
+    return db.session.query(MaterializedBuild.name).filter_by(name=name).first() is not None
+
+
+def mark_built(name: str):
+    """Registra a construção na transação atual (junto com o rebuild que a fez)"""
+    MaterializedBuild.__table__.create(db.session.connection(), checkfirst=True)
+    db.session.merge(MaterializedBuild(name=name, built_at=datetime.now()))
+
+
+def apply_delta(
+    connection,
+    table,
+    key: Dict[str, Any],
+    deltas: Dict[str, float],
+    count_column: str,
+    drop_empty: bool = False
+):
+    """
+    Soma variações (positivas ou negativas) às colunas de uma linha
+
+    A linha só é criada quando a contagem aumenta: subtrair de uma linha
+    que não existe significa que a tabela divergiu da origem, e isso pede
+    um rebuild, não uma linha com contagem negativa.
+
+    Args:
+        connection: Conexão do evento do ORM
+        table: Tabela materializada
+        key: Colunas que identificam a linha
+        deltas: Coluna -> variação
+        count_column: Coluna com o número de linhas de origem agregadas
+        drop_empty: Remove a linha quando a contagem chega a zero
+    """
+    if not any(deltas.values()):
+        return
+
+    where = [table.c[name] == value for name, value in key.items()]
+    result = connection.execute(
+        table.update()
+        .where(*where)
+        .values({name: table.c[name] + delta for name, delta in deltas.items()})
+    )
+
+    count = deltas.get(count_column, 0)
+    if result.rowcount == 0:
+        if count > 0:
+            connection.execute(table.insert().values(**key, **deltas))
+        else:
+            logger.warning(f"{table.name}: linha {key} ausente ao subtrair; execute rebuild()")
+    elif drop_empty and count < 0:
+        # Linha sem origem sai da tabela (e leva junto o resíduo de ponto flutuante)
+        connection.execute(table.delete().where(*where, table.c[count_column] <= 0))
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+def track_history(model, attributes: Iterable[str]):
+    """
+    Faz a atribuição carregar o valor antigo mesmo com o atributo expirado
+
+    Depois de um commit os atributos expiram; sem isto, atribuir sem ler
+    antes deixa o histórico sem o valor anterior.
+    """
+    for name in attributes:
+        event.listen(getattr(model, name), 'set', _load_old_value, active_history=True)
+
+
+def previous(target, attribute: str) -> Optional[Any]:
+    """Valor do atributo antes da alteração pendente"""
+    history = get_history(target, attribute)
+    if history.has_changes():
+        # Sem valor removido, o anterior era NULL
+        return history.deleted[0] if history.deleted else None
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(target, attribute)
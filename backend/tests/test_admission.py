@@ -0,0 +1,159 @@
+"""AdmissionController limits and grant order"""
+import asyncio
+
+import pytest
+
+from backend.modules.tts.admission import (
+    BULK,
+    INTERACTIVE,
+    PREVIEW,
+    AdmissionController,
+    AdmissionError,
+)
+
+DEADLINES = {INTERACTIVE: 5.0, PREVIEW: 5.0, BULK: 5.0}
+
+
+def controller(concurrency=1, per_client=10, max_waiting=10, deadlines=DEADLINES, enabled=True):
+    return AdmissionController(concurrency, per_client, max_waiting, dict(deadlines), enabled)
+
+
+async def settle():
+    """Let waiting acquire() calls reach their queues"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_grants_by_class_then_round_robin_across_clients():
+    async def scenario():
+        admission = controller()
+        holder = await admission.acquire("holder", INTERACTIVE)
+        order = []
+
+        async def request(client, priority):
+            ticket = await admission.acquire(client, priority)
+            order.append(f"{client}:{priority}")
+            await asyncio.sleep(0)
+            ticket.release()
+
+        tasks = [asyncio.create_task(request(c, p)) for c, p in [
+            ("a", BULK),
+            ("a", PREVIEW),
+            ("a", PREVIEW),
+            ("b", PREVIEW),
+            ("c", INTERACTIVE),
+        ]]
+        await settle()
+        holder.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == [
+        "c:interactive", "a:preview", "b:preview", "a:preview", "a:bulk",
+    ]
+
+
+def test_concurrency_limit():
+    async def scenario():
+        admission = controller(concurrency=2)
+        first = await admission.acquire("a")
+        await admission.acquire("b")
+        waiter = asyncio.create_task(admission.acquire("c"))
+        await settle()
+        waiting = admission.stats()["waiting"][PREVIEW]
+        first.release()
+        await waiter
+        return waiting, admission.stats()["active"]
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_per_client_limit_is_429():
+    async def scenario():
+        admission = controller(concurrency=5, per_client=2)
+        await admission.acquire("a")
+        await admission.acquire("a")
+        with pytest.raises(AdmissionError) as error:
+            await admission.acquire("a")
+        await admission.acquire("b")
+        return error.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 429
+
+
+def test_full_waiting_room_is_503():
+    async def scenario():
+        admission = controller(max_waiting=1)
+        await admission.acquire("a")
+        waiter = asyncio.create_task(admission.acquire("b"))
+        await settle()
+        with pytest.raises(AdmissionError) as error:
+            await admission.acquire("c")
+        waiter.cancel()
+        return error.value, admission.stats()["rejected"]
+
+    error, rejected = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert rejected == {"preview:queue_full": 1}
+
+
+def test_deadline_rejects_and_frees_the_place():
+    async def scenario():
+        admission = controller(deadlines={**DEADLINES, BULK: 0.05})
+        await admission.acquire("a")
+        with pytest.raises(AdmissionError) as error:
+            await admission.acquire("b", BULK)
+        return error.value, admission.stats()
+
+    error, stats = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert stats["waiting"][BULK] == 0
+    assert stats["clients"] == 1
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        admission = controller()
+        holder = await admission.acquire("a")
+        waiter = asyncio.create_task(admission.acquire("b"))
+        await settle()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        holder.release()
+        return admission.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["active"] == 0
+    assert stats["waiting"][PREVIEW] == 0
+    assert stats["clients"] == 0
+
+
+def test_release_is_idempotent():
+    async def scenario():
+        admission = controller(concurrency=2)
+        ticket = await admission.acquire("a")
+        await admission.acquire("b")
+        ticket.release()
+        ticket.release()
+        return admission.stats()["active"]
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_disabled_admits_everything():
+    async def scenario():
+        admission = controller(per_client=1, enabled=False)
+        tickets = [await admission.acquire("a") for _ in range(5)]
+        for ticket in tickets:
+            ticket.release()
+        return admission.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["active"] == 0
+    assert stats["clients"] == 0
+
+
+def test_unknown_priority():
+    with pytest.raises(ValueError):
+        asyncio.run(controller().acquire("a", "urgent"))
@@ -0,0 +1,127 @@
+"""AudioCache keys, memory LRU and disk eviction"""
+import os
+import time
+
+import numpy as np
+
+from backend.modules.tts.cache import AudioCache, normalize_text
+
+
+def segment(samples: int, value: float = 0.5) -> np.ndarray:
+    return np.full(samples, value, dtype=np.float32)
+
+
+def test_normalize_text_collapses_whitespace_and_composes():
+    assert normalize_text("  Ola\t\n  mundo  ") == "Ola mundo"
+    assert normalize_text("ac\u0327a\u0303o") == "a\u00e7\u00e3o"
+
+
+def test_key_ignores_whitespace_but_not_parameters():
+    key = AudioCache.make_key("Bom dia", "luna", 1.0, "p")
+
+    assert AudioCache.make_key(" Bom   dia ", "luna", 1.0, "p") == key
+    assert AudioCache.make_key("Bom dia", "luna", 1.0004, "p") == key
+    assert AudioCache.make_key("Bom dia", "pt-BR-f2", 1.0, "p") != key
+    assert AudioCache.make_key("Bom dia", "luna", 1.25, "p") != key
+    assert AudioCache.make_key("Bom dia", "luna", 1.0, "e") != key
+    assert AudioCache.make_key("bom dia", "luna", 1.0, "p") != key
+
+
+def test_memory_hit_and_miss_counters():
+    cache = AudioCache(None)
+    cache.put("a", [segment(10)])
+
+    assert cache.get("a")[0].tolist() == segment(10).tolist()
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_memory_evicts_least_recently_used():
+    # Room for two 100-sample float32 entries
+    cache = AudioCache(None, memory_bytes=800)
+    cache.put("a", [segment(100)])
+    cache.put("b", [segment(100)])
+    cache.get("a")
+    cache.put("c", [segment(100)])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["memory_bytes"] == 800
+
+
+def test_entry_larger_than_memory_budget_is_not_kept():
+    cache = AudioCache(None, memory_bytes=100)
+    cache.put("big", [segment(100)])
+
+    assert cache.get("big") is None
+    assert cache.stats()["memory_entries"] == 0
+
+
+def test_empty_segments_are_not_stored():
+    cache = AudioCache(None)
+    cache.put("a", [])
+
+    assert cache.get("a") is None
+    assert cache.stats()["stores"] == 0
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    AudioCache(tmp_path).put("a", [segment(10, 0.1), segment(5, 0.2)])
+
+    cache = AudioCache(tmp_path)
+    segments = cache.get("a")
+
+    assert [len(s) for s in segments] == [10, 5]
+    assert cache.stats()["disk_hits"] == 1
+    # Promoted to memory by the disk hit
+    cache.get("a")
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_disk_entry_past_ttl_is_dropped(tmp_path):
+    AudioCache(tmp_path).put("a", [segment(10)])
+    path = tmp_path / "a.npz"
+    old = time.time() - 120
+    os.utime(path, (old, old))
+
+    cache = AudioCache(tmp_path, ttl_seconds=60)
+
+    assert cache.get("a") is None
+    assert not path.exists()
+    assert cache.stats()["disk_bytes"] == 0
+
+
+def test_disk_evicts_oldest_over_budget(tmp_path):
+    cache = AudioCache(tmp_path, memory_bytes=0)
+    cache.put("a", [segment(1000)])
+    entry_size = (tmp_path / "a.npz").stat().st_size
+    old = time.time() - 10
+    os.utime(tmp_path / "a.npz", (old, old))
+
+    cache.disk_bytes = entry_size * 3 // 2
+    cache.put("b", [segment(1000)])
+
+    assert not (tmp_path / "a.npz").exists()
+    assert (tmp_path / "b.npz").exists()
+    assert cache.stats()["disk_bytes"] == entry_size
+
+
+def test_unreadable_disk_entry_is_removed(tmp_path):
+    (tmp_path / "a.npz").write_bytes(b"not an npz file")
+    cache = AudioCache(tmp_path)
+
+    assert cache.get("a") is None
+    assert not (tmp_path / "a.npz").exists()
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    cache = AudioCache(tmp_path)
+    cache.put("a", [segment(10)])
+    cache.clear()
+
+    assert cache.get("a") is None
+    assert list(tmp_path.glob("*.npz")) == []
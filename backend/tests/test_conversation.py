@@ -0,0 +1,113 @@
+"""ConversationStore ring buffers, eviction and history paging"""
+import pytest
+
+from backend.modules.lua.conversation import ConversationStore
+
+
+def fill(store, session_id="s1", count=10):
+    for n in range(1, count + 1):
+        store.append(session_id, "user", f"message {n}", user_id="u1")
+
+
+def seqs(page):
+    return [m["seq"] for m in page["messages"]]
+
+
+@pytest.fixture
+def persistent(tmp_path):
+    store = ConversationStore(max_messages=4, db_path=tmp_path / "conversations.db")
+    yield store
+    store.close()
+
+
+def test_append_numbers_messages_per_session():
+    store = ConversationStore()
+
+    assert store.append("a", "user", "oi")["seq"] == 1
+    assert store.append("a", "assistant", "olá")["seq"] == 2
+    assert store.append("b", "user", "oi")["seq"] == 1
+
+
+def test_pages_newest_first_oldest_first_within_page():
+    store = ConversationStore()
+    fill(store, count=5)
+
+    first = store.history("s1", limit=2)
+    second = store.history("s1", limit=2, before=first["next_before"])
+    last = store.history("s1", limit=2, before=second["next_before"])
+
+    assert seqs(first) == [4, 5]
+    assert seqs(second) == [2, 3]
+    assert seqs(last) == [1]
+    assert last["next_before"] is None
+
+
+def test_memory_only_history_ends_at_the_ring_buffer():
+    store = ConversationStore(max_messages=3)
+    fill(store, count=5)
+
+    page = store.history("s1", limit=10)
+
+    assert seqs(page) == [3, 4, 5]
+    assert page["next_before"] is None
+
+
+def test_unknown_session_is_empty():
+    page = ConversationStore().history("missing")
+
+    assert page == {"session_id": "missing", "messages": [], "next_before": None}
+
+
+def test_paging_continues_from_disk_past_the_ring_buffer(persistent):
+    fill(persistent, count=10)
+
+    first = persistent.history("s1", limit=3)
+    second = persistent.history("s1", limit=3, before=first["next_before"])
+    rest = persistent.history("s1", limit=10, before=second["next_before"])
+
+    assert seqs(first) == [8, 9, 10]
+    assert seqs(second) == [5, 6, 7]
+    assert seqs(rest) == [1, 2, 3, 4]
+    assert rest["next_before"] is None
+
+
+def test_page_spanning_memory_and_disk(persistent):
+    fill(persistent, count=10)
+
+    page = persistent.history("s1", limit=6)
+
+    assert seqs(page) == [5, 6, 7, 8, 9, 10]
+    assert page["next_before"] == 5
+
+
+def test_evicted_session_is_restored_from_disk(persistent):
+    fill(persistent, count=6)
+    persistent.idle_seconds = 0
+
+    assert persistent.evict_idle() == 1
+    assert persistent.stats()["sessions"] == 0
+
+    record = persistent.append("s1", "assistant", "de volta")
+    assert record["seq"] == 7
+    assert record["user_id"] == "u1"
+    assert seqs(persistent.history("s1", limit=2)) == [6, 7]
+
+
+def test_max_sessions_drops_least_recently_active():
+    store = ConversationStore(max_sessions=2)
+    store.append("a", "user", "1")
+    store.append("b", "user", "1")
+    store.append("a", "user", "2")
+    store.append("c", "user", "1")
+
+    assert seqs(store.history("b")) == []
+    assert seqs(store.history("a")) == [1, 2]
+    assert store.stats()["evictions"] == 1
+
+
+def test_clear_removes_memory_and_disk(persistent):
+    fill(persistent, count=3)
+    persistent.clear("s1")
+
+    assert seqs(persistent.history("s1")) == []
+    assert persistent.append("s1", "user", "novo")["seq"] == 1
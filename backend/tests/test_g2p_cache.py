@@ -0,0 +1,91 @@
+"""G2PCache eviction and the CachedG2P wrapper's keys"""
+import threading
+
+from backend.modules.tts.g2p_cache import CachedG2P, G2PCache
+
+
+class CountingG2P:
+    """G2P stand-in that records the texts it was asked for"""
+
+    def __init__(self, tokens=None):
+        self.calls = []
+        self.tokens = tokens
+        self.lexicon = {"lua": "lˈua"}
+
+    def __call__(self, text):
+        self.calls.append(text)
+        return text.upper(), self.tokens
+
+
+def wrap(g2p, cache, lang_code="p", lexicon_version=0):
+    return CachedG2P(g2p, cache, lang_code, lexicon_version, threading.Lock())
+
+
+def test_lru_evicts_oldest_and_refreshes_on_get():
+    cache = G2PCache(max_entries=2)
+    cache.put(("p", 0, "a"), "A")
+    cache.put(("p", 0, "b"), "B")
+    cache.get(("p", 0, "a"))
+    cache.put(("p", 0, "c"), "C")
+
+    assert cache.get(("p", 0, "b")) is None
+    assert cache.get(("p", 0, "a")) == "A"
+    assert cache.get(("p", 0, "c")) == "C"
+    assert cache.stats()["entries"] == 2
+
+
+def test_zero_entries_disables_the_cache():
+    cache = G2PCache(max_entries=0)
+    cache.put(("p", 0, "a"), "A")
+
+    assert cache.get(("p", 0, "a")) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_hit_rate():
+    cache = G2PCache()
+    cache.put(("p", 0, "a"), "A")
+    cache.get(("p", 0, "a"))
+    cache.get(("p", 0, "b"))
+
+    assert cache.stats() == {
+        "hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1, "max_entries": 4096,
+    }
+
+
+def test_repeated_text_runs_g2p_once():
+    g2p = CountingG2P()
+    cached = wrap(g2p, G2PCache())
+
+    assert cached("bom dia") == ("BOM DIA", None)
+    assert cached("bom dia") == ("BOM DIA", None)
+    assert g2p.calls == ["bom dia"]
+
+
+def test_key_includes_language_and_lexicon_version():
+    cache = G2PCache()
+    g2p = CountingG2P()
+
+    wrap(g2p, cache, "p", 0)("lua")
+    wrap(g2p, cache, "e", 0)("lua")
+    wrap(g2p, cache, "p", 1)("lua")
+    wrap(g2p, cache, "p", 0)("lua")
+
+    assert g2p.calls == ["lua", "lua", "lua"]
+
+
+def test_cached_tokens_are_copied():
+    tokens = [{"text": "hello", "start_ts": None}]
+    cached = wrap(CountingG2P(tokens), G2PCache())
+
+    _, first = cached("hello")
+    first[0]["start_ts"] = 1.5
+    _, second = cached("hello")
+
+    assert second[0]["start_ts"] is None
+
+
+def test_unknown_attributes_come_from_the_wrapped_g2p():
+    g2p = CountingG2P()
+
+    assert wrap(g2p, G2PCache()).lexicon is g2p.lexicon
@@ -0,0 +1,79 @@
+"""IntentMatcher priority, overlap and rule loading"""
+import json
+
+import pytest
+
+from backend.modules.lua.intents import Intent, IntentMatcher
+
+
+def intent(name, *triggers):
+    return Intent(name=name, triggers=list(triggers), response=name)
+
+
+def test_first_listed_intent_wins_wherever_it_occurs():
+    matcher = IntentMatcher([intent("thanks", "obrigado"), intent("greeting", "oi")])
+
+    assert matcher.match("oi, obrigado!").name == "thanks"
+
+
+def test_matching_is_case_insensitive_substring():
+    matcher = IntentMatcher([intent("voice", "sua voz")])
+
+    assert matcher.match("Adorei SUA VOZ hoje").name == "voice"
+    assert matcher.match("nada a ver") is None
+
+
+def test_overlapping_triggers_are_all_seen():
+    # "até logo" starts inside "obrigada até": a non-overlapping scan would
+    # consume it and miss the higher-priority intent
+    matcher = IntentMatcher([intent("farewell", "até logo"), intent("thanks", "obrigada até")])
+
+    assert matcher.match("obrigada até logo").name == "farewell"
+
+
+def test_triggers_are_escaped():
+    matcher = IntentMatcher([intent("price", "r$ 10.00")])
+
+    assert matcher.match("custa r$ 10.00?").name == "price"
+    assert matcher.match("custa r$ 10x00?") is None
+
+
+def test_no_intents_matches_nothing():
+    matcher = IntentMatcher([], default="eco: {message}")
+
+    assert matcher.match("oi") is None
+    assert matcher.fallback("oi") == "eco: oi"
+
+
+def test_duplicate_names_are_rejected():
+    with pytest.raises(ValueError, match="Duplicate"):
+        IntentMatcher([intent("a", "x"), intent("a", "y")])
+
+
+@pytest.mark.parametrize("data", [
+    {"name": "empty", "triggers": [], "response": "r"},
+    {"name": "mute", "triggers": ["x"]},
+])
+def test_malformed_rule_is_rejected(data):
+    with pytest.raises(ValueError):
+        Intent.from_dict(data)
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / "intents.json"
+    path.write_text(json.dumps({
+        "default": "? {message}",
+        "intents": [{"name": "greeting", "triggers": ["oi"], "response_type": "greeting"}],
+    }), encoding="utf-8")
+
+    matcher = IntentMatcher.from_file(path)
+
+    assert matcher.match("oi").response_type == "greeting"
+    assert matcher.fallback("hm") == "? hm"
+
+
+def test_shipped_rules_load():
+    matcher = IntentMatcher.from_file()
+
+    assert matcher.match("Bom dia, Lua!").name == "greeting"
+    assert matcher.match("muito obrigada").name == "thanks"
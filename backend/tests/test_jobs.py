@@ -0,0 +1,159 @@
+"""JobQueue claims, retries, stale claims and cancellation"""
+import pytest
+
+from backend.modules.tts.jobs import (
+    CANCELLED,
+    COMPLETED,
+    DONE,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    JobQueue,
+    OutputStore,
+)
+
+
+def items(count):
+    return [
+        {"text": f"frase {n}", "voice": "luna", "speed": 1.0, "lang_code": "p"}
+        for n in range(count)
+    ]
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.db", max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def statuses(queue, job_id):
+    return [item["status"] for item in queue.get(job_id, with_items=True)["items"]]
+
+
+def test_claims_oldest_job_in_item_order(queue):
+    first = queue.submit(items(2), "wav")
+    second = queue.submit(items(1), "mp3")
+
+    claims = [queue.claim("w") for _ in range(3)]
+
+    assert [(c["job_id"], c["idx"]) for c in claims] == [(first, 0), (first, 1), (second, 0)]
+    assert claims[2]["audio_format"] == "mp3"
+    assert claims[0]["attempts"] == 1
+    assert queue.claim("w") is None
+    assert queue.get(first)["status"] == RUNNING
+
+
+def test_completion_finishes_the_job(queue):
+    job_id = queue.submit(items(2), "wav")
+    for _ in range(2):
+        queue.complete(queue.claim("w"), "w", "digest", 10)
+
+    job = queue.get(job_id)
+    assert job["status"] == COMPLETED
+    assert (job["done"], job["failed"], job["progress"]) == (2, 0, 1.0)
+    assert [o["idx"] for o in queue.outputs(job_id)] == [0, 1]
+
+
+def test_failure_is_retried_until_out_of_attempts(queue):
+    job_id = queue.submit(items(1), "wav")
+
+    first = queue.claim("w")
+    queue.fail(first, "w", "boom")
+    assert statuses(queue, job_id) == [QUEUED]
+
+    second = queue.claim("w")
+    assert second["attempts"] == 2
+    queue.fail(second, "w", "boom again")
+
+    job = queue.get(job_id, with_items=True)
+    assert job["items"][0]["status"] == FAILED
+    assert job["items"][0]["error"] == "boom again"
+    assert job["status"] == COMPLETED
+    assert job["failed"] == 1
+
+
+def test_fail_without_retry(queue):
+    job_id = queue.submit(items(1), "wav")
+    queue.fail(queue.claim("w"), "w", "bad input", retry=False)
+
+    assert statuses(queue, job_id) == [FAILED]
+
+
+def test_release_does_not_count_the_attempt(queue):
+    queue.submit(items(1), "wav")
+    queue.release(queue.claim("w"), "w")
+
+    assert queue.claim("w")["attempts"] == 1
+
+
+def test_outcome_from_a_worker_that_lost_the_claim_is_ignored(queue):
+    queue.stale_seconds = -1
+    job_id = queue.submit(items(1), "wav")
+    stale = queue.claim("old")
+    fresh = queue.claim("new")
+
+    queue.complete(stale, "old", "stale", 1)
+    assert statuses(queue, job_id) == [RUNNING]
+
+    queue.complete(fresh, "new", "fresh", 1)
+    assert queue.get(job_id, with_items=True)["items"][0]["digest"] == "fresh"
+
+
+def test_stale_claim_out_of_attempts_is_failed(queue):
+    queue.stale_seconds = -1
+    job_id = queue.submit(items(1), "wav")
+    queue.claim("w1")
+    queue.claim("w2")
+
+    assert queue.claim("w3") is None
+    job = queue.get(job_id, with_items=True)
+    assert job["items"][0]["error"] == "Worker lost"
+    assert job["status"] == COMPLETED
+
+
+def test_cancel_drops_queued_items_and_lets_running_ones_finish(queue):
+    job_id = queue.submit(items(3), "wav")
+    running = queue.claim("w")
+
+    assert queue.cancel(job_id)
+    assert statuses(queue, job_id) == [RUNNING, CANCELLED, CANCELLED]
+    assert queue.claim("w") is None
+
+    queue.complete(running, "w", "digest", 1)
+    job = queue.get(job_id)
+    assert job["status"] == CANCELLED
+    assert statuses(queue, job_id)[0] == DONE
+
+
+def test_cancel_finished_or_unknown_job(queue):
+    job_id = queue.submit(items(1), "wav")
+    queue.complete(queue.claim("w"), "w", "digest", 1)
+
+    assert not queue.cancel(job_id)
+    assert not queue.cancel("missing")
+    assert queue.get("missing") is None
+
+
+def test_queue_is_shared_through_the_file(tmp_path):
+    api = JobQueue(tmp_path / "jobs.db")
+    worker = JobQueue(tmp_path / "jobs.db")
+    try:
+        job_id = api.submit(items(1), "wav")
+        worker.complete(worker.claim("w"), "w", "digest", 1)
+        assert api.get(job_id)["status"] == COMPLETED
+    finally:
+        api.close()
+        worker.close()
+
+
+def test_output_key_depends_on_format(tmp_path):
+    key = OutputStore.make_key("Oi", "luna", 1.0, "p", "wav")
+
+    assert OutputStore.make_key(" Oi ", "luna", 1.0, "p", "wav") == key
+    assert OutputStore.make_key("Oi", "luna", 1.0, "p", "mp3") != key
+
+    store = OutputStore(tmp_path)
+    assert store.put(key, "wav", b"RIFF") == 4
+    assert store.exists(key, "wav")
+    assert store.path(key, "wav").parent.name == key[:2]
@@ -0,0 +1,149 @@
+"""Paginação por cursor (keyset) e formatos da camada de listagem"""
+import json
+from datetime import date, datetime
+
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+from src.utils.listing import MAX_LIMIT, ListingError, decode_cursor, encode_cursor, list_response
+
+db = SQLAlchemy()
+
+
+class Item(db.Model):
+    __tablename__ = 'items'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(20))
+    price = db.Column(db.Float)
+
+    def to_dict(self):
+        return {'id': self.id, 'name': self.name, 'price': self.price}
+
+
+# Preços repetidos e NULLs: o desempate pelo id e os NULLs no fim são o
+# que um cursor só de valor erraria
+PRICES = [30.0, None, 10.0, 30.0, 20.0, None, 10.0, 30.0, 5.0, None, 20.0]
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    @app.route('/items')
+    def items():
+        return list_response(Item.query)
+
+    @app.route('/items/by-price')
+    def by_price():
+        return list_response(Item.query, order_by=Item.price)
+
+    @app.route('/items/by-price-desc')
+    def by_price_desc():
+        return list_response(Item.query, order_by=Item.price, descending=True)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(Item(name=f'item {n}', price=price) for n, price in enumerate(PRICES))
+        db.session.commit()
+        yield app.test_client()
+        db.drop_all()
+
+
+def expected_order(descending):
+    rows = [(price, id_) for id_, price in enumerate(PRICES, start=1)]
+    present = sorted((r for r in rows if r[0] is not None), reverse=descending)
+    missing = sorted((r for r in rows if r[0] is None), reverse=descending)
+    return [id_ for _, id_ in present + missing]
+
+
+def walk(client, path, limit):
+    """Segue X-Next-Cursor até a última página"""
+    ids, pages = [], 0
+    response = client.get(f'{path}?limit={limit}')
+    while True:
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page) <= limit
+        ids.extend(item['id'] for item in page)
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            return ids, pages
+        response = client.get(f'{path}?limit={limit}&cursor={cursor}')
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 4, 11])
+@pytest.mark.parametrize('path, descending', [
+    ('/items/by-price', False),
+    ('/items/by-price-desc', True),
+])
+def test_pages_cover_every_row_once_in_order(client, path, descending, limit):
+    ids, pages = walk(client, path, limit)
+
+    assert ids == expected_order(descending)
+    assert pages == -(-len(PRICES) // limit)
+
+
+def test_pages_by_id(client):
+    ids, _ = walk(client, '/items', 4)
+
+    assert ids == list(range(1, len(PRICES) + 1))
+
+
+def test_link_header_points_at_next_page(client):
+    response = client.get('/items?limit=2&fields=id')
+
+    cursor = response.headers['X-Next-Cursor']
+    assert response.headers['Link'] == f'</items?limit=2&fields=id&cursor={cursor}>; rel="next"'
+
+
+def test_without_limit_streams_everything(client):
+    response = client.get('/items/by-price')
+
+    assert [item['id'] for item in response.get_json()] == expected_order(False)
+    assert 'X-Next-Cursor' not in response.headers
+
+
+def test_fields_and_ndjson(client):
+    response = client.get('/items?limit=2&fields=id,name,missing&format=ndjson')
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert response.mimetype == 'application/x-ndjson'
+    assert lines == [{'id': 1, 'name': 'item 0'}, {'id': 2, 'name': 'item 1'}]
+
+
+def test_ndjson_by_accept_header(client):
+    response = client.get('/items?limit=1', headers={'Accept': 'application/x-ndjson'})
+
+    assert response.mimetype == 'application/x-ndjson'
+
+
+@pytest.mark.parametrize('query', [
+    'limit=abc',
+    'limit=0',
+    f'limit={MAX_LIMIT + 1}',
+    'format=xml',
+    'cursor=not-a-cursor',
+])
+def test_invalid_parameters_are_400(client, query):
+    response = client.get(f'/items?{query}')
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+@pytest.mark.parametrize('value', [None, 3, 2.5, 'texto', date(2024, 2, 29), datetime(2024, 2, 29, 13, 45, 1)])
+def test_cursor_round_trip(value):
+    cursor = encode_cursor(value, 17)
+
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (value, 17)
+
+
+def test_garbage_cursor():
+    with pytest.raises(ListingError):
+        decode_cursor('%%%')
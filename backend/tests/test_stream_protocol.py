@@ -0,0 +1,58 @@
+"""Binary frame layout of the /ws audio stream"""
+import struct
+
+import pytest
+
+from backend.modules.tts.stream_protocol import (
+    FRAME_AUDIO,
+    FRAME_END,
+    HEADER,
+    PROTOCOL_VERSION,
+    pack_frame,
+    unpack_frame,
+)
+
+
+def test_header_is_12_bytes_little_endian():
+    data = pack_frame(FRAME_AUDIO, 0x01020304, 7, b"abc")
+
+    assert HEADER.size == 12
+    assert data[:12] == bytes([PROTOCOL_VERSION, FRAME_AUDIO, 0, 0, 4, 3, 2, 1, 7, 0, 0, 0])
+    assert data[12:] == b"abc"
+
+
+def test_round_trip():
+    payload = bytes(range(256)) * 4
+    frame = unpack_frame(pack_frame(FRAME_AUDIO, 42, 3, payload))
+
+    assert frame.frame_type == FRAME_AUDIO
+    assert frame.utterance_id == 42
+    assert frame.sequence == 3
+    assert frame.payload == payload
+
+
+def test_end_frame_has_empty_payload():
+    data = pack_frame(FRAME_END, 5, 9)
+    frame = unpack_frame(data)
+
+    assert len(data) == HEADER.size
+    assert frame.frame_type == FRAME_END
+    assert frame.payload == b""
+
+
+def test_accepts_memoryview():
+    frame = unpack_frame(memoryview(pack_frame(FRAME_AUDIO, 1, 0, b"xy")))
+
+    assert frame.payload == b"xy"
+    assert isinstance(frame.payload, bytes)
+
+
+def test_rejects_truncated_frame():
+    with pytest.raises(ValueError, match="too short"):
+        unpack_frame(pack_frame(FRAME_AUDIO, 1, 0)[:11])
+
+
+def test_rejects_other_version():
+    data = struct.pack("<BBHII", PROTOCOL_VERSION + 1, FRAME_AUDIO, 0, 1, 0)
+    with pytest.raises(ValueError, match="version"):
+        unpack_frame(data)
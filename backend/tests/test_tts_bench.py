@@ -0,0 +1,72 @@
+"""
+KokoroEngine benchmarks against the stub model (pytest-benchmark)
+
+Run with `pytest tests/test_tts_bench.py --benchmark-only`; save and
+compare baselines with --benchmark-autosave / --benchmark-compare.
+Skipped when pytest-benchmark is not installed.
+"""
+import asyncio
+
+import pytest
+
+from backend.benchmarks.tts_bench import SCENARIOS, StubEngine, compare_baseline, timed
+from backend.core.config import settings
+
+try:
+    import pytest_benchmark
+except ImportError:
+    pytest_benchmark = None
+
+needs_benchmark = pytest.mark.skipif(pytest_benchmark is None, reason="pytest-benchmark not installed")
+
+
+@pytest.fixture(scope="module")
+def stub_engine():
+    """Initialized stub engine and the loop it runs on"""
+    overrides = {"enable_audio_cache": False, "inference_backend": "torch", "enable_batching": False}
+    saved = {name: getattr(settings, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    loop = asyncio.new_event_loop()
+    engine = StubEngine(rtf=0.01)
+    assert loop.run_until_complete(engine.initialize())
+    yield engine, loop
+
+    loop.run_until_complete(engine.cleanup())
+    loop.close()
+    for name, value in saved.items():
+        setattr(settings, name, value)
+
+
+@needs_benchmark
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+def test_scenario(benchmark, stub_engine, scenario):
+    engine, loop = stub_engine
+    request = SCENARIOS[scenario]
+
+    result = benchmark.pedantic(
+        lambda: loop.run_until_complete(timed(request(engine))),
+        rounds=5,
+        warmup_rounds=1
+    )
+
+    assert result["audio_seconds"] > 0
+    benchmark.extra_info.update(
+        first_chunk_ms=result["first_chunk"] * 1000,
+        rtf=result["latency"] / result["audio_seconds"]
+    )
+
+
+def test_compare_baseline_flags_only_regressions_beyond_tolerance():
+    baseline = {"scenarios": {
+        "speak_short": {"latency_p50_ms": 100.0, "rtf": 0.5},
+        "stream_short": {"latency_p50_ms": 100.0},
+    }}
+    results = {"scenarios": {
+        "speak_short": {"latency_p50_ms": 109.0, "rtf": 0.6},
+        "stream_short": {"latency_p50_ms": 50.0},
+        "mix_medium_2": {"latency_p50_ms": 999.0},
+    }}
+
+    assert compare_baseline(results, baseline, tolerance=0.1) == ["speak_short.rtf: 0.50 -> 0.60 (+20%)"]